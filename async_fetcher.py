@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+
+from http_cache import HTTPCache
+from http_session import POOL_PER_HOST, UserAgentRotator
+from retry_policy import get_default_retry_policy
+
+logger = logging.getLogger("WebScraperETL")
+
+
+class AsyncFetcher:
+    """Native asyncio fetch engine built on aiohttp
+
+    All requests go through one shared connector pool. A global semaphore bounds the
+    number of in-flight requests and a per-host semaphore keeps any single site from
+    monopolising the pool. Transient failures are retried according to a
+    ``retry_policy`` (jittered backoff, per-URL deadline, shared retry budget)
+    without blocking the event loop. With an ``http_cache``, fresh responses are
+    served from disk and stale ones are revalidated with conditional requests.
+    A ``rate_limiter`` spaces the requests to each domain; it is waited on before
+    taking a connection slot, so a throttled host never holds slots others need.
+    """
+
+    def __init__(self, max_concurrency=1000, per_host_limit=POOL_PER_HOST, timeout=10,
+                 max_retries=None, headers=None, user_agents=None, http_cache=None,
+                 rate_limiter=None, retry_policy=None):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.max_retries = max_retries  # None: the retry policy's max_attempts
+        self.retry_policy = retry_policy or get_default_retry_policy()
+        self.headers = dict(headers or {})
+        self.user_agents = list(user_agents or [])
+        self._user_agent_rotator = UserAgentRotator(self.user_agents)
+        self.http_cache = http_cache
+        self.rate_limiter = rate_limiter
+
+        self._session = None
+        self._global_semaphore = None
+        self._host_semaphores = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Create the shared connector pool (must run inside the event loop)"""
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host_limit,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._host_semaphores = {}
+
+    async def close(self):
+        """Close the connector pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    def _request_headers(self):
+        return self._user_agent_rotator.headers(self.headers)
+
+    async def fetch(self, url):
+        """Fetch a page, returning its text or None once every retry has failed"""
+        await self.start()
+        logger.info(f"Fetching page asynchronously: {url}")
+
+        cached = None
+        if self.http_cache is not None:
+            cached = await asyncio.to_thread(self.http_cache.lookup, url, self.headers)
+            if cached and cached['fresh']:
+                logger.info(f"Serving {url} from the HTTP cache")
+                return cached['text']
+
+        retry = self.retry_policy.start(url, self.max_retries)
+        while True:
+            try:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(url)
+                # Slots are only held while the request is in flight, not during backoff
+                async with self._global_semaphore, self._host_semaphore(url):
+                    headers = dict(self._request_headers(), **HTTPCache.conditional_headers(cached))
+                    started = time.monotonic()
+                    timeout = aiohttp.ClientTimeout(total=retry.timeout(self.timeout))
+                    async with self._session.get(url, headers=headers, timeout=timeout) as response:
+                        if self.rate_limiter is not None:
+                            self.rate_limiter.feedback(url, response.status, time.monotonic() - started,
+                                                       response.headers.get('Retry-After'))
+                        if cached and response.status == 304:
+                            logger.info(f"{url} not modified, serving the cached copy")
+                            await asyncio.to_thread(self.http_cache.refresh, cached, response.headers)
+                            return cached['text']
+                        response.raise_for_status()
+                        text = await response.text(errors='replace')
+                        if self.http_cache is not None:
+                            await asyncio.to_thread(self.http_cache.store, url, self.headers, response.headers, text)
+                        return text
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                wait_time = retry.next_delay(e)
+                if wait_time is None:
+                    break
+                await asyncio.sleep(wait_time)
+
+        logger.error(f"Failed to fetch {url} after {retry.attempts} attempt(s).")
+        return None
+
+    async def fetch_many(self, urls, checkpoint=None):
+        """Fetch several URLs concurrently, returning {url: content} for the successful ones
+
+        With a ``checkpoint``, URLs it already holds are read from it and the
+        others are recorded in it as they arrive.
+        """
+        urls = list(dict.fromkeys(urls))
+        if checkpoint is None:
+            fetches = (self.fetch(url) for url in urls)
+        else:
+            fetches = (checkpoint.fetch(self, url) for url in urls)
+        contents = await asyncio.gather(*fetches, return_exceptions=True)
+
+        results = {}
+        for url, content in zip(urls, contents):
+            if isinstance(content, Exception):
+                logger.error(f"Exception extracting {url}: {content}")
+            elif content:
+                results[url] = content
+                logger.info(f"Successfully extracted data from {url}")
+            else:
+                logger.warning(f"No content extracted from {url}")
+        return results
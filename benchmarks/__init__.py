@@ -0,0 +1,4 @@
+"""Performance benchmarks for the web scraping agent
+
+Run from the repository root, e.g. ``python -m benchmarks.bench_parsers``.
+"""
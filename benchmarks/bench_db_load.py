@@ -0,0 +1,72 @@
+"""Time load_to_database on a large synthetic extraction and check reloads are idempotent
+
+Usage:
+    python -m benchmarks.bench_db_load [--items N] [--mode append|upsert] [--db PATH]
+
+About N records (strings, product dictionaries and table cells) are loaded into a
+fresh SQLite file, then loaded again: the second load must not add any row.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+
+from db_loader import LOAD_MODES
+from web_scraping_agent import WebScrapingAgent
+
+
+def synthetic_records(num_items=1_000_000):
+    """Transformed-data-shaped output with ``num_items`` distinct records"""
+    share = num_items // 4
+    return {
+        'Titres': [f"Titre {i}" for i in range(share)],
+        'Paragraphes': [f"Paragraphe {i} : livraison le 2021-12-31 pour €{i % 1000},99" for i in range(share)],
+        'Produits': [{'titre': f"Produit {i}", 'prix': f"€{i % 5000},{i % 100:02d}", 'image': f"/img/{i}.jpg"}
+                     for i in range(share)],
+        'Tableaux': [[[f"T{t}", f"L{r}", f"{r * t}"] for r in range(100)] for t in range(share // 300)],
+    }
+
+
+def row_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1_000_000)
+    parser.add_argument('--mode', choices=LOAD_MODES, default='append')
+    parser.add_argument('--db', help="SQLite file to load into (default: a temporary file)")
+    args = parser.parse_args()
+
+    logging.getLogger("WebScraperETL").setLevel(logging.WARNING)
+    agent = WebScrapingAgent()
+    data = synthetic_records(args.items)
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    timings = []
+    counts = []
+    for _ in range(2):
+        start = time.perf_counter()
+        if not agent.load_to_database(data, db_path, mode=args.mode):
+            raise SystemExit("load failed, see web_scraper.log")
+        timings.append(time.perf_counter() - start)
+        counts.append(row_counts(db_path))
+
+    print(f"{args.items} records, mode {args.mode}, {db_path}\n")
+    print(f"first load  {timings[0]:>8.2f} s")
+    print(f"second load {timings[1]:>8.2f} s")
+    print()
+    for table, count in counts[0].items():
+        print(f"{table:<28} {count:>10} rows")
+    print(f"\nreload added no rows: {'yes' if counts[0] == counts[1] else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Compare the JSON serializers fast_json can use on a large task result
+
+Usage:
+    python -m benchmarks.bench_json [--items N] [--repeat N]
+
+The transformed extraction of about N records is the payload the API sends:
+JobQueue.complete serializes it once and /api/tasks/{id}/result serves it
+as stored. It is serialized compactly (job results, WebSocket messages, JSON
+Lines), with 2-space indent (JSON export) and parsed back, with every
+installed backend; 'json' is the standard library fallback. The result must
+parse back identical each way, and every body must be as large as the
+standard library's, so a payload that lost its records fails loudly.
+"""
+import argparse
+import json
+import logging
+import time
+
+import fast_json
+from benchmarks.bench_transform import synthetic_extraction
+from web_scraping_agent import WebScrapingAgent
+
+# Smallest plausible size of a serialized record of the synthetic extraction
+MIN_BYTES_PER_RECORD = 16
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        output = function()
+    return (time.perf_counter() - start) / repeat, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger("WebScraperETL").setLevel(logging.WARNING)
+    data = WebScrapingAgent().transform_pipeline(synthetic_extraction(args.items))
+    records = sum(len(value) for key, value in data.items() if key != '_metadata')
+    expected_size = len(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    if records == 0 or expected_size < records * MIN_BYTES_PER_RECORD:
+        raise SystemExit(f"payload too small: {records} records in {expected_size} bytes")
+
+    timings = {}
+    sizes = {}
+    for name in fast_json.BACKENDS:
+        try:
+            fast_json.use_backend(name)
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+            continue
+        dumps_seconds, body = timed(lambda: fast_json.dumps(data), args.repeat)
+        indent_seconds, _ = timed(lambda: fast_json.dumps(data, indent=True), args.repeat)
+        loads_seconds, parsed = timed(lambda: fast_json.loads(body), args.repeat)
+        if parsed != data:
+            raise SystemExit(f"{name}: result does not round-trip")
+        if abs(len(body) - expected_size) > expected_size // 100:
+            raise SystemExit(f"{name}: {len(body)} bytes serialized, expected about {expected_size}")
+        timings[name] = {'dumps': dumps_seconds, 'indent': indent_seconds, 'loads': loads_seconds}
+        sizes[name] = len(body)
+    fast_json.use_backend()
+
+    print(f"\nTask result with {records} records, {sizes['json'] / 1e6:.1f} MB, {args.repeat} run(s)\n")
+    print(f"{'backend':<10} {'dumps':>9} {'indent=2':>9} {'loads':>9}")
+    for name, steps in timings.items():
+        print(f"{name:<10} {steps['dumps']:>8.3f}s {steps['indent']:>8.3f}s {steps['loads']:>8.3f}s")
+    reference = timings['json']
+    print()
+    for name, steps in timings.items():
+        if name != 'json':
+            print(f"{name:<10} {reference['dumps'] / steps['dumps']:>5.1f}x faster to serialize, "
+                  f"{reference['indent'] / steps['indent']:>5.1f}x with indent, "
+                  f"{reference['loads'] / steps['loads']:>5.1f}x to parse than json")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Compare parse and extract times of the available HTML parser backends
+
+Usage:
+    python -m benchmarks.bench_parsers [--corpus DIR] [--repeat N]
+
+Without --corpus a synthetic catalogue page is used. Every backend's analysis and
+extraction output is checked against html.parser and mismatches are reported.
+"""
+import argparse
+import time
+
+from benchmarks.corpus import load_corpus, synthetic_catalogue_page
+from web_scraping_agent import WebScrapingAgent, available_parser_backends
+
+ELEMENTS = ['Titres', 'Paragraphes', 'Liens', 'Images', 'Tableaux', 'Prix', 'Produits']
+
+
+def run_backend(backend, pages, repeat):
+    """Return (parse seconds, extract seconds, outputs) for one backend"""
+    agent = WebScrapingAgent(parser_backend=backend)
+    parse_time = extract_time = 0.0
+    outputs = {}
+
+    for _ in range(repeat):
+        for name, html in pages.items():
+            start = time.perf_counter()
+            document = agent.parse_document(html)
+            parse_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            counts = agent.analyze_page_structure(document)
+            data = agent.extract_data(document, ELEMENTS)
+            extract_time += time.perf_counter() - start
+            outputs[name] = (counts, data)
+
+    return parse_time / repeat, extract_time / repeat, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help="Directory of saved .html pages")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus else {'synthetic': synthetic_catalogue_page()}
+    size_mb = sum(len(html.encode('utf-8')) for html in pages.values()) / 1e6
+    print(f"{len(pages)} page(s), {size_mb:.1f} MB, {args.repeat} run(s)\n")
+    print(f"{'backend':<12} {'parse (s)':>10} {'extract (s)':>12} {'total (s)':>10}  identical")
+
+    reference = None
+    for backend in available_parser_backends():
+        parse_time, extract_time, outputs = run_backend(backend, pages, args.repeat)
+        if reference is None:
+            reference = outputs
+        mismatches = [name for name in pages if outputs[name] != reference[name]]
+        identical = 'yes' if not mismatches else f"no ({', '.join(mismatches)})"
+        print(f"{backend:<12} {parse_time:>10.3f} {extract_time:>12.3f} {parse_time + extract_time:>10.3f}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Compare the fused and columnar transform_pipeline with the step-by-step chain
+
+Usage:
+    python -m benchmarks.bench_transform [--items N] [--repeat N]
+
+A synthetic extraction of about N items (strings, product dictionaries and table
+cells containing HTML, dates and prices) is transformed each way and the outputs
+are checked to be identical.
+"""
+import argparse
+import logging
+import random
+import time
+
+from web_scraping_agent import WebScrapingAgent
+
+SAMPLES = [
+    "  Livraison   le 31/12/2021  ",
+    "<b>Promo</b> à €1.234,56 seulement",
+    "Mis à jour 2021-12-31, prix $1,234.56",
+    "Texte sans date ni prix\n\tsur deux lignes",
+    "Publié le 05-03-2022 pour £12,50",
+    "Ref 2022/01/15 <i>épuisé</i>",
+    "",
+]
+
+
+def synthetic_extraction(num_items=100_000, seed=0):
+    """Build extract_data-shaped output with roughly ``num_items`` leaf items"""
+    rng = random.Random(seed)
+    share = num_items // 4
+    return {
+        'Titres': [rng.choice(SAMPLES) for _ in range(share)],
+        'Paragraphes': [rng.choice(SAMPLES) * 2 for _ in range(share)],
+        'Produits': [
+            {'titre': rng.choice(SAMPLES), 'prix': f"€{rng.randint(1, 9999)},{rng.randint(0, 99):02d}"}
+            for _ in range(share // 2)
+        ],
+        'Tableaux': [
+            [[rng.choice(SAMPLES) for _ in range(4)] for _ in range(share // 40)]
+            for _ in range(10)
+        ],
+    }
+
+
+def strip_metadata(data):
+    return {key: value for key, value in data.items() if key != '_metadata'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger("WebScraperETL").setLevel(logging.WARNING)
+    agent = WebScrapingAgent(transform_mode='row')
+    columnar_agent = WebScrapingAgent(transform_mode='columnar')
+    data = synthetic_extraction(args.items)
+
+    timings = {}
+    outputs = {}
+    pipelines = (
+        ('stepwise', agent._transform_stepwise),
+        ('fused', agent.transform_pipeline),
+        ('columnar', columnar_agent.transform_pipeline),
+    )
+    for name, pipeline in pipelines:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            outputs[name] = pipeline(data)
+        timings[name] = (time.perf_counter() - start) / args.repeat
+
+    print(f"{args.items} items, {args.repeat} run(s)\n")
+    for name, seconds in timings.items():
+        print(f"{name:<10} {seconds:>8.3f} s")
+    reference = strip_metadata(outputs['stepwise'])
+    print()
+    for name in ('fused', 'columnar'):
+        identical = strip_metadata(outputs[name]) == reference
+        print(f"{name:<10} {timings['stepwise'] / timings[name]:>7.1f}x faster, identical: {'yes' if identical else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Check that incremental extraction gives the same data as the full pipeline
+
+Usage:
+    python -m benchmarks.check_incremental [--pages N] [--products N]
+
+Synthetic catalogue pages are extracted with extract_incremental against a
+fresh page store, in both transform modes. For each mode the script checks
+that the output equals transform_pipeline(extract_from_documents(...)) in
+three cases:
+
+- every page is new;
+- no page changed, so every page reuses its stored records;
+- one page changed.
+
+The pages are large enough for the columnar engine to be used. The script
+exits with status 1 on any mismatch.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+
+from benchmarks.corpus import synthetic_catalogue_page
+from page_store import PageStore
+from web_scraping_agent import TRANSFORM_MODES, WebScrapingAgent
+
+ELEMENTS = ['Titres', 'Paragraphes', 'Liens', 'Images', 'Tableaux', 'Prix', 'Produits']
+
+
+def strip_metadata(data):
+    return {key: value for key, value in data.items() if key != '_metadata'}
+
+
+def check_mode(transform_mode, pages, directory):
+    """Return a list of problems found for one transform mode"""
+    store = PageStore(os.path.join(directory, f"{transform_mode}.db"))
+    agent = WebScrapingAgent(transform_mode=transform_mode, page_store=store)
+    problems = []
+
+    def compare(label, pages, expected_changes):
+        expected = strip_metadata(agent.transform_pipeline(agent.extract_from_documents(list(pages.values()),
+                                                                                         ELEMENTS)))
+        incremental = agent.extract_incremental(list(pages.items()), ELEMENTS)
+        changes = {status: incremental['_metadata']['changes'][status] for status in expected_changes}
+        identical = strip_metadata(incremental) == expected
+        print(f"{transform_mode:<9} {label:<10} changes {changes}, identical: {'yes' if identical else 'no'}")
+        if not identical:
+            problems.append(f"{transform_mode}: {label} output differs from transform_pipeline")
+        if changes != expected_changes:
+            problems.append(f"{transform_mode}: {label} reported {changes}, expected {expected_changes}")
+
+    compare('new', pages, {'new': len(pages), 'changed': 0, 'unchanged': 0})
+    compare('unchanged', pages, {'new': 0, 'changed': 0, 'unchanged': len(pages)})
+    changed = dict(pages)
+    first = next(iter(changed))
+    changed[first] = changed[first].replace('Produit 1<', 'Produit modifié 1<').replace('REF-3<', 'REF-3b<')
+    compare('changed', changed, {'new': 0, 'changed': 1, 'unchanged': len(pages) - 1})
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=4)
+    parser.add_argument('--products', type=int, default=1500)
+    args = parser.parse_args()
+
+    logging.getLogger("WebScraperETL").setLevel(logging.WARNING)
+    pages = {
+        f"https://example.com/catalogue?page={i}": synthetic_catalogue_page(num_products=args.products, seed=i)
+        for i in range(args.pages)
+    }
+
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        for transform_mode in TRANSFORM_MODES:
+            problems.extend(check_mode(transform_mode, pages, directory))
+
+    if problems:
+        print(f"{len(problems)} problem(s):")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("incremental extraction matches the full pipeline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Helpers to load saved pages or generate synthetic catalogue pages for benchmarks"""
+import glob
+import os
+import random
+
+
+def load_corpus(directory):
+    """Load every saved .html/.htm page from a directory"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.htm*'))):
+        with open(path, encoding='utf-8', errors='replace') as file:
+            pages[os.path.basename(path)] = file.read()
+    return pages
+
+
+def synthetic_catalogue_page(num_products=2000, num_rows=500, seed=0):
+    """Build a catalogue-like page with products, prices, links, images and a large table"""
+    rng = random.Random(seed)
+    parts = ['<!DOCTYPE html><html><head><title>Catalogue</title>',
+             '<script>window.__STATE__ = {"price": "$0.00"};</script></head><body>',
+             '<h1>Catalogue</h1><nav><ul>']
+    for i in range(1, 11):
+        parts.append(f'<li><a href="?page={i}">{i}</a></li>')
+    parts.append('<li><a href="?page=2">Suivant &gt;&gt;</a></li></ul></nav>')
+
+    for i in range(num_products):
+        price = f"{rng.randint(1, 2000)},{rng.randint(0, 99):02d}"
+        parts.append(
+            f'<div class="product-card item"><h3 class="title">Produit {i}</h3>'
+            f'<p>Description du produit {i}, disponible le 31/12/2021.</p>'
+            f'<span class="price">€ {price}</span>'
+            f'<a href="/produit/{i}">Voir le produit</a>'
+            f'<img src="/img/{i}.jpg" alt="Produit {i}"></div>'
+        )
+
+    parts.append('<table><tr><th>Référence</th><th>Prix</th><th>Date</th></tr>')
+    for i in range(num_rows):
+        parts.append(f'<tr><td>REF-{i}</td><td>${rng.randint(1, 999)}.{rng.randint(0, 99):02d}</td>'
+                     f'<td>2021-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}</td></tr>')
+    parts.append('</table><form action="/search"><input name="q"></form></body></html>')
+    return ''.join(parts)
@@ -0,0 +1,118 @@
+"""Stress concurrent fetches on one shared WebScrapingAgent
+
+Usage:
+    python -m benchmarks.stress_concurrent_fetch [--requests N] [--threads N]
+
+A local HTTP server echoes back the headers of every request it receives. The
+script calls fetch_page_with_retry and fetch_page from many threads at once
+on a single agent, and checks the following:
+
+- every request carried a complete, known header set;
+- the user agents were rotated evenly;
+- the agent's own headers were never modified.
+
+It exits with status 1 on any inconsistency.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rate_limiter import DomainRateLimiter
+from web_scraping_agent import WebScrapingAgent
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps({'path': self.path, 'headers': dict(self.headers)}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def check_response(agent, path, text):
+    """Return a list of problems found in one echoed request"""
+    if text is None:
+        return [f"{path}: no response"]
+    echoed = json.loads(text)
+    problems = []
+    if echoed['path'] != path:
+        problems.append(f"{path}: answered for {echoed['path']}")
+    user_agent = echoed['headers'].get('User-Agent')
+    if user_agent not in agent.user_agents:
+        problems.append(f"{path}: unexpected User-Agent {user_agent!r}")
+    for name in ('If-None-Match', 'If-Modified-Since'):
+        if name in echoed['headers']:
+            problems.append(f"{path}: stray {name} header")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=100)
+    args = parser.parse_args()
+
+    # Every request must reach the server: no HTTP cache, no politeness limit
+    os.environ['SCRAPER_HTTP_CACHE_DB'] = ''
+    logging.getLogger("WebScraperETL").setLevel(logging.WARNING)
+    # More threads than pooled connections is the point here, not a problem
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), EchoHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    agent = WebScrapingAgent(rate_limiter=DomainRateLimiter(rate=1e6, burst=10 ** 6, max_rate=1e6))
+    original_headers = dict(agent.headers)
+
+    def fetch(i):
+        path = f"/page/{i}"
+        if i % 2:
+            return path, agent.fetch_page_with_retry(base_url + path)
+        return path, agent.fetch_page(base_url + path)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(fetch, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    problems = []
+    rotated = Counter()
+    for i, (path, text) in enumerate(results):
+        problems.extend(check_response(agent, path, text))
+        if text is not None and i % 2:
+            rotated[json.loads(text)['headers'].get('User-Agent')] += 1
+    if agent.headers != original_headers:
+        problems.append("agent.headers was modified")
+    # Every rotated request took its own slot, so the user agents are used evenly
+    if rotated and max(rotated.values()) - min(rotated.values()) > 1:
+        problems.append(f"uneven user agent rotation: {dict(rotated)}")
+
+    print(f"{args.requests} requests on {args.threads} threads in {elapsed:.2f}s")
+    print(f"user agents of retried fetches: {sorted(rotated.values())}")
+    if problems:
+        print(f"{len(problems)} problem(s):")
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("all request headers consistent")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""Exercise the WebDriver pool against a local stub driver, without a browser
+
+Usage:
+    python -m benchmarks.stress_driver_pool [--pages N] [--threads N]
+
+StubDriver answers the few calls the pool and wait_for_page make: readyState
+turns 'complete', resources keep loading, and a selector appears, each after
+a delay. The script checks the following:
+
+- drivers are reused: many pages from many threads start at most ``size`` drivers;
+- a driver is recycled (quit and replaced) after ``max_pages_per_driver`` pages;
+- a driver that crashed while idle or while loading a page is discarded;
+- each wait mode (dom_ready, network_idle, selector) returns once its condition
+  holds, and a selector that never appears times out;
+- extract_with_selenium returns the page source through the pool.
+
+It exits with status 1 on any inconsistency.
+"""
+import argparse
+import itertools
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from driver_pool import WebDriverPool, wait_for_page
+from web_scraping_agent import WebScrapingAgent
+
+
+class StubDriver:
+    """Driver-like object whose page becomes ready, idle and complete after set delays"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, user_agent=None, ready_after=0.05, idle_after=0.3, selector_after=0.2):
+        self.id = next(self._ids)
+        self.user_agent = user_agent
+        self.ready_after = ready_after
+        self.idle_after = idle_after
+        self.selector_after = selector_after
+        self.pages = 0
+        self.crashed = False
+        self.quit_called = False
+        self.url = None
+        self._loaded_at = time.monotonic()
+
+    def get(self, url):
+        if self.crashed:
+            raise RuntimeError("browser crashed")
+        self.url = url
+        self.pages += 1
+        self._loaded_at = time.monotonic()
+
+    def execute_script(self, script, *args):
+        if self.crashed or self.quit_called:
+            raise RuntimeError("browser crashed")
+        elapsed = time.monotonic() - self._loaded_at
+        if script == "return 1":
+            return 1
+        if 'readyState' in script:
+            return 'complete' if elapsed >= self.ready_after else 'loading'
+        if 'querySelector' in script:
+            return args[0] == '#late' and elapsed >= self.selector_after
+        if 'getEntriesByType' in script:
+            # One new resource every 50 ms until the network goes quiet
+            return int(min(elapsed, self.idle_after) / 0.05)
+        raise ValueError(f"unexpected script: {script}")
+
+    @property
+    def page_source(self):
+        return f"<html><body><h1>{self.url}</h1><p>driver {self.id}</p></body></html>"
+
+    def quit(self):
+        self.quit_called = True
+
+
+class StubFactory:
+    """driver_factory recording every driver it starts"""
+
+    def __init__(self, **driver_options):
+        self.driver_options = driver_options
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def __call__(self, user_agent=None):
+        driver = StubDriver(user_agent, **self.driver_options)
+        with self._lock:
+            self.drivers.append(driver)
+        return driver
+
+
+def check_reuse(pages, threads):
+    """Concurrent pages never start more than ``size`` drivers, nor borrow more at once"""
+    factory = StubFactory()
+    pool = WebDriverPool(size=3, max_pages_per_driver=pages + 1, driver_factory=factory)
+    borrowed = peak = 0
+    lock = threading.Lock()
+
+    def load(i):
+        nonlocal borrowed, peak
+        with pool.driver() as driver:
+            with lock:
+                borrowed += 1
+                peak = max(peak, borrowed)
+            driver.get(f"http://stub/{i}")
+            time.sleep(0.005)
+            with lock:
+                borrowed -= 1
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(load, range(pages)))
+    pool.close()
+
+    problems = []
+    if len(factory.drivers) > pool.size:
+        problems.append(f"reuse: {len(factory.drivers)} drivers started for a pool of {pool.size}")
+    if peak > pool.size:
+        problems.append(f"reuse: {peak} drivers borrowed at once for a pool of {pool.size}")
+    if sum(driver.pages for driver in factory.drivers) != pages:
+        problems.append("reuse: pages lost")
+    if not all(driver.quit_called for driver in factory.drivers):
+        problems.append("reuse: close() left drivers running")
+    print(f"reuse: {pages} pages on {threads} threads used {len(factory.drivers)} driver(s), peak {peak} borrowed")
+    return problems
+
+
+def check_recycling(pages=20, max_pages=5):
+    """A driver is quit and replaced once it has served ``max_pages`` pages"""
+    factory = StubFactory()
+    pool = WebDriverPool(size=1, max_pages_per_driver=max_pages, driver_factory=factory)
+    for i in range(pages):
+        with pool.driver() as driver:
+            driver.get(f"http://stub/{i}")
+    pool.close()
+
+    problems = []
+    expected = -(-pages // max_pages)
+    if len(factory.drivers) != expected:
+        problems.append(f"recycling: {len(factory.drivers)} drivers started, expected {expected}")
+    if any(driver.pages > max_pages for driver in factory.drivers):
+        problems.append(f"recycling: a driver served more than {max_pages} pages")
+    if not all(driver.quit_called for driver in factory.drivers):
+        problems.append("recycling: a recycled driver was not quit")
+    print(f"recycling: {pages} pages with max {max_pages} per driver used {len(factory.drivers)} driver(s)")
+    return problems
+
+
+def check_crash_discard():
+    """Crashed drivers are quit and replaced, whether they crashed idle or mid-page"""
+    factory = StubFactory()
+    pool = WebDriverPool(size=1, driver_factory=factory)
+    problems = []
+
+    with pool.driver() as driver:
+        driver.get("http://stub/1")
+    first = factory.drivers[0]
+    first.crashed = True  # Dies while idle in the pool
+    with pool.driver() as driver:
+        if driver is first:
+            problems.append("crash: a driver that crashed while idle was handed out")
+        driver.get("http://stub/2")
+    if not first.quit_called:
+        problems.append("crash: the idle crashed driver was not quit")
+
+    second = factory.drivers[-1]
+    try:
+        with pool.driver() as driver:
+            driver.crashed = True  # Dies while loading a page
+            driver.get("http://stub/3")
+    except RuntimeError:
+        pass
+    if not second.quit_called:
+        problems.append("crash: the driver that crashed mid-page was not quit")
+    with pool.driver() as driver:
+        if driver is second:
+            problems.append("crash: a driver that crashed mid-page was handed out again")
+    stats = pool.stats()
+    if stats['started'] != 1:
+        problems.append(f"crash: pool accounts for {stats['started']} drivers, expected 1")
+    pool.close()
+    print(f"crash: {len(factory.drivers)} driver(s) started, {sum(d.quit_called for d in factory.drivers)} quit")
+    return problems
+
+
+def check_wait_modes():
+    """Each wait strategy returns as soon as its condition holds, not after a fixed sleep"""
+    problems = []
+    cases = [
+        # (wait_for, selector, timeout, expected result, minimum and maximum seconds)
+        ('dom_ready', None, 2, True, 0.05, 0.5),
+        ('network_idle', None, 3, True, 0.3 + 0.5, 1.5),
+        ('selector', '#late', 2, True, 0.2, 0.7),
+        ('selector', '#never', 0.5, False, 0.5, 1.0),
+    ]
+    for wait_for, selector, timeout, expected, minimum, maximum in cases:
+        driver = StubDriver()
+        driver.get("http://stub/wait")
+        start = time.monotonic()
+        result = wait_for_page(driver, wait_for=wait_for, selector=selector, timeout=timeout)
+        elapsed = time.monotonic() - start
+        label = f"{wait_for}{f' {selector}' if selector else ''}"
+        print(f"wait: {label:<20} -> {result} after {elapsed:.2f}s")
+        if result is not expected:
+            problems.append(f"wait: {label} returned {result}, expected {expected}")
+        if not minimum <= elapsed <= maximum:
+            problems.append(f"wait: {label} took {elapsed:.2f}s, expected {minimum}-{maximum}s")
+    return problems
+
+
+def check_agent():
+    """extract_with_selenium borrows from the injected pool and returns the rendered source"""
+    factory = StubFactory()
+    pool = WebDriverPool(size=1, driver_factory=factory)
+    agent = WebScrapingAgent(driver_pool=pool)
+    sources = [agent.extract_with_selenium(f"http://stub/agent/{i}", timeout=2) for i in range(3)]
+    pool.close()
+
+    problems = []
+    if not all(source and f"http://stub/agent/{i}" in source for i, source in enumerate(sources)):
+        problems.append("agent: extract_with_selenium did not return the page source")
+    if len(factory.drivers) != 1:
+        problems.append(f"agent: {len(factory.drivers)} drivers started for 3 pages, expected 1")
+    print(f"agent: 3 pages through extract_with_selenium used {len(factory.drivers)} driver(s)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    logging.getLogger("WebScraperETL").setLevel(logging.ERROR)
+
+    problems = []
+    problems.extend(check_reuse(args.pages, args.threads))
+    problems.extend(check_recycling())
+    problems.extend(check_crash_discard())
+    problems.extend(check_wait_modes())
+    try:
+        import selenium  # noqa: F401
+    except ImportError:
+        print("agent: skipped, selenium is not installed")
+    else:
+        problems.extend(check_agent())
+
+    if problems:
+        print(f"{len(problems)} problem(s):")
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("driver pool consistent")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+
+logger = logging.getLogger("WebScraperETL")
+
+
+def checkpoint_key(kind, **params):
+    """Stable key of a job, so running the same job again resumes it"""
+    payload = json.dumps({'kind': kind, 'params': params}, sort_keys=True, default=str)
+    return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}"
+
+
+class CheckpointStore:
+    """SQLite store of the progress of long-running fetch jobs
+
+    Each job, identified by a key, owns the pages it has fetched (zlib
+    compressed) and, for crawls, a snapshot of its frontier. A restarted
+    job reads them back and only fetches what is missing. A checkpoint not
+    updated for ``ttl`` seconds belongs to an abandoned run: ``open`` discards
+    it and starts the job afresh instead of resuming from stale pages.
+    """
+
+    def __init__(self, db_path='checkpoints.db', flush_every=50, flush_interval=10.0, ttl=7 * 24 * 3600):
+        self.db_path = db_path
+        self.ttl = ttl                          # seconds after which an untouched checkpoint has expired
+        self.flush_every = flush_every          # pages buffered before a checkpoint is written
+        self.flush_interval = flush_interval    # seconds between checkpoint writes
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._schema_ready:
+            # Created on first use so agents that never checkpoint leave no file behind
+            self._init_schema(conn)
+            self._schema_ready = True
+        return conn
+
+    def _init_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                frontier TEXT,
+                seen BLOB,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoint_pages (
+                key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                depth INTEGER NOT NULL DEFAULT 0,
+                content BLOB NOT NULL,
+                PRIMARY KEY (key, url)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoint_pages_seq ON checkpoint_pages (key, seq)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_updated ON checkpoints (updated_at)")
+
+    def open(self, key, kind='job', params=None):
+        """Open the checkpoint of a job, creating it if it is new or has expired"""
+        now = datetime.now().isoformat()
+        cutoff = datetime.fromtimestamp(time.time() - self.ttl).isoformat()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = conn.execute("SELECT 1 FROM checkpoints WHERE key = ? AND updated_at < ?",
+                                   (key, cutoff)).fetchone()
+            if expired:
+                logger.info(f"Discarding the expired checkpoint of {kind} job {key}")
+                conn.execute("DELETE FROM checkpoint_pages WHERE key = ?", (key,))
+                conn.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT OR IGNORE INTO checkpoints (key, kind, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(params or {}, default=str), now, now)
+            )
+            row = conn.execute("SELECT frontier, seen FROM checkpoints WHERE key = ?", (key,)).fetchone()
+            completed = {r['url'] for r in conn.execute("SELECT url FROM checkpoint_pages WHERE key = ?", (key,))}
+            next_seq = conn.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM checkpoint_pages WHERE key = ?",
+                                    (key,)).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        frontier_state = None
+        if row['frontier'] is not None:
+            frontier_state = json.loads(row['frontier'])
+            frontier_state['seen_bits'] = zlib.decompress(row['seen'])
+        if completed or frontier_state:
+            logger.info(f"Resuming {kind} job {key}: {len(completed)} pages already fetched")
+        return Checkpoint(self, key, completed, frontier_state, next_seq=next_seq,
+                          flush_every=self.flush_every, flush_interval=self.flush_interval)
+
+    def save(self, key, pages, frontier_state=None):
+        """Persist fetched pages and the frontier snapshot of a job in one transaction"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO checkpoint_pages (key, url, seq, depth, content) VALUES (?, ?, ?, ?, ?)",
+                [(key, url, seq, depth, zlib.compress(content.encode('utf-8'))) for url, seq, depth, content in pages]
+            )
+            if frontier_state is not None:
+                state = dict(frontier_state)
+                seen = zlib.compress(state.pop('seen_bits'))
+                conn.execute("UPDATE checkpoints SET frontier = ?, seen = ?, updated_at = ? WHERE key = ?",
+                             (json.dumps(state), seen, datetime.now().isoformat(), key))
+            else:
+                conn.execute("UPDATE checkpoints SET updated_at = ? WHERE key = ?", (datetime.now().isoformat(), key))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def page(self, key, url):
+        """Stored content of one page, or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT content FROM checkpoint_pages WHERE key = ? AND url = ?", (key, url)).fetchone()
+        finally:
+            conn.close()
+        return zlib.decompress(row['content']).decode('utf-8') if row else None
+
+    def pages(self, key, after_seq=-1, limit=100):
+        """Stored (seq, url, depth, content) of a job in fetch order, one batch at a time"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT seq, url, depth, content FROM checkpoint_pages WHERE key = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (key, after_seq, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [(row['seq'], row['url'], row['depth'], zlib.decompress(row['content']).decode('utf-8'))
+                for row in rows]
+
+    def delete(self, key):
+        """Forget a job's checkpoint"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM checkpoint_pages WHERE key = ?", (key,))
+            conn.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def purge(self, max_age=None):
+        """Drop checkpoints not updated for ``max_age`` seconds (the store's ttl by default)"""
+        max_age = self.ttl if max_age is None else max_age
+        cutoff = datetime.fromtimestamp(time.time() - max_age).isoformat()
+        conn = self._connect()
+        try:
+            keys = [row['key'] for row in conn.execute("SELECT key FROM checkpoints WHERE updated_at < ?", (cutoff,))]
+        finally:
+            conn.close()
+        for key in keys:
+            self.delete(key)
+        if keys:
+            logger.info(f"Purged {len(keys)} abandoned checkpoints")
+        return len(keys)
+
+
+class Checkpoint:
+    """Progress of one job: pages fetched so far and, for crawls, the frontier
+
+    Fetched pages are buffered with ``record`` and written every
+    ``flush_every`` pages or ``flush_interval`` seconds, whichever comes
+    first, so a crash loses at most that much work.
+    """
+
+    def __init__(self, store, key, completed=(), frontier_state=None, next_seq=0, flush_every=50, flush_interval=10.0):
+        self.store = store
+        self.key = key
+        self.completed = set(completed)
+        self.frontier_state = frontier_state
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._next_seq = next_seq
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def resumed(self):
+        return bool(self.completed or self.frontier_state)
+
+    def __contains__(self, url):
+        return url in self.completed
+
+    def record(self, url, content, depth=0):
+        """Mark a page as fetched (persisted on the next flush)"""
+        with self._lock:
+            if url in self.completed:
+                return
+            self.completed.add(url)
+            self._buffer.append((url, self._next_seq, depth, content))
+            self._next_seq += 1
+
+    def due(self):
+        """Whether enough has been recorded since the last flush"""
+        return len(self._buffer) >= self.flush_every or (
+            self._buffer and time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def _take(self):
+        with self._lock:
+            pages, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            return pages
+
+    def flush(self, frontier_state=None):
+        """Write the buffered pages (and the frontier snapshot) now"""
+        pages = self._take()
+        if pages or frontier_state is not None:
+            self.store.save(self.key, pages, frontier_state)
+
+    async def flush_async(self, frontier_state=None):
+        """flush without blocking the event loop; the buffer is taken before yielding to it"""
+        pages = self._take()
+        if pages or frontier_state is not None:
+            await asyncio.to_thread(self.store.save, self.key, pages, frontier_state)
+
+    async def fetch(self, fetcher, url):
+        """Stored content of a page if an earlier run fetched it, else fetch and record it"""
+        if url in self.completed:
+            content = await asyncio.to_thread(self.store.page, self.key, url)
+            if content is not None:
+                return content
+        content = await fetcher.fetch(url)
+        if content:
+            self.record(url, content)
+            if self.due():
+                await self.flush_async()
+        return content
+
+    async def stored_pages(self, batch_size=100):
+        """Yield the (url, depth, content) of every page an earlier run fetched"""
+        after_seq = -1
+        while True:
+            batch = await asyncio.to_thread(self.store.pages, self.key, after_seq, batch_size)
+            if not batch:
+                return
+            for seq, url, depth, content in batch:
+                after_seq = seq
+                yield url, depth, content
+
+    def clear(self):
+        """Drop the checkpoint once the job has finished"""
+        with self._lock:
+            self._buffer = []
+        self.store.delete(self.key)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_checkpoint_store():
+    """Process-wide checkpoint store, or None if disabled
+
+    Set SCRAPER_CHECKPOINT_DB to an empty string to disable checkpointing.
+    """
+    global _default_store
+    db_path = os.environ.get("SCRAPER_CHECKPOINT_DB", "checkpoints.db")
+    if not db_path:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = CheckpointStore(
+                db_path=db_path,
+                flush_interval=float(os.environ.get("SCRAPER_CHECKPOINT_INTERVAL", 10)),
+                ttl=int(os.environ.get("SCRAPER_CHECKPOINT_TTL", 7 * 24 * 3600))
+            )
+        return _default_store
@@ -0,0 +1,218 @@
+import hashlib
+import heapq
+import itertools
+import math
+import re
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that only track the visitor or carry a server session id and
+# never change the page (generic names such as ref or sid often select content)
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|_ga|phpsessid|jsessionid)$',
+                             re.IGNORECASE)
+
+# Links to files that are not HTML pages, so never worth fetching when crawling
+SKIPPED_EXTENSIONS = frozenset((
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp', '.tif', '.tiff',
+    '.pdf', '.zip', '.gz', '.tgz', '.rar', '.7z', '.tar', '.exe', '.dmg', '.iso',
+    '.mp3', '.mp4', '.avi', '.mov', '.wmv', '.webm', '.ogg', '.wav',
+    '.css', '.js', '.json', '.xml', '.rss', '.woff', '.woff2', '.ttf', '.eot',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.csv',
+))
+
+# URLs that look like product or detail pages are crawled first at a given depth
+PRODUCT_URL_PATTERN = re.compile(r'/(products?|produits?|items?|articles?|p|dp)/|[?&](product|item|id)=', re.IGNORECASE)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Characters kept as-is when re-quoting a path or query component
+_SEGMENT_SAFE = ":@!$&'()*+,;=-._~"
+# '+' stays encoded in queries: servers read a literal '+' as a space
+_QUERY_SAFE = ":@!$'()*,;/?-._~"
+
+
+def canonicalize_url(url, base_url=None):
+    """Canonical form of a link, or None if it is not an http(s) page
+
+    Relative links are resolved against ``base_url``. The scheme and host are
+    lowercased, default ports and fragments are dropped, dot segments are
+    resolved, percent-encoding is normalized, tracking parameters are removed
+    and the remaining query parameters are sorted by name (repeated parameters
+    keep their order), so every spelling of a page maps to one URL.
+    """
+    url = (url or '').strip()
+    if base_url:
+        url = urljoin(base_url, url)
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower().rstrip('.')
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    # urljoin resolves dot segments against a base only, so resolve them here too
+    path = urljoin('/', parts.path or '/')
+    # Segment by segment, so an encoded slash (%2F) stays distinct from a real one
+    path = '/'.join(quote(unquote(segment), safe=_SEGMENT_SAFE) for segment in path.split('/'))
+
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not TRACKING_PARAMS.match(name)]
+    query = urlencode(sorted(query, key=lambda item: item[0]), quote_via=quote, safe=_QUERY_SAFE)
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def url_domain(url):
+    """Host of a URL without a leading ``www.``"""
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_page_url(url):
+    """Whether a canonical URL may be an HTML page (judged by its extension)"""
+    path = urlsplit(url).path.lower()
+    name = path.rsplit('/', 1)[-1]
+    return '.' not in name or name[name.rfind('.'):] not in SKIPPED_EXTENSIONS
+
+
+class BloomFilter:
+    """Fixed-size set of strings answering "seen before?" in O(k)
+
+    The bit array is sized for ``capacity`` items at a false positive rate of
+    ``error_rate``: about 2.4 MB per million URLs at 1e-4, whatever their length.
+    False positives mean a URL is occasionally taken for already seen and
+    skipped. There are no false negatives, so a page is never crawled twice.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=1e-4):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item):
+        """Add an item, returning False if it was (probably) already present"""
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __len__(self):
+        return self.count
+
+
+class CrawlFrontier:
+    """Prioritized queue of URLs still to crawl, with dedupe and scope limits
+
+    Links are canonicalized and admitted once each, per the ``seen`` Bloom
+    filter. They must stay within ``max_depth`` links of a seed and, with
+    ``same_domain``, on a seed's domain (or one of ``allowed_domains``).
+    Shallower URLs come out first. At equal depth, URLs that look like
+    product pages come out ahead of the others.
+    """
+
+    def __init__(self, seeds=(), max_depth=2, same_domain=True, allowed_domains=None,
+                 expected_urls=1_000_000, error_rate=1e-4):
+        self.max_depth = max_depth
+        self.same_domain = same_domain
+        self.allowed_domains = {url_domain(f"http://{domain}") for domain in (allowed_domains or ())}
+        self.seen = BloomFilter(expected_urls, error_rate)
+        self._heap = []
+        self._sequence = itertools.count()
+        for seed in seeds:
+            self.add_seed(seed)
+
+    def add_seed(self, url):
+        """Admit a start URL at depth 0 and allow its domain"""
+        url = canonicalize_url(url)
+        if url is None:
+            return False
+        self.allowed_domains.add(url_domain(url))
+        return self._push(url, 0)
+
+    def priority(self, url, depth):
+        """Sort key of a URL: lower comes out first"""
+        return depth * 2 - (1 if PRODUCT_URL_PATTERN.search(url) else 0)
+
+    def in_scope(self, url, depth):
+        if depth > self.max_depth or not is_page_url(url):
+            return False
+        return not self.same_domain or url_domain(url) in self.allowed_domains
+
+    def add(self, url, depth, base_url=None):
+        """Admit a discovered link if it is in scope and new, returning whether it was queued"""
+        url = canonicalize_url(url, base_url)
+        if url is None or not self.in_scope(url, depth):
+            return False
+        return self._push(url, depth)
+
+    def _push(self, url, depth):
+        if not self.seen.add(url):
+            return False
+        heapq.heappush(self._heap, (self.priority(url, depth), next(self._sequence), url, depth))
+        return True
+
+    def pop(self):
+        """Next (url, depth) to crawl"""
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def stats(self):
+        return {'queued': len(self._heap), 'seen': len(self.seen), 'max_depth': self.max_depth}
+
+    def to_state(self, pending=()):
+        """Snapshot of the frontier for a checkpoint
+
+        ``pending`` (url, depth) pairs, fetches in flight that have already left
+        the queue, are saved as queued so a resumed crawl fetches them again.
+        """
+        queue = [[url, depth] for _, _, url, depth in self._heap]
+        queue.extend([url, depth] for url, depth in pending)
+        return {
+            'queue': queue,
+            'max_depth': self.max_depth,
+            'same_domain': self.same_domain,
+            'allowed_domains': sorted(self.allowed_domains),
+            'seen_capacity': self.seen.capacity,
+            'seen_error_rate': self.seen.error_rate,
+            'seen_count': self.seen.count,
+            'seen_bits': bytes(self.seen.bits),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a frontier saved with ``to_state``"""
+        frontier = cls(max_depth=state['max_depth'], same_domain=state['same_domain'],
+                       allowed_domains=state['allowed_domains'],
+                       expected_urls=state['seen_capacity'], error_rate=state['seen_error_rate'])
+        frontier.seen.bits = bytearray(state['seen_bits'])
+        frontier.seen.count = state['seen_count']
+        for url, depth in state['queue']:
+            heapq.heappush(frontier._heap, (frontier.priority(url, depth), next(frontier._sequence), url, depth))
+        return frontier
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+logger = logging.getLogger("WebScraperETL")
+
+# 'append' adds records not loaded before; 'upsert' also refreshes the ones already there
+LOAD_MODES = ('append', 'upsert')
+DEFAULT_LOAD_MODE = os.environ.get('SCRAPER_DB_LOAD_MODE', 'append')
+
+# Columns every record table has besides the data columns
+BOOKKEEPING_COLUMNS = ('id', 'record_hash', 'first_seen', 'last_seen')
+
+# Hashes looked up per query when checking which tables are already loaded
+LOOKUP_CHUNK = 500
+
+
+_encode_json = json.JSONEncoder(sort_keys=True, ensure_ascii=False).encode
+
+
+def record_hash(item):
+    """Stable hash of a record's content, the key records are deduplicated on"""
+    if not isinstance(item, str):
+        item = _encode_json(item)
+    return hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def column_name(key):
+    """SQL column of a record field, renamed if it clashes with a bookkeeping column"""
+    return f"{key}_value" if key.lower() in BOOKKEEPING_COLUMNS else key
+
+
+def cell_value(value):
+    """SQLite value of a field: text as-is, nested values as JSON"""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+class SQLiteLoader:
+    """Bulk loader of extracted data into SQLite, one table per data element
+
+    Everything is written in a single transaction with executemany. Tables are
+    never dropped: they are created on first use and gain a column when records
+    bring a new field. Each record is keyed by the hash of its content, so
+    loading the same data twice does not duplicate it. In 'upsert' mode records
+    already loaded get their ``last_seen`` refreshed. Tableaux are stored one
+    row per table in ``scraping_tableaux`` and one row per cell in
+    ``scraping_tableaux_cells``.
+    """
+
+    def __init__(self, db_path, mode=DEFAULT_LOAD_MODE, cache_size_mb=64):
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode: {mode}. Choose one of {', '.join(LOAD_MODES)}")
+        self.db_path = db_path
+        self.mode = mode
+        self.cache_size_mb = cache_size_mb
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_mb * 1024}")
+        return conn
+
+    def load(self, data):
+        """Load every data element of ``data``, returning the rows written per table"""
+        now = datetime.now().isoformat()
+        written = {}
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for key, value in data.items():
+                if key.startswith('_') or not value or not isinstance(value, list):  # Skip metadata
+                    continue
+
+                table = f"scraping_{key.lower()}"
+                before = conn.total_changes
+                if all(isinstance(item, str) for item in value):
+                    self._load_values(conn, table, value, now)
+                elif all(isinstance(item, dict) for item in value):
+                    self._load_dicts(conn, table, value, now)
+                elif all(isinstance(item, list) for item in value):
+                    self._load_tables(conn, table, value, now)
+                else:
+                    logger.warning(f"Skipping {key}: mixed record types cannot be loaded")
+                    continue
+                written[table] = conn.total_changes - before
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        for table, count in written.items():
+            logger.info(f"{count} rows written to {table} ({self.mode})")
+        return written
+
+    def _ensure_table(self, conn, table, columns, extra_sql=''):
+        """Create a record table, or add the columns it is missing"""
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote_identifier(table)} ("
+            f"id INTEGER PRIMARY KEY, record_hash BLOB, first_seen TEXT, last_seen TEXT{extra_sql})"
+        )
+        # Tables loaded by earlier versions lack the bookkeeping columns too
+        existing = {row[1].lower() for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})")}
+        for column in ('record_hash', 'first_seen', 'last_seen', *columns):
+            if column.lower() not in existing:
+                column_type = 'BLOB' if column == 'record_hash' else 'TEXT'
+                conn.execute(f"ALTER TABLE {quote_identifier(table)} ADD COLUMN {quote_identifier(column)} {column_type}")
+                existing.add(column.lower())
+        conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {quote_identifier(f'idx_{table}_record_hash')} "
+            f"ON {quote_identifier(table)} (record_hash)"
+        )
+
+    def _insert_sql(self, table, columns):
+        quoted = [quote_identifier(column) for column in ('record_hash', 'first_seen', 'last_seen', *columns)]
+        sql = (f"INSERT INTO {quote_identifier(table)} ({', '.join(quoted)}) "
+               f"VALUES ({', '.join('?' * len(quoted))}) ON CONFLICT (record_hash) DO ")
+        if self.mode == 'append':
+            return sql + "NOTHING"
+        updates = ', '.join(f"{column} = excluded.{column}" for column in quoted[2:])
+        return sql + f"UPDATE SET {updates}"
+
+    def _load_values(self, conn, table, values, now):
+        self._ensure_table(conn, table, ['value'])
+        conn.executemany(self._insert_sql(table, ['value']),
+                         ((record_hash(value), now, now, value) for value in values))
+
+    def _load_dicts(self, conn, table, items, now):
+        # Every field seen in the batch, not only those of the first record
+        fields = list(dict.fromkeys(key for item in items for key in item))
+        columns = [column_name(field) for field in fields]
+        self._ensure_table(conn, table, columns)
+        conn.executemany(
+            self._insert_sql(table, columns),
+            ((record_hash(item), now, now, *(cell_value(item.get(field)) for field in fields)) for item in items)
+        )
+
+    def _load_tables(self, conn, table, tables, now):
+        cells_table = f"{table}_cells"
+        self._ensure_table(conn, table, [], extra_sql=', row_count INTEGER, column_count INTEGER')
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote_identifier(cells_table)} ("
+            f"table_id INTEGER NOT NULL REFERENCES {quote_identifier(table)} (id), "
+            "row_index INTEGER NOT NULL, column_index INTEGER NOT NULL, value TEXT, "
+            "PRIMARY KEY (table_id, row_index, column_index)) WITHOUT ROWID"
+        )
+
+        by_hash = {}
+        for rows in tables:
+            by_hash.setdefault(record_hash(rows), rows)
+        hashes = list(by_hash)
+        existing = set()
+        for start in range(0, len(hashes), LOOKUP_CHUNK):
+            chunk = hashes[start:start + LOOKUP_CHUNK]
+            existing.update(row[0] for row in conn.execute(
+                f"SELECT record_hash FROM {quote_identifier(table)} "
+                f"WHERE record_hash IN ({', '.join('?' * len(chunk))})", chunk
+            ))
+
+        if self.mode == 'upsert' and existing:
+            conn.executemany(f"UPDATE {quote_identifier(table)} SET last_seen = ? WHERE record_hash = ?",
+                             ((now, digest) for digest in existing))
+
+        # Ids are assigned here so cells can reference their table without a lookup;
+        # the transaction's write lock keeps them from being taken concurrently
+        next_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {quote_identifier(table)}").fetchone()[0]
+        new_tables = [(next_id + n, digest, by_hash[digest])
+                      for n, digest in enumerate(digest for digest in hashes if digest not in existing)]
+        conn.executemany(
+            f"INSERT INTO {quote_identifier(table)} (id, record_hash, first_seen, last_seen, row_count, column_count) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((table_id, digest, now, now, len(rows), max((len(row) for row in rows), default=0))
+             for table_id, digest, rows in new_tables)
+        )
+        conn.executemany(
+            f"INSERT INTO {quote_identifier(cells_table)} (table_id, row_index, column_index, value) VALUES (?, ?, ?, ?)",
+            ((table_id, row_index, column_index, cell_value(cell))
+             for table_id, _, rows in new_tables
+             for row_index, row in enumerate(rows)
+             for column_index, cell in enumerate(row))
+        )
@@ -0,0 +1,247 @@
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("WebScraperETL")
+
+WAIT_STRATEGIES = ('dom_ready', 'network_idle', 'selector')
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def _chromedriver():
+    """Resolve the chromedriver binary once per process instead of once per page"""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
+
+
+def create_chrome_driver(user_agent=None):
+    """Launch a headless Chrome WebDriver"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if user_agent:
+        options.add_argument(f"user-agent={user_agent}")
+    return webdriver.Chrome(service=Service(_chromedriver()), options=options)
+
+
+def _poll_until(condition, timeout, poll_interval=0.1):
+    """Poll a condition until it is truthy or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if condition():
+                return True
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+def wait_for_page(driver, wait_for='dom_ready', selector=None, timeout=10, idle_time=0.5):
+    """Wait until a page is ready instead of sleeping for a fixed time
+
+    - ``dom_ready``: document.readyState is 'complete'
+    - ``network_idle``: DOM ready and no new resource requests for ``idle_time`` seconds
+    - ``selector``: DOM ready and an element matches the CSS ``selector``
+
+    Only ``execute_script`` is used, so any driver-like object can be waited on.
+    Returns False if the condition was not met before the timeout.
+    """
+    if wait_for not in WAIT_STRATEGIES:
+        raise ValueError(f"Unknown wait strategy: {wait_for}. Choose one of {', '.join(WAIT_STRATEGIES)}")
+    if wait_for == 'selector' and not selector:
+        raise ValueError("The 'selector' wait strategy requires a CSS selector")
+
+    deadline = time.monotonic() + timeout
+    ready = _poll_until(lambda: driver.execute_script("return document.readyState") == 'complete', timeout)
+    if not ready:
+        return False
+
+    if wait_for == 'selector':
+        return _poll_until(
+            lambda: driver.execute_script("return document.querySelector(arguments[0]) !== null", selector),
+            max(deadline - time.monotonic(), 0)
+        )
+
+    if wait_for == 'network_idle':
+        last_count = None
+        last_change = time.monotonic()
+        while time.monotonic() < deadline:
+            count = driver.execute_script("return performance.getEntriesByType('resource').length")
+            now = time.monotonic()
+            if count != last_count:
+                last_count, last_change = count, now
+            elif now - last_change >= idle_time:
+                return True
+            time.sleep(0.1)
+        return False
+
+    return True
+
+
+class WebDriverPool:
+    """Thread-safe pool of warm WebDriver instances
+
+    Drivers are created lazily up to ``size``, reused across pages, recycled after
+    ``max_pages_per_driver`` pages and discarded when they stop responding.
+    ``driver_factory(user_agent)`` creates a driver; pass a stub factory to test
+    without a browser.
+    """
+
+    def __init__(self, size=2, max_pages_per_driver=50, driver_factory=None,
+                 user_agents=None, acquire_timeout=60):
+        self.size = size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.driver_factory = driver_factory or create_chrome_driver
+        self.user_agents = list(user_agents or [])
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = []
+        self._page_counts = {}
+        self._total = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _create_driver(self):
+        user_agent = random.choice(self.user_agents) if self.user_agents else None
+        driver = self.driver_factory(user_agent)
+        self._page_counts[id(driver)] = 0
+        logger.info("Started a new WebDriver for the pool")
+        return driver
+
+    @staticmethod
+    def is_alive(driver):
+        """Check that the browser session still answers"""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _forget(self, driver):
+        """Drop a driver from the pool's accounting (caller holds the lock)"""
+        self._page_counts.pop(id(driver), None)
+        self._total -= 1
+        self._condition.notify()
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver for one page"""
+        driver = self._acquire()
+        healthy = False
+        try:
+            yield driver
+            healthy = True
+        finally:
+            self._release(driver, healthy)
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError("WebDriver pool is closed")
+                if self._idle:
+                    driver = self._idle.pop()
+                elif self._total < self.size:
+                    self._total += 1
+                    driver = None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free WebDriver")
+                    self._condition.wait(remaining)
+                    continue
+
+            if driver is None:
+                # Launch outside the lock: browser start-up is slow
+                try:
+                    return self._create_driver()
+                except Exception:
+                    with self._condition:
+                        self._total -= 1
+                        self._condition.notify()
+                    raise
+
+            if self.is_alive(driver):
+                return driver
+            logger.warning("Discarding crashed WebDriver")
+            with self._condition:
+                self._forget(driver)
+            self._quit(driver)
+
+    def _release(self, driver, healthy):
+        alive = healthy or self.is_alive(driver)
+        with self._condition:
+            pages = self._page_counts.get(id(driver), 0) + 1
+            self._page_counts[id(driver)] = pages
+            if self._closed or not alive:
+                retire = True
+            elif pages >= self.max_pages_per_driver:
+                logger.info(f"Recycling WebDriver after {pages} pages")
+                retire = True
+            else:
+                retire = False
+                self._idle.append(driver)
+                self._condition.notify()
+            if retire:
+                self._forget(driver)
+        if retire:
+            self._quit(driver)
+
+    def stats(self):
+        """Current pool occupancy"""
+        with self._condition:
+            return {'size': self.size, 'started': self._total, 'idle': len(self._idle)}
+
+    def close(self):
+        """Quit every idle driver; borrowed drivers are quit when returned"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for driver in idle:
+                self._forget(driver)
+            self._condition.notify_all()
+        for driver in idle:
+            self._quit(driver)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool(user_agents=None):
+    """Process-wide WebDriver pool shared by every agent"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WebDriverPool(
+                size=int(os.environ.get("SCRAPER_SELENIUM_POOL_SIZE", 2)),
+                max_pages_per_driver=int(os.environ.get("SCRAPER_SELENIUM_MAX_PAGES", 50)),
+                user_agents=user_agents
+            )
+            atexit.register(_default_pool.close)
+        return _default_pool
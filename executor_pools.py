@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class InstrumentedExecutor:
+    """Bounded thread pool for running blocking work off the event loop
+
+    At most ``max_workers + max_queue`` calls are admitted at once; further callers
+    wait on the event loop until a slot frees up, which gives natural backpressure.
+    Queue depth, active workers and wait times are tracked so the pools can be sized
+    from real traffic.
+    """
+
+    def __init__(self, name, max_workers, max_queue=None):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue if max_queue is not None else max_workers * 4
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._admission = None
+        self._lock = threading.Lock()
+
+        self.waiting = 0        # callers waiting for admission
+        self.queued = 0         # admitted, waiting for a worker thread
+        self.active = 0         # running on a worker thread
+        self.completed = 0
+        self.failed = 0
+        self.peak_queued = 0
+        self._total_queue_time = 0.0
+        self._total_run_time = 0.0
+
+    def _admission_semaphore(self):
+        if self._admission is None:
+            self._admission = asyncio.Semaphore(self.max_workers + self.max_queue)
+        return self._admission
+
+    async def run(self, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        admission = self._admission_semaphore()
+
+        with self._lock:
+            self.waiting += 1
+        try:
+            await admission.acquire()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+        submitted_at = time.monotonic()
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        def call():
+            started_at = time.monotonic()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self._total_queue_time += started_at - submitted_at
+            succeeded = False
+            try:
+                result = func(*args, **kwargs)
+                succeeded = True
+                return result
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self._total_run_time += time.monotonic() - started_at
+                    if succeeded:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            admission.release()
+
+    def metrics(self):
+        """Snapshot of the pool's queue depth and timings"""
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'waiting': self.waiting,
+                'queued': self.queued,
+                'active': self.active,
+                'peak_queued': self.peak_queued,
+                'completed': self.completed,
+                'failed': self.failed,
+                'avg_queue_time_ms': round(self._total_queue_time / finished * 1000, 2) if finished else 0.0,
+                'avg_run_time_ms': round(self._total_run_time / finished * 1000, 2) if finished else 0.0,
+            }
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=wait)
+
+
+def run_sync(coroutine):
+    """Run a coroutine to completion from synchronous code and return its result
+
+    Outside an event loop this is ``asyncio.run``. Called from a running loop
+    (async code, notebooks), where ``asyncio.run`` raises, the coroutine runs on
+    its own loop in a helper thread while the caller blocks; async callers
+    should prefer the ``*_async`` variant instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-sync") as executor:
+        return executor.submit(asyncio.run, coroutine).result()
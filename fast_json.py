@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger("WebScraperETL")
+
+# Serializers tried in order when none is chosen: orjson, then msgspec, then the standard library
+PREFERRED_BACKENDS = ('orjson', 'msgspec', 'json')
+
+
+def _default(value):
+    """Fallback for values JSON has no type for (dates as ISO 8601, anything else as text)"""
+    isoformat = getattr(value, 'isoformat', None)
+    return isoformat() if isoformat is not None else str(value)
+
+
+def _orjson_backend():
+    import orjson
+
+    options = orjson.OPT_NON_STR_KEYS
+    indented = options | orjson.OPT_INDENT_2
+
+    def dumps(value, indent=False):
+        return orjson.dumps(value, default=_default, option=indented if indent else options)
+
+    return dumps, orjson.loads
+
+
+def _msgspec_backend():
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    decoder = msgspec.json.Decoder()
+
+    def dumps(value, indent=False):
+        data = encoder.encode(value)
+        return msgspec.json.format(data, indent=2) if indent else data
+
+    return dumps, decoder.decode
+
+
+def _stdlib_backend():
+    compact = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default)
+    indented = json.JSONEncoder(ensure_ascii=False, indent=2, default=_default)
+
+    def dumps(value, indent=False):
+        return (indented if indent else compact).encode(value).encode('utf-8')
+
+    return dumps, json.loads
+
+
+BACKENDS = {
+    'orjson': _orjson_backend,
+    'msgspec': _msgspec_backend,
+    'json': _stdlib_backend,
+}
+
+backend = None
+_dumps = _loads = None
+
+
+def use_backend(name=None):
+    """Select the JSON serializer, returning its name
+
+    ``name`` must be installed. Without it, SCRAPER_JSON_BACKEND is tried, then
+    the fastest installed serializer of PREFERRED_BACKENDS.
+    """
+    global backend, _dumps, _loads
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend: {name}. Choose one of {', '.join(BACKENDS)}")
+        _dumps, _loads = BACKENDS[name]()
+        backend = name
+        return backend
+
+    configured = os.environ.get('SCRAPER_JSON_BACKEND')
+    if configured and configured not in BACKENDS:
+        logger.warning(f"Unknown JSON backend {configured}, using the fastest installed one")
+    candidates = ((configured,) if configured in BACKENDS else ()) + PREFERRED_BACKENDS
+    for candidate in candidates:
+        try:
+            _dumps, _loads = BACKENDS[candidate]()
+        except ImportError:
+            if candidate == configured:
+                logger.warning(f"JSON backend {configured} is not installed, falling back")
+            continue
+        backend = candidate
+        return backend
+
+
+def dumps(value, indent=False):
+    """Serialize to UTF-8 JSON bytes (non-ASCII characters kept as-is, 2-space indent if asked)"""
+    return _dumps(value, indent)
+
+
+def dumps_text(value, indent=False):
+    """Serialize to a JSON string"""
+    return _dumps(value, indent).decode('utf-8')
+
+
+def loads(data):
+    """Parse JSON from bytes or a string"""
+    return _loads(data)
+
+
+use_backend()
@@ -45,7 +45,7 @@ const API = () => {
         { name: 'use_selenium', type: 'boolean', required: false, description: 'Utiliser Selenium pour les sites dynamiques' },
         { name: 'handle_pagination', type: 'boolean', required: false, description: 'Activer l\'extraction de plusieurs pages' },
         { name: 'max_pages', type: 'integer', required: false, description: 'Nombre maximum de pages à extraire' },
-        { name: 'output_format', type: 'string', required: false, description: 'Format d\'export (JSON, CSV, Excel, Texte)' }
+        { name: 'output_format', type: 'string', required: false, description: 'Format d\'export (JSON, CSV, Excel, Texte, JSON Lines, Parquet, Arrow)' }
       ],
       returns: '{ "task_id": "string", "message": "string" }'
     },
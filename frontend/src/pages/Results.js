@@ -64,12 +64,19 @@ const Results = () => {
       try {
         setLoading(true);
         const response = await axios.get(`${API_BASE_URL}/tasks/${taskId}`);
-        setTaskData(response.data);
+        const task = response.data;
+        
+        // Le statut est léger: le résultat complet est servi par un endpoint dédié
+        if (task.result_summary) {
+          const resultResponse = await axios.get(`${API_BASE_URL}/tasks/${taskId}/result`);
+          task.result = resultResponse.data;
+        }
+        setTaskData(task);
         
         // Extraire les champs disponibles pour filtrage
-        if (response.data.result) {
+        if (task.result) {
           const fields = [];
-          Object.entries(response.data.result).forEach(([key, value]) => {
+          Object.entries(task.result).forEach(([key, value]) => {
             fields.push(key);
             if (selectedFields.length === 0) {
               setSelectedFields([key]); // Sélectionner le premier champ par défaut
@@ -273,6 +273,11 @@ const Settings = () => {
                   <MenuItem value="CSV">CSV</MenuItem>
                   <MenuItem value="Excel">Excel</MenuItem>
                   <MenuItem value="Texte">Texte</MenuItem>
+                  <MenuItem value="JSON Lines">JSON Lines</MenuItem>
+                  <MenuItem value="JSON Lines (gzip)">JSON Lines (gzip)</MenuItem>
+                  <MenuItem value="JSON Lines (zstd)">JSON Lines (zstd)</MenuItem>
+                  <MenuItem value="Parquet">Parquet</MenuItem>
+                  <MenuItem value="Arrow">Arrow</MenuItem>
                 </Select>
               </FormControl>
             </Grid>
@@ -0,0 +1,333 @@
+import email.utils
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger("WebScraperETL")
+
+# Request headers that select a different representation of the same URL
+KEY_HEADERS = ('Accept', 'Accept-Language')
+
+# Headers a response may Vary on and still be cached: those of the key, plus
+# Accept-Encoding since bodies are stored decoded. Any other (User-Agent, which
+# is rotated per request, Cookie...) could serve one variant to another request.
+CACHEABLE_VARY = frozenset(name.lower() for name in KEY_HEADERS + ('Accept-Encoding',))
+
+# Stores between two exact size checks, which also account for entries other processes wrote
+EVICTION_CHECK_EVERY = 200
+# Once over max_bytes, entries are evicted down to this share of it, leaving room for the next stores
+EVICTION_LOW_WATER = 0.9
+
+# Failures of the cache database (locked, corrupt) or of a stored entry, after
+# which the cache is bypassed rather than failing the fetch
+CACHE_ERRORS = (sqlite3.Error, zlib.error, UnicodeDecodeError, ValueError)
+
+# Response headers kept with a cached body
+STORED_HEADERS = ('Cache-Control', 'Content-Type', 'ETag', 'Expires', 'Last-Modified', 'Vary')
+
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header into {directive: value or True}"""
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else True
+    return directives
+
+
+def _stored_headers(response_headers):
+    """Caching-related headers of a response, under their canonical names"""
+    headers = {}
+    for name in STORED_HEADERS:
+        # requests and aiohttp header mappings are both case-insensitive
+        value = response_headers.get(name)
+        if value is not None:
+            headers[name] = value
+    return headers
+
+
+def _http_date(value):
+    """Parse an HTTP date into a timestamp, or None"""
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return parsed.timestamp() if parsed else None
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPCache:
+    """On-disk HTTP response cache with conditional revalidation
+
+    Successful GET responses are stored in SQLite, keyed by URL and the
+    ``KEY_HEADERS`` request headers, with the body zlib-compressed. A response is
+    served without contacting the origin while it is fresh according to
+    Cache-Control max-age or Expires. Once stale it is revalidated with
+    If-None-Match / If-Modified-Since, so an unchanged page costs a bodiless 304.
+    ``no-store`` responses and those that Vary on a request header outside
+    ``CACHEABLE_VARY`` are never stored. ``no-cache`` responses are always
+    revalidated. When the stored bodies exceed ``max_bytes`` the least recently
+    used entries are evicted. Database errors are logged and treated as a miss,
+    so the page is fetched from the network.
+    """
+
+    def __init__(self, db_path='http_cache.db', max_bytes=256 * 1024 * 1024, default_ttl=0):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl  # freshness of responses without caching headers
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._schema_ready = False
+        # Running estimate of the stored size, so eviction only scans the table when it may be needed
+        self._size_estimate = None
+        self._stores_since_check = 0
+        self._size_lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._schema_ready:
+            # Created on first use so agents that never fetch leave no file behind
+            self._init_schema(conn)
+            self._schema_ready = True
+        return conn
+
+    def _init_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+
+    @staticmethod
+    def cache_key(url, request_headers=None):
+        """Key of a URL and the request headers that affect its representation"""
+        headers = {name.lower(): value for name, value in (request_headers or {}).items()}
+        parts = [url] + [f"{name}:{headers.get(name.lower(), '')}" for name in KEY_HEADERS]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def _freshness(self, response_headers, now):
+        """Expiry timestamp of a response, or None if it must not be stored"""
+        directives = parse_cache_control(response_headers.get('Cache-Control'))
+        if 'no-store' in directives:
+            return None
+        vary = {name.strip().lower() for name in response_headers.get('Vary', '').split(',') if name.strip()}
+        if not vary <= CACHEABLE_VARY:  # Includes Vary: *
+            return None
+        if 'no-cache' in directives:
+            return now
+        max_age = directives.get('max-age')
+        if max_age is not None and max_age is not True:
+            try:
+                return now + max(int(max_age), 0)
+            except ValueError:
+                return now
+        expires = response_headers.get('Expires')
+        if expires is not None:
+            expires_at = _http_date(expires)
+            return expires_at if expires_at is not None else now
+        return now + self.default_ttl
+
+    def lookup(self, url, request_headers=None):
+        """Return the cached entry for a URL, or None
+
+        The entry is a dict with the decoded ``text``, whether it is still
+        ``fresh``, and the validators needed to revalidate it.
+        """
+        try:
+            return self._lookup(url, request_headers)
+        except CACHE_ERRORS as e:
+            logger.warning(f"HTTP cache lookup failed for {url}, fetching from the network: {e}")
+            return None
+
+    def _lookup(self, url, request_headers):
+        key = self.cache_key(url, request_headers)
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT key, headers, body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        finally:
+            conn.close()
+
+        fresh = row['expires_at'] > now
+        if fresh:
+            self.hits += 1
+        return {
+            'key': row['key'],
+            'text': zlib.decompress(row['body']).decode('utf-8'),
+            'fresh': fresh,
+            'etag': row['etag'],
+            'last_modified': row['last_modified'],
+            'headers': json.loads(row['headers']),
+        }
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Validators to send when revalidating a stale entry"""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, request_headers, response_headers, text):
+        """Store a successful response if its caching headers allow it"""
+        try:
+            return self._store(url, request_headers, response_headers, text)
+        except CACHE_ERRORS as e:
+            logger.warning(f"Could not store {url} in the HTTP cache: {e}")
+            return False
+
+    def _store(self, url, request_headers, response_headers, text):
+        now = time.time()
+        expires_at = self._freshness(response_headers, now)
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if expires_at is None or (expires_at <= now and not etag and not last_modified):
+            # Not storable, or stale at once with nothing to revalidate it against
+            return False
+
+        body = zlib.compress(text.encode('utf-8'))
+        headers = _stored_headers(response_headers)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, headers, body, size, etag, last_modified, "
+                "stored_at, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.cache_key(url, request_headers), url, json.dumps(headers), body, len(body),
+                 etag, last_modified, now, expires_at, now)
+            )
+        finally:
+            conn.close()
+        if self._grow_estimate(len(body)):
+            self.evict()
+        return True
+
+    def _grow_estimate(self, size):
+        """Count a stored body, returning whether the size should be checked exactly
+
+        Replaced entries are not subtracted, so the estimate only errs high.
+        """
+        with self._size_lock:
+            self._stores_since_check += 1
+            if self._size_estimate is None or self._stores_since_check >= EVICTION_CHECK_EVERY:
+                return True
+            self._size_estimate += size
+            return self._size_estimate > self.max_bytes
+
+    def refresh(self, entry, response_headers):
+        """Extend a revalidated entry after a 304 Not Modified"""
+        try:
+            self._refresh(entry, response_headers)
+        except CACHE_ERRORS as e:
+            logger.warning(f"Could not refresh a revalidated HTTP cache entry: {e}")
+
+    def _refresh(self, entry, response_headers):
+        now = time.time()
+        self.revalidations += 1
+        # Headers sent with the 304 update the stored ones
+        headers = dict(entry['headers'])
+        headers.update(_stored_headers(response_headers))
+        expires_at = self._freshness(headers, now)
+        conn = self._connect()
+        try:
+            if expires_at is None:
+                conn.execute("DELETE FROM responses WHERE key = ?", (entry['key'],))
+                return
+            conn.execute(
+                "UPDATE responses SET headers = ?, etag = ?, last_modified = ?, expires_at = ?, last_access = ? "
+                "WHERE key = ?",
+                (json.dumps(headers), headers.get('ETag'), headers.get('Last-Modified'), expires_at, now, entry['key'])
+            )
+        finally:
+            conn.close()
+
+    def evict(self):
+        """Drop least recently used entries once the stored bodies exceed max_bytes
+
+        Entries are dropped down to EVICTION_LOW_WATER of max_bytes. This scans
+        the table, so store() only calls it when the running size estimate
+        exceeds max_bytes, and every EVICTION_CHECK_EVERY stores.
+        """
+        conn = self._connect()
+        try:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            evicted = 0
+            if total > self.max_bytes:
+                target = self.max_bytes * EVICTION_LOW_WATER
+                for row in conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+                    if total <= target:
+                        break
+                    conn.execute("DELETE FROM responses WHERE key = ?", (row['key'],))
+                    total -= row['size']
+                    evicted += 1
+                logger.info(f"Evicted {evicted} entries from the HTTP cache")
+        finally:
+            conn.close()
+        with self._size_lock:
+            self._size_estimate = total
+            self._stores_since_check = 0
+        return evicted
+
+    def stats(self):
+        """Entry count, stored size and hit counters of this process"""
+        conn = self._connect()
+        try:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        finally:
+            conn.close()
+        return {
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'revalidations': self.revalidations,
+            'misses': self.misses,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Process-wide HTTP cache shared by every agent, or None if disabled
+
+    Set SCRAPER_HTTP_CACHE_DB to an empty string to disable caching.
+    """
+    global _default_cache
+    db_path = os.environ.get("SCRAPER_HTTP_CACHE_DB", "http_cache.db")
+    if not db_path:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache(
+                db_path=db_path,
+                max_bytes=int(float(os.environ.get("SCRAPER_HTTP_CACHE_MAX_MB", 256)) * 1024 * 1024)
+            )
+        return _default_cache
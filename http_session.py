@@ -0,0 +1,78 @@
+import atexit
+import itertools
+from http.cookiejar import DefaultCookiePolicy
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connection pool sizing shared by the requests session and the aiohttp fetcher
+POOL_PER_HOST = int(os.environ.get("SCRAPER_POOL_PER_HOST", 16))   # keep-alive connections per host
+POOL_HOSTS = int(os.environ.get("SCRAPER_POOL_HOSTS", 100))         # hosts whose pools are kept open
+
+
+def create_adapter(pool_per_host=POOL_PER_HOST, pool_hosts=POOL_HOSTS):
+    """Create a transport adapter with keep-alive connection pools sized for concurrent use"""
+    # No transport-level retries: RetryPolicy (retry_policy.py) is the single place retries happen
+    return HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_per_host, max_retries=0)
+
+
+def create_session(adapter=None, cookies=True):
+    """Create a requests session sending its requests through ``adapter``
+
+    Sessions are cheap and keep their own cookie jar; the connections live in
+    the adapter, which can be shared between sessions (see get_shared_adapter).
+    With ``cookies=False`` the session never stores the cookies it receives.
+    """
+    session = requests.Session()
+    adapter = adapter or create_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not cookies:
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=()))
+    return session
+
+
+class UserAgentRotator:
+    """Round-robin user agent rotation that is safe to share between threads
+
+    ``next()`` on an ``itertools.count`` is a single atomic step under the GIL,
+    so concurrent callers each get their own position without taking a lock.
+    """
+
+    def __init__(self, user_agents):
+        self.user_agents = tuple(user_agents)
+        self._counter = itertools.count()
+
+    def next(self):
+        """The user agent for the next request, or None if there are none"""
+        if not self.user_agents:
+            return None
+        return self.user_agents[next(self._counter) % len(self.user_agents)]
+
+    def headers(self, base_headers):
+        """A fresh copy of ``base_headers`` carrying the next user agent"""
+        headers = dict(base_headers)
+        user_agent = self.next()
+        if user_agent:
+            headers['User-Agent'] = user_agent
+        return headers
+
+
+_shared_adapter = None
+_shared_adapter_lock = threading.Lock()
+
+
+def get_shared_adapter():
+    """Process-wide adapter, so TCP and TLS connections are reused across agents and API calls
+
+    Only the connection pools are shared: each agent mounts this adapter on its
+    own session, so cookies a site sets for one task never reach another.
+    """
+    global _shared_adapter
+    with _shared_adapter_lock:
+        if _shared_adapter is None:
+            _shared_adapter = create_adapter()
+            atexit.register(_shared_adapter.close)
+        return _shared_adapter
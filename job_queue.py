@@ -0,0 +1,490 @@
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+
+import fast_json
+
+logger = logging.getLogger("WebScraperETL")
+
+TERMINAL_STATES = ('completed', 'failed', 'cancelled')
+
+
+class JobQueue:
+    """Durable SQLite-backed job queue with priorities and leases
+
+    Workers lease a job for ``visibility_timeout`` seconds and keep the lease alive
+    with heartbeats. If a worker crashes its lease expires and the job becomes
+    visible again, until ``max_attempts`` is reached.
+    """
+
+    def __init__(self, db_path='scraping_jobs.db', visibility_timeout=300, max_attempts=3,
+                 results_dir='task_results', spill_threshold=256 * 1024, ttl=None, max_entries=None):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.results_dir = results_dir
+        self.spill_threshold = spill_threshold  # results larger than this (bytes) are written to disk
+        self.ttl = ttl                          # seconds finished jobs are kept
+        self.max_entries = max_entries          # maximum number of finished jobs kept
+        self._init_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    progress INTEGER NOT NULL DEFAULT 0,
+                    message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    output_file TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            # Columns added after the first release of the queue
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column in ('result_file TEXT', 'result_summary TEXT'):
+                if column.split()[0] not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (state, priority DESC, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (state, updated_at)")
+        finally:
+            conn.close()
+
+    # Every column except the (possibly large) inline result
+    STATUS_COLUMNS = ("id, kind, payload, priority, state, attempts, max_attempts, lease_owner, lease_expires, "
+                      "progress, message, error, output_file, result_file, result_summary, created_at, updated_at")
+
+    @staticmethod
+    def _row_to_job(row):
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        if job.get('result_summary') is not None:
+            job['result_summary'] = json.loads(job['result_summary'])
+        if 'result' in job:
+            job['result'] = fast_json.loads(job['result']) if job['result'] is not None else None
+        return job
+
+    def enqueue(self, payload, kind='scrape', priority=0, job_id=None):
+        """Add a job to the queue and return its id"""
+        job_id = job_id or str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, priority, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), priority, self.max_attempts, now, now)
+            )
+        finally:
+            conn.close()
+        return job_id
+
+    def lease(self, worker_id):
+        """Lease the highest-priority ready job, or return None if there is none"""
+        conn = self._connect()
+        try:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    f"SELECT {self.STATUS_COLUMNS} FROM jobs "
+                    "WHERE state = 'queued' OR (state = 'running' AND lease_expires < ?) "
+                    "ORDER BY priority DESC, created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                updated_at = datetime.now().isoformat()
+                if row['state'] == 'running' and row['attempts'] >= row['max_attempts']:
+                    # The job's last worker died and it has no attempts left
+                    conn.execute(
+                        "UPDATE jobs SET state = 'failed', error = ?, lease_owner = NULL, updated_at = ? WHERE id = ?",
+                        ("Lease expired after the maximum number of attempts", updated_at, row['id'])
+                    )
+                    conn.execute("COMMIT")
+                    continue
+
+                if row['state'] == 'running':
+                    logger.warning(f"Lease expired for job {row['id']} (owner {row['lease_owner']}), re-leasing")
+
+                conn.execute(
+                    "UPDATE jobs SET state = 'running', lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (worker_id, now + self.visibility_timeout, updated_at, row['id'])
+                )
+                conn.execute("COMMIT")
+                job = self._row_to_job(row)
+                job.update(state='running', lease_owner=worker_id, attempts=row['attempts'] + 1)
+                return job
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id, worker_id):
+        """Extend the lease of a running job; returns False if the lease was lost"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND state = 'running'",
+                (time.time() + self.visibility_timeout, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def update_progress(self, job_id, progress, message):
+        """Record the progress of a running job"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = ?, updated_at = ? WHERE id = ? AND state = 'running'",
+                (progress, message, datetime.now().isoformat(), job_id)
+            )
+        finally:
+            conn.close()
+
+    def set_output_file(self, job_id, output_file):
+        """Record the output file(s) a running job is writing, so they can be read before it completes"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET output_file = ?, updated_at = ? WHERE id = ? AND state = 'running'",
+                (output_file, datetime.now().isoformat(), job_id)
+            )
+        finally:
+            conn.close()
+
+    def complete(self, job_id, result=None, output_file=None, message=None):
+        """Mark a running job as completed, spilling large results to disk"""
+        inline_result = result_file = summary = None
+        if result is not None:
+            serialized = fast_json.dumps(result)
+            summary = json.dumps({key: len(value) if isinstance(value, (list, dict)) else 1
+                                  for key, value in result.items()})
+            if len(serialized) > self.spill_threshold:
+                os.makedirs(self.results_dir, exist_ok=True)
+                result_file = os.path.join(self.results_dir, f"{job_id}.json")
+                with open(result_file, 'wb') as file:
+                    file.write(serialized)
+            else:
+                inline_result = serialized.decode('utf-8')
+
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'completed', progress = 100, message = ?, result = ?, result_file = ?, "
+                "result_summary = ?, output_file = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND state = 'running'",
+                (message, inline_result, result_file, summary, output_file, datetime.now().isoformat(), job_id)
+            )
+        finally:
+            conn.close()
+
+        if cursor.rowcount == 0 and result_file:
+            # The job was cancelled or re-leased in the meantime
+            self._remove_result_file(result_file)
+
+    def fail(self, job_id, error, retry=False):
+        """Mark a running job as failed, or requeue it if retries remain"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET state = CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                "error = ?, lease_owner = NULL, updated_at = ? WHERE id = ? AND state = 'running'",
+                (retry, error, datetime.now().isoformat(), job_id)
+            )
+        finally:
+            conn.close()
+
+    def cancel(self, job_id, message=None):
+        """Cancel a job that has not finished yet"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'cancelled', message = COALESCE(?, message), lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND state IN ('queued', 'running')",
+                (message, datetime.now().isoformat(), job_id)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def get(self, job_id):
+        """Return a job's status as a dict (without its result), or None if it does not exist"""
+        conn = self._connect()
+        try:
+            row = conn.execute(f"SELECT {self.STATUS_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._row_to_job(row) if row else None
+        finally:
+            conn.close()
+
+    def load_result(self, job_id):
+        """Return a completed job's result, reading it back from disk if it was spilled"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT result, result_file FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        if row['result_file']:
+            with open(row['result_file'], 'rb') as file:
+                return fast_json.loads(file.read())
+        return fast_json.loads(row['result']) if row['result'] is not None else None
+
+    def load_result_json(self, job_id):
+        """A completed job's result as stored: (JSON text, None) inline, or (None, path) if spilled to disk"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT result, result_file FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None, None
+        return row['result'], row['result_file']
+
+    def result_file(self, job_id):
+        """Path of a job's spilled result, or None if the result is stored inline"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT result_file FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return row['result_file'] if row else None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _remove_result_file(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def purge(self):
+        """Evict finished jobs older than the TTL or beyond max_entries; returns how many were removed"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = []
+            if self.ttl is not None:
+                cutoff = datetime.fromtimestamp(time.time() - self.ttl).isoformat()
+                expired += conn.execute(
+                    "SELECT id, result_file FROM jobs WHERE state IN ('completed', 'failed', 'cancelled') "
+                    "AND updated_at < ?", (cutoff,)
+                ).fetchall()
+            if self.max_entries is not None:
+                expired += conn.execute(
+                    "SELECT id, result_file FROM jobs WHERE state IN ('completed', 'failed', 'cancelled') "
+                    "ORDER BY updated_at DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+                ).fetchall()
+            expired = {row['id']: row['result_file'] for row in expired}
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        for result_file in expired.values():
+            if result_file:
+                self._remove_result_file(result_file)
+        if expired:
+            logger.info(f"Evicted {len(expired)} finished job(s) from the task store")
+        return len(expired)
+
+    def counts(self):
+        """Number of jobs in each state"""
+        conn = self._connect()
+        try:
+            return dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+        finally:
+            conn.close()
+
+
+def queue_db_from_env():
+    """Path of the job queue database (SCRAPER_QUEUE_DB)"""
+    return os.environ.get("SCRAPER_QUEUE_DB", "scraping_jobs.db")
+
+
+def visibility_timeout_from_env():
+    """Seconds before a crashed worker's job is leased again (SCRAPER_JOB_VISIBILITY_TIMEOUT)"""
+    return int(os.environ.get("SCRAPER_JOB_VISIBILITY_TIMEOUT", 300))
+
+
+def queue_options_from_env():
+    """JobQueue result spilling and retention options from the SCRAPER_* environment
+
+    Shared by the API and by standalone workers, so both lease, spill and
+    purge jobs the same way.
+    """
+    return {
+        "results_dir": os.environ.get("SCRAPER_RESULTS_DIR", "task_results"),
+        "spill_threshold": int(os.environ.get("SCRAPER_RESULT_SPILL_BYTES", 256 * 1024)),
+        "ttl": int(os.environ.get("SCRAPER_TASK_TTL", 24 * 3600)),
+        "max_entries": int(os.environ.get("SCRAPER_TASK_MAX_ENTRIES", 10000)),
+    }
+
+
+def load_handler(spec):
+    """Resolve a 'module:function' handler specification"""
+    module_name, _, function_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+async def _execute_job(queue, handler, job, worker_id):
+    """Run one job, keeping its lease alive until the handler returns"""
+    async def keep_alive():
+        while True:
+            await asyncio.sleep(queue.visibility_timeout / 3)
+            if not await asyncio.to_thread(queue.heartbeat, job['id'], worker_id):
+                logger.warning(f"Worker {worker_id} lost the lease on job {job['id']}")
+                return
+
+    heartbeat = asyncio.create_task(keep_alive())
+    try:
+        await handler(job, queue)
+    except Exception as e:
+        logger.error(f"Job {job['id']} crashed on worker {worker_id}: {e}")
+        await asyncio.to_thread(queue.fail, job['id'], str(e), True)
+    finally:
+        heartbeat.cancel()
+
+
+async def _worker_loop(queue, handler, worker_id, concurrency, poll_interval, stop_event):
+    running = set()
+    while not stop_event.is_set():
+        if len(running) >= concurrency:
+            await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            continue
+
+        job = await asyncio.to_thread(queue.lease, worker_id)
+        if job is None:
+            await asyncio.sleep(poll_interval)
+            continue
+
+        logger.info(f"Worker {worker_id} leased job {job['id']} (attempt {job['attempts']})")
+        task = asyncio.create_task(_execute_job(queue, handler, job, worker_id))
+        running.add(task)
+        task.add_done_callback(running.discard)
+
+    if running:
+        await asyncio.wait(running)
+
+
+def _worker_main(db_path, handler_spec, worker_index, concurrency, poll_interval, visibility_timeout,
+                 queue_options, stop_event):
+    """Entry point of a worker process"""
+    queue = JobQueue(db_path, visibility_timeout=visibility_timeout, **queue_options)
+    handler = load_handler(handler_spec)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{worker_index}"
+    logger.info(f"Worker {worker_id} started")
+    try:
+        asyncio.run(_worker_loop(queue, handler, worker_id, concurrency, poll_interval, stop_event))
+    except KeyboardInterrupt:
+        pass
+
+
+class WorkerPool:
+    """Pool of worker processes consuming a JobQueue
+
+    ``handler_spec`` names an async ``handler(job, queue)`` as 'module:function' so it
+    can be imported in freshly spawned processes. Each worker runs up to
+    ``concurrency`` jobs at once on its own event loop. ``queue_options`` are passed
+    to each worker's JobQueue (result spilling, retention).
+    """
+
+    def __init__(self, db_path, handler_spec, num_workers=2, concurrency=4,
+                 poll_interval=0.5, visibility_timeout=300, queue_options=None):
+        self.db_path = db_path
+        self.handler_spec = handler_spec
+        self.num_workers = num_workers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.visibility_timeout = visibility_timeout
+        self.queue_options = dict(queue_options or {})
+        self._context = multiprocessing.get_context('spawn')
+        self._stop_event = self._context.Event()
+        self._processes = []
+
+    def start(self):
+        """Spawn the worker processes"""
+        for index in range(self.num_workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self.db_path, self.handler_spec, index, self.concurrency,
+                      self.poll_interval, self.visibility_timeout, self.queue_options, self._stop_event),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        logger.info(f"Started {self.num_workers} scraping worker(s)")
+
+    def join(self):
+        """Wait for the worker processes to exit"""
+        for process in self._processes:
+            process.join()
+
+    def stop(self, timeout=10):
+        """Ask workers to finish their current jobs, then stop them"""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scraping workers against a SQLite job queue")
+    parser.add_argument('--db', default=queue_db_from_env())
+    parser.add_argument('--handler', default='web_scraping_platform:process_scrape_job')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--concurrency', type=int, default=int(os.environ.get("SCRAPER_WORKER_CONCURRENCY", 4)))
+    parser.add_argument('--visibility-timeout', type=int, default=visibility_timeout_from_env())
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.db, args.handler, num_workers=args.workers, concurrency=args.concurrency,
+                      visibility_timeout=args.visibility_timeout, queue_options=queue_options_from_env())
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == '__main__':
+    main()
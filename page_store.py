@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger("WebScraperETL")
+
+# Bump when extraction, transformation or page normalization changes, so stored records are not reused
+RECORD_FORMAT_VERSION = 2
+
+# Markup that changes on every request and that extraction never reads. Comments,
+# text (dates, clock times) and link URLs are all extracted, so they are kept.
+VOLATILE_PATTERNS = [
+    # Anti-CSRF and anti-replay tokens
+    re.compile(r'<input\b[^>]*\bname\s*=\s*["\']?[^"\'>]*(?:csrf|xsrf|token|nonce|authenticity|__viewstate|'
+               r'__eventvalidation|__requestverification)[^>]*>', re.IGNORECASE),
+    re.compile(r'<meta\b[^>]*\bname\s*=\s*["\']?[^"\'>]*(?:csrf|xsrf|token|nonce)[^>]*>', re.IGNORECASE),
+]
+# Per-request attributes, removed from inside start tags only so page text is never touched
+VOLATILE_ATTRIBUTE_PATTERN = re.compile(
+    r'\s(?:nonce|integrity|data-(?:csrf|xsrf|token|nonce|timestamp|time|ts|request-id))\s*=\s*'
+    r'(?:"[^"]*"|\'[^\']*\'|[^\s>]+)', re.IGNORECASE
+)
+START_TAG_PATTERN = re.compile(r'<[a-zA-Z][^>]*>')
+# Cache-busting query strings on the scripts and stylesheets a page loads
+ASSET_VERSION_PATTERN = re.compile(r'(<(?:script|link)\b[^>]*?\.(?:js|css))\?[^"\'\s>]*', re.IGNORECASE)
+# Every extracted string has its whitespace collapsed, so whitespace changes never change a record
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_page(html):
+    """HTML with its volatile markup removed, as hashed by page_hash"""
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub('', html)
+    if VOLATILE_ATTRIBUTE_PATTERN.search(html):
+        html = START_TAG_PATTERN.sub(lambda tag: VOLATILE_ATTRIBUTE_PATTERN.sub('', tag.group(0)), html)
+    html = ASSET_VERSION_PATTERN.sub(r'\1', html)
+    return WHITESPACE_PATTERN.sub(' ', html).strip()
+
+
+def page_hash(html):
+    """Hash of a page's content that ignores anti-CSRF tokens, asset versions and whitespace"""
+    return hashlib.blake2b(normalize_page(html).encode('utf-8'), digest_size=20).hexdigest()
+
+
+def selection_key(selected_elements, parser_backend):
+    """Key of the extraction settings that shape a page's records"""
+    return json.dumps([RECORD_FORMAT_VERSION, parser_backend, list(dict.fromkeys(selected_elements))])
+
+
+def record_diff(old_records, new_records):
+    """(added, removed) records between two versions of a page, duplicates counted"""
+    def canonical(records):
+        return Counter(json.dumps([key, item], sort_keys=True, ensure_ascii=False) for key, item in records)
+
+    old_counts, new_counts = canonical(old_records), canonical(new_records)
+    added = [tuple(json.loads(record)) for record in (new_counts - old_counts).elements()]
+    removed = [tuple(json.loads(record)) for record in (old_counts - new_counts).elements()]
+    return added, removed
+
+
+class PageStore:
+    """Transformed records of every page scraped, keyed by URL and extraction settings
+
+    Each entry keeps the page_hash of the HTML it was extracted from, so a page
+    scraped again can reuse its records when the hash matches, skipping parsing,
+    extraction and transformation. Entries not refreshed for ``ttl`` seconds
+    are purged, when the store is first used in a process and by ``purge``, so
+    the table does not grow forever and every page is re-extracted at least
+    once per ``ttl``.
+    """
+
+    def __init__(self, db_path='page_records.db', ttl=30 * 24 * 3600):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._schema_ready:
+            # Created on first use so agents that never extract leave no file behind
+            self._init_schema(conn)
+            self._schema_ready = True
+            self._delete_expired(conn)
+        return conn
+
+    def _init_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_records (
+                url TEXT NOT NULL,
+                selection TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                records BLOB NOT NULL,
+                record_count INTEGER NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (url, selection)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_page_records_updated ON page_records (updated_at)")
+
+    def _delete_expired(self, conn):
+        cutoff = datetime.fromtimestamp(time.time() - self.ttl).isoformat()
+        deleted = conn.execute("DELETE FROM page_records WHERE updated_at < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"Purged {deleted} expired page records")
+        return deleted
+
+    def purge(self):
+        """Drop the records of pages not refreshed for ``ttl`` seconds"""
+        conn = self._connect()
+        try:
+            return self._delete_expired(conn)
+        finally:
+            conn.close()
+
+    def lookup(self, url, selection):
+        """(content_hash, records) stored for a page, or None"""
+        conn = self._connect()
+        try:
+            cutoff = datetime.fromtimestamp(time.time() - self.ttl).isoformat()
+            row = conn.execute("SELECT content_hash, records FROM page_records "
+                               "WHERE url = ? AND selection = ? AND updated_at >= ?",
+                               (url, selection, cutoff)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        records = [tuple(record) for record in json.loads(zlib.decompress(row['records']))]
+        return row['content_hash'], records
+
+    def save(self, url, selection, content_hash, records):
+        """Store the records extracted from one version of a page"""
+        body = zlib.compress(json.dumps(records, ensure_ascii=False).encode('utf-8'))
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO page_records (url, selection, content_hash, records, record_count, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, selection, content_hash, body, len(records), datetime.now().isoformat())
+            )
+        finally:
+            conn.close()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_page_store():
+    """Process-wide page record store, or None if disabled
+
+    Set SCRAPER_PAGE_STORE_DB to an empty string to disable incremental extraction.
+    """
+    global _default_store
+    db_path = os.environ.get("SCRAPER_PAGE_STORE_DB", "page_records.db")
+    if not db_path:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PageStore(db_path, ttl=int(os.environ.get("SCRAPER_PAGE_STORE_TTL", 30 * 24 * 3600)))
+        return _default_store
@@ -0,0 +1,182 @@
+import asyncio
+import email.utils
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger("WebScraperETL")
+
+# Responses telling us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """Seconds to wait according to a Retry-After header (delay or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class DomainRateLimiter:
+    """Per-domain adaptive token bucket shared by every fetch of a process
+
+    Each domain gets its own bucket of ``burst`` tokens refilled at ``rate``
+    requests per second, kept as a theoretical arrival time (GCRA). A request
+    reserves its slot under a short lock and then waits outside it. Waiting
+    for one domain therefore never delays another, and requests to different
+    hosts interleave freely.
+
+    The rate adapts to feedback (AIMD):
+
+    - 429/503 halve it and pause the domain for Retry-After seconds.
+    - Fast responses raise it by ``increase_step``.
+    - Slow responses lower it a little.
+
+    A robots.txt Crawl-delay caps the domain's rate.
+    """
+
+    def __init__(self, rate=4.0, burst=8, min_rate=0.1, max_rate=50.0, increase_step=0.5,
+                 fast_latency=1.0, slow_latency=5.0, robots_cache=None):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.fast_latency = fast_latency
+        self.slow_latency = slow_latency
+        self.robots_cache = robots_cache
+        self._domains = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def domain(url):
+        return urlparse(url).netloc.lower()
+
+    def _crawl_delay(self, url):
+        if self.robots_cache is None:
+            return None
+        try:
+            return self.robots_cache.crawl_delay(url)
+        except Exception as e:
+            logger.warning(f"Could not read the crawl delay for {url}: {e}")
+            return None
+
+    def _state(self, domain, crawl_delay=None):
+        """Bucket of a domain (caller holds the lock)"""
+        state = self._domains.get(domain)
+        if state is None:
+            max_rate = self.max_rate
+            burst = self.burst
+            if crawl_delay:
+                max_rate = min(max_rate, 1.0 / crawl_delay)
+                burst = 1
+            state = {
+                'rate': min(self.rate, max_rate),
+                'max_rate': max_rate,
+                'burst': burst,
+                'tat': 0.0,             # theoretical arrival time of the next request
+                'paused_until': 0.0,
+                'requests': 0,
+                'throttled': 0,
+            }
+            self._domains[domain] = state
+        return state
+
+    def _known(self, domain):
+        with self._lock:
+            return domain in self._domains
+
+    def reserve(self, url, crawl_delay=None):
+        """Reserve the next request slot for a URL's domain, returning the seconds to wait"""
+        domain = self.domain(url)
+        with self._lock:
+            state = self._state(domain, crawl_delay)
+            now = time.monotonic()
+            interval = 1.0 / state['rate']
+            tolerance = interval * (state['burst'] - 1)
+            start = max(state['tat'], now, state['paused_until'])
+            wait = max(start - tolerance, state['paused_until'], now) - now
+            state['tat'] = start + interval
+            state['requests'] += 1
+            return wait
+
+    def acquire(self, url):
+        """Block until a request to ``url`` is allowed"""
+        crawl_delay = None if self._known(self.domain(url)) else self._crawl_delay(url)
+        wait = self.reserve(url, crawl_delay)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url):
+        """Wait on the event loop until a request to ``url`` is allowed"""
+        crawl_delay = None
+        if not self._known(self.domain(url)):
+            crawl_delay = await asyncio.to_thread(self._crawl_delay, url)
+        wait = self.reserve(url, crawl_delay)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def feedback(self, url, status=None, latency=None, retry_after=None):
+        """Adapt a domain's rate to the outcome of a request"""
+        domain = self.domain(url)
+        with self._lock:
+            state = self._state(domain)
+            if status in THROTTLE_STATUSES:
+                state['throttled'] += 1
+                state['rate'] = max(self.min_rate, state['rate'] / 2)
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = 1.0 / state['rate']
+                state['paused_until'] = max(state['paused_until'], time.monotonic() + pause)
+                # Requests already reserved must wait for the pause too
+                state['tat'] = max(state['tat'], state['paused_until'])
+                logger.warning(f"{domain} answered {status}, slowing down to {state['rate']:.2f} req/s "
+                               f"and pausing {pause:.1f}s")
+            elif latency is not None and latency > self.slow_latency:
+                state['rate'] = max(self.min_rate, state['rate'] * 0.8)
+            elif latency is not None and latency < self.fast_latency and status is not None and status < 400:
+                state['rate'] = min(state['max_rate'], state['rate'] + self.increase_step)
+
+    def stats(self):
+        """Current rate and counters of every domain seen"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                domain: {
+                    'rate': round(state['rate'], 3),
+                    'max_rate': round(state['max_rate'], 3),
+                    'paused_for': round(max(state['paused_until'] - now, 0.0), 3),
+                    'requests': state['requests'],
+                    'throttled': state['throttled'],
+                }
+                for domain, state in self._domains.items()
+            }
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_rate_limiter(robots_cache=None):
+    """Process-wide rate limiter shared by every agent and fetcher"""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = DomainRateLimiter(
+                rate=float(os.environ.get("SCRAPER_RATE_PER_HOST", 4)),
+                burst=int(os.environ.get("SCRAPER_RATE_BURST", 8)),
+                max_rate=float(os.environ.get("SCRAPER_MAX_RATE_PER_HOST", 50)),
+                robots_cache=robots_cache
+            )
+        return _default_limiter
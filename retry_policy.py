@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+import aiohttp
+import requests
+
+from rate_limiter import parse_retry_after
+
+logger = logging.getLogger("WebScraperETL")
+
+# Responses worth asking for again; other 4xx (404, 403, ...) will not change
+RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+# Transport errors worth retrying, for both the requests and aiohttp paths
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+)
+
+
+def _error_response(error):
+    """(status, Retry-After) carried by a requests or aiohttp HTTP error"""
+    response = getattr(error, 'response', None)
+    if response is not None and hasattr(response, 'status_code'):
+        return response.status_code, response.headers.get('Retry-After')
+    status = getattr(error, 'status', None)   # aiohttp.ClientResponseError
+    headers = getattr(error, 'headers', None) or {}
+    return status, headers.get('Retry-After')
+
+
+class RetryBudget:
+    """Process-wide allowance of retries
+
+    Every first attempt deposits ``ratio`` tokens and every retry withdraws one,
+    so retries stay a bounded fraction of the traffic. ``min_per_second`` tokens
+    are added over time so a quiet process can still retry occasionally. When a
+    host is down, its retries use up the budget and further failures give up at
+    once instead of keeping workers asleep.
+    """
+
+    def __init__(self, ratio=0.2, min_per_second=1.0, max_tokens=100):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._balance = float(max_tokens)
+        self._updated = time.monotonic()
+        self.requests = 0
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens earned since the last update (caller holds the lock)"""
+        self._balance = min(self.max_tokens, self._balance + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self):
+        """Record a first attempt"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.requests += 1
+            self._balance = min(self.max_tokens, self._balance + self.ratio)
+
+    def withdraw(self):
+        """Take a token for a retry, returning False if the budget is spent"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._balance < 1:
+                self.exhausted += 1
+                return False
+            self._balance -= 1
+            self.retries += 1
+            return True
+
+    def stats(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'tokens': round(self._balance, 2),
+                'requests': self.requests,
+                'retries': self.retries,
+                'exhausted': self.exhausted,
+            }
+
+
+class RetryPolicy:
+    """When and how long to wait before fetching a URL again
+
+    Only ``retry_statuses`` responses and ``retry_exceptions`` errors are
+    retried. The wait before attempt n is drawn uniformly from
+    [0, min(max_delay, base_delay * 2**n)] ("full jitter"), so clients that
+    failed together do not retry together. A Retry-After header is honoured
+    as a lower bound. No URL is retried past ``deadline`` seconds after its
+    first attempt, and every retry must be paid for from the shared ``budget``.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=10.0, deadline=30.0, budget=None,
+                 retry_statuses=RETRY_STATUSES, retry_exceptions=RETRY_EXCEPTIONS):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget = budget if budget is not None else RetryBudget()
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_exceptions = tuple(retry_exceptions)
+
+    def backoff(self, attempt):
+        """Full-jitter wait before retry number ``attempt`` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def is_retryable(self, error):
+        """Whether a failed attempt may succeed if tried again"""
+        status, _ = _error_response(error)
+        if status is not None:
+            return status in self.retry_statuses
+        return isinstance(error, self.retry_exceptions)
+
+    def start(self, url, max_attempts=None):
+        """Track the attempts of one fetch"""
+        self.budget.deposit()
+        return RetryState(self, url, max_attempts or self.max_attempts)
+
+    def stats(self):
+        return dict(self.budget.stats(), max_attempts=self.max_attempts, deadline=self.deadline)
+
+
+class RetryState:
+    """Attempts, deadline and next wait of one URL fetch"""
+
+    def __init__(self, policy, url, max_attempts):
+        self.policy = policy
+        self.url = url
+        self.max_attempts = max_attempts
+        self.attempts = 0
+        self.deadline_at = time.monotonic() + policy.deadline
+
+    def remaining(self):
+        """Seconds left before the deadline"""
+        return max(self.deadline_at - time.monotonic(), 0.0)
+
+    def timeout(self, request_timeout):
+        """Request timeout that does not run past the deadline"""
+        return max(min(request_timeout, self.remaining()), 0.1)
+
+    def next_delay(self, error):
+        """Seconds to wait before retrying after ``error``, or None to give up"""
+        self.attempts += 1
+        if not self.policy.is_retryable(error):
+            logger.warning(f"Not retrying {self.url}: {error}")
+            return None
+        if self.attempts >= self.max_attempts:
+            return None
+        _, retry_after = _error_response(error)
+        delay = max(self.policy.backoff(self.attempts), parse_retry_after(retry_after) or 0.0)
+        if delay >= self.remaining():
+            logger.warning(f"Giving up on {self.url}: retrying would pass its {self.policy.deadline}s deadline")
+            return None
+        if not self.policy.budget.withdraw():
+            logger.warning(f"Giving up on {self.url}: retry budget exhausted")
+            return None
+        logger.warning(f"Attempt {self.attempts} failed for {self.url}. Retrying in {delay:.2f}s. Error: {error}")
+        return delay
+
+
+_default_policy = None
+_default_policy_lock = threading.Lock()
+
+
+def get_default_retry_policy():
+    """Process-wide retry policy, whose budget is shared by every agent and fetcher"""
+    global _default_policy
+    with _default_policy_lock:
+        if _default_policy is None:
+            _default_policy = RetryPolicy(
+                max_attempts=int(os.environ.get("SCRAPER_RETRY_ATTEMPTS", 3)),
+                max_delay=float(os.environ.get("SCRAPER_RETRY_MAX_DELAY", 10)),
+                deadline=float(os.environ.get("SCRAPER_RETRY_DEADLINE", 30)),
+                budget=RetryBudget(ratio=float(os.environ.get("SCRAPER_RETRY_BUDGET_RATIO", 0.2)))
+            )
+        return _default_policy
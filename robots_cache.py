@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import urllib.robotparser
+from urllib.parse import urlparse
+
+import requests
+
+from http_session import create_session, get_shared_adapter
+
+logger = logging.getLogger("WebScraperETL")
+
+
+class RobotsCache:
+    """Per-host robots.txt cache
+
+    Each host's robots.txt is fetched once through ``session`` and kept for
+    ``ttl`` seconds. Concurrent lookups for the same host wait for a single
+    fetch. Status codes are interpreted like ``RobotFileParser.read``:
+    401/403 disallow everything, other 4xx allow everything, and 5xx disallow
+    everything. A site whose robots.txt cannot be reached is allowed. Failed
+    fetches are retried after ``error_ttl`` seconds.
+    """
+
+    def __init__(self, ttl=3600, error_ttl=300, session=None, timeout=10):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self._parsers = {}       # host -> (RobotFileParser, expires_at)
+        self._host_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def robots_url(url):
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
+
+    def _fetch(self, robots_url):
+        """Download and parse a robots.txt, returning (parser, ttl)"""
+        parser = urllib.robotparser.RobotFileParser(robots_url)
+        try:
+            response = self.session.get(robots_url, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not fetch {robots_url}, allowing every page: {e}")
+            parser.allow_all = True
+            return parser, self.error_ttl
+
+        if response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif 400 <= response.status_code < 500:
+            parser.allow_all = True
+        elif response.status_code >= 500:
+            logger.warning(f"{robots_url} answered {response.status_code}, disallowing every page for now")
+            parser.disallow_all = True
+            return parser, self.error_ttl
+        else:
+            parser.parse(response.text.splitlines())
+        return parser, self.ttl
+
+    def get(self, url):
+        """The RobotFileParser of a URL's host, fetched if missing or expired"""
+        robots_url = self.robots_url(url)
+        with self._lock:
+            cached = self._parsers.get(robots_url)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+            host_lock = self._host_locks.setdefault(robots_url, threading.Lock())
+
+        with host_lock:
+            # Another thread may have fetched it while we waited
+            with self._lock:
+                cached = self._parsers.get(robots_url)
+                if cached and cached[1] > time.monotonic():
+                    return cached[0]
+            logger.info(f"Fetching {robots_url}")
+            parser, ttl = self._fetch(robots_url)
+            with self._lock:
+                self._parsers[robots_url] = (parser, time.monotonic() + ttl)
+            return parser
+
+    def can_fetch(self, url, user_agent="*"):
+        """Whether robots.txt allows fetching a URL"""
+        return self.get(url).can_fetch(user_agent, url)
+
+    def crawl_delay(self, url, user_agent="*"):
+        """Crawl-delay in seconds for a URL's host (from Request-rate if needed), or None"""
+        parser = self.get(url)
+        delay = parser.crawl_delay(user_agent)
+        if delay is not None:
+            return float(delay)
+        rate = parser.request_rate(user_agent)
+        if rate is not None and rate.requests:
+            return rate.seconds / rate.requests
+        return None
+
+    async def can_fetch_async(self, url, user_agent="*"):
+        """can_fetch without blocking the event loop"""
+        return await asyncio.to_thread(self.can_fetch, url, user_agent)
+
+    async def crawl_delay_async(self, url, user_agent="*"):
+        """crawl_delay without blocking the event loop"""
+        return await asyncio.to_thread(self.crawl_delay, url, user_agent)
+
+    def clear(self):
+        """Forget every cached robots.txt"""
+        with self._lock:
+            self._parsers.clear()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_robots_cache():
+    """Process-wide robots.txt cache shared by every agent"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = RobotsCache(
+                ttl=int(os.environ.get("SCRAPER_ROBOTS_TTL", 3600)),
+                # robots.txt needs no cookies, so none are kept between the fetching threads
+                session=create_session(get_shared_adapter(), cookies=False)
+            )
+        return _default_cache
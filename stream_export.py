@@ -0,0 +1,341 @@
+import csv
+import gzip
+import io
+import logging
+import os
+from functools import partial
+
+import fast_json
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger("WebScraperETL")
+
+# Records buffered per element before they are written out as one Parquet row group / Arrow batch
+COLUMNAR_BATCH_SIZE = int(os.environ.get('SCRAPER_COLUMNAR_BATCH_SIZE', 65536))
+COLUMNAR_COMPRESSION = os.environ.get('SCRAPER_COLUMNAR_COMPRESSION', 'zstd')
+# Codecs the Arrow IPC format supports (Parquet supports more)
+IPC_COMPRESSIONS = ('lz4', 'zstd')
+
+# File extension of each compression of text output
+TEXT_COMPRESSIONS = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+ZSTD_LEVEL = int(os.environ.get('SCRAPER_ZSTD_LEVEL', 3))
+
+# CSV columns of the dictionary records produced by extract_data
+RECORD_FIELDS = {
+    'Liens': ['texte', 'url'],
+    'Images': ['src', 'alt'],
+    'Produits': ['titre', 'prix', 'image'],
+}
+
+
+class RecordWriter:
+    """Base class for writers that append (element, item) records to disk as they arrive
+
+    Nothing is buffered beyond the underlying file buffers, so a job can export any
+    number of pages with bounded memory. ``close()`` returns the files written.
+    """
+
+    def __init__(self, base_filename, metadata=None):
+        self.base_filename = base_filename
+        self.metadata = metadata
+        self.counts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, key, item):
+        """Append one record"""
+        self._write(key, item)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def write_many(self, records):
+        """Append an iterable of (element, item) records"""
+        for key, item in records:
+            self.write(key, item)
+
+    def flush(self):
+        """Push buffered records to disk so readers of the files see them"""
+
+    def output_files(self):
+        """Files opened so far"""
+        return []
+
+    def _write(self, key, item):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class CSVRecordWriter(RecordWriter):
+    """One CSV file per data element, laid out like WebScrapingAgent.export_to_csv"""
+
+    def __init__(self, base_filename, metadata=None):
+        super().__init__(base_filename, metadata)
+        self._files = {}
+        self._writers = {}
+
+    def _open(self, key, item):
+        filename = f"{self.base_filename}_{key}.csv"
+        file = open(filename, 'w', newline='', encoding='utf-8')
+        if isinstance(item, dict):
+            fieldnames = RECORD_FIELDS.get(key) or list(item.keys())
+            writer = csv.DictWriter(file, fieldnames=fieldnames, restval='', extrasaction='ignore')
+            writer.writeheader()
+        else:
+            writer = csv.writer(file)
+            if isinstance(item, str):
+                writer.writerow([key])
+        self._files[key] = file
+        self._writers[key] = writer
+        return writer
+
+    def _write(self, key, item):
+        writer = self._writers.get(key) or self._open(key, item)
+        if isinstance(item, dict):
+            writer.writerow(item)
+        elif isinstance(item, list):
+            # Tables: title row, table rows, then an empty separator row
+            writer.writerow([f"Table {self.counts.get(key, 0) + 1}"])
+            writer.writerows(item)
+            writer.writerow([])
+        else:
+            writer.writerow([item])
+
+    def flush(self):
+        for file in self._files.values():
+            file.flush()
+
+    def output_files(self):
+        return [file.name for file in self._files.values()]
+
+    def close(self):
+        filenames = []
+        for key, file in self._files.items():
+            file.close()
+            filenames.append(file.name)
+            print(f"Données '{key}' exportées vers {file.name}")
+        self._files = {}
+        self._writers = {}
+        return filenames
+
+
+def open_text_output(filename, compression=None):
+    """Open a UTF-8 text file for writing, gzip or zstd compressed if asked"""
+    if compression is None:
+        return open(filename, 'w', encoding='utf-8')
+    if compression == 'gzip':
+        return gzip.open(filename, 'wt', encoding='utf-8')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard est requis pour la compression zstd (pip install zstandard)")
+        writer = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(filename, 'wb'))
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    raise ValueError(f"Compression non supportée: {compression}")
+
+
+def metadata_line(metadata):
+    return fast_json.dumps_text({'_metadata': metadata}) + "\n"
+
+
+def record_line(key, item):
+    return fast_json.dumps_text({'category': key, 'item': item}) + "\n"
+
+
+def iter_json_lines(data):
+    """JSON Lines of a finished result, laid out as JSONLinesRecordWriter writes them"""
+    if data.get('_metadata') is not None:
+        yield metadata_line(data['_metadata'])
+    for key, value in data.items():
+        if key.startswith('_'):
+            continue
+        for item in value if isinstance(value, list) else [value]:
+            yield record_line(key, item)
+
+
+class JSONLinesRecordWriter(RecordWriter):
+    """A single JSON Lines file: an optional metadata line, then one record per line
+
+    With ``compression`` ('gzip' or 'zstd') the file is compressed as it is
+    written; ``flush`` ends a compressed block so the records written so far
+    can already be decompressed.
+    """
+
+    def __init__(self, base_filename, metadata=None, compression=None):
+        super().__init__(base_filename, metadata)
+        self.filename = f"{base_filename}.jsonl{TEXT_COMPRESSIONS[compression]}"
+        self._file = open_text_output(self.filename, compression)
+        if metadata is not None:
+            self._file.write(metadata_line(metadata))
+
+    def _write(self, key, item):
+        self._file.write(record_line(key, item))
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def output_files(self):
+        return [self.filename]
+
+    def close(self):
+        if self._file is None:
+            return []
+        self._file.close()
+        self._file = None
+        print(f"Données exportées vers {self.filename}")
+        return [self.filename]
+
+
+def _text(value):
+    """Column value of a record field: text as-is, anything else as JSON"""
+    if value is None or isinstance(value, str):
+        return value
+    return fast_json.dumps_text(value)
+
+
+class ColumnarRecordWriter(RecordWriter):
+    """One typed, compressed columnar file per data element, written a batch at a time
+
+    Records are buffered per element and written every ``batch_size`` records,
+    so memory stays bounded however many pages are exported. Strings become a
+    ``value`` column. Dictionaries get one string column per field
+    (RECORD_FIELDS, else the fields of the first batch; later fields are
+    ignored, as in CSV). Tables get one row per table row: ``table`` and
+    ``row`` indexes and a ``cells`` list. The extraction metadata is kept in
+    each file's schema metadata.
+    """
+
+    extension = None
+
+    def __init__(self, base_filename, metadata=None, batch_size=COLUMNAR_BATCH_SIZE, compression=COLUMNAR_COMPRESSION):
+        if pa is None:
+            raise ImportError("pyarrow est requis pour les exports Parquet et Arrow (pip install pyarrow)")
+        super().__init__(base_filename, metadata)
+        self.batch_size = batch_size
+        self.compression = compression
+        self._buffers = {}
+        self._kinds = {}
+        self._schemas = {}
+        self._files = {}
+        self._filenames = {}
+
+    def _write(self, key, item):
+        buffer = self._buffers.setdefault(key, [])
+        if isinstance(item, list):
+            item = (self.counts.get(key, 0), item)  # tables keep their index in the element
+        buffer.append(item)
+        if len(buffer) >= self.batch_size:
+            self._flush(key)
+
+    def _schema(self, key, kind, items):
+        if kind == 'dict':
+            fields = RECORD_FIELDS.get(key) or list(dict.fromkeys(field for item in items for field in item))
+            columns = [(field, pa.string()) for field in fields]
+        elif kind == 'table':
+            columns = [('table', pa.int32()), ('row', pa.int32()), ('cells', pa.list_(pa.string()))]
+        else:
+            columns = [('value', pa.string())]
+        metadata = {'element': key}
+        if self.metadata is not None:
+            metadata['scraper_metadata'] = fast_json.dumps_text(self.metadata)
+        return pa.schema(columns, metadata=metadata)
+
+    def _batch(self, kind, schema, items):
+        if kind == 'table':
+            rows = [(table, row, [_text(cell) for cell in cells])
+                    for table, table_rows in items for row, cells in enumerate(table_rows)]
+            arrays = [pa.array([row[i] for row in rows], type=field.type) for i, field in enumerate(schema)]
+        elif kind == 'dict':
+            arrays = [pa.array([_text(item.get(field.name)) for item in items], type=field.type) for field in schema]
+        else:
+            arrays = [pa.array([_text(item) for item in items], type=pa.string())]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def _flush(self, key):
+        items = self._buffers.pop(key, None)
+        if not items:
+            return
+        if key not in self._files:
+            filename = f"{self.base_filename}_{key}.{self.extension}"
+            first = items[0]
+            self._kinds[key] = 'dict' if isinstance(first, dict) else 'table' if isinstance(first, tuple) else 'value'
+            self._schemas[key] = self._schema(key, self._kinds[key], items)
+            self._files[key] = self._open_file(filename, self._schemas[key])
+            self._filenames[key] = filename
+        self._write_batch(self._files[key], self._batch(self._kinds[key], self._schemas[key], items))
+
+    def _open_file(self, filename, schema):
+        raise NotImplementedError
+
+    def output_files(self):
+        return list(self._filenames.values())
+
+    def _write_batch(self, file, batch):
+        raise NotImplementedError
+
+    def close(self):
+        for key in list(self._buffers):
+            self._flush(key)
+        filenames = []
+        for key, file in self._files.items():
+            file.close()
+            filenames.append(self._filenames[key])
+            print(f"Données '{key}' exportées vers {self._filenames[key]}")
+        self._files = {}
+        return filenames
+
+
+class ParquetRecordWriter(ColumnarRecordWriter):
+    """Parquet files, one row group per batch"""
+
+    extension = 'parquet'
+
+    def _open_file(self, filename, schema):
+        return pq.ParquetWriter(filename, schema, compression=self.compression)
+
+    def _write_batch(self, file, batch):
+        file.write_batch(batch)
+
+
+class ArrowRecordWriter(ColumnarRecordWriter):
+    """Arrow IPC (Feather v2) files, one record batch per batch"""
+
+    extension = 'arrow'
+
+    def _open_file(self, filename, schema):
+        compression = self.compression if self.compression in IPC_COMPRESSIONS else None
+        return pa.ipc.new_file(filename, schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+
+    def _write_batch(self, file, batch):
+        file.write_batch(batch)
+
+
+# Output formats that can be written incrementally ("JSON" is streamed as JSON Lines)
+STREAMING_WRITERS = {
+    'CSV': CSVRecordWriter,
+    'JSON': JSONLinesRecordWriter,
+    'JSON Lines': JSONLinesRecordWriter,
+    'JSON Lines (gzip)': partial(JSONLinesRecordWriter, compression='gzip'),
+    'JSON Lines (zstd)': partial(JSONLinesRecordWriter, compression='zstd'),
+    'Parquet': ParquetRecordWriter,
+    'Arrow': ArrowRecordWriter,
+}
+
+# Formats written record by record by a RecordWriter, also when exporting a finished result
+JSON_LINES_FORMATS = ('JSON Lines', 'JSON Lines (gzip)', 'JSON Lines (zstd)')
+COLUMNAR_FORMATS = ('Parquet', 'Arrow')
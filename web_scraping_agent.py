@@ -1,22 +1,31 @@
 import requests
 import pandas as pd
-import json
 import csv
 import time
 import os
 import logging
-import concurrent.futures
-import multiprocessing
-import sqlite3
-from bs4 import BeautifulSoup
-import urllib.robotparser
+from bs4 import BeautifulSoup, NavigableString, Tag
 from urllib.parse import urlparse, urljoin
 import re
 from abc import ABC, abstractmethod
 from datetime import datetime
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-import random
+from functools import lru_cache
+from contextlib import asynccontextmanager
+import asyncio
+from async_fetcher import AsyncFetcher
+from driver_pool import get_default_pool, wait_for_page
+from executor_pools import run_sync
+import fast_json
+from stream_export import COLUMNAR_FORMATS, JSON_LINES_FORMATS, STREAMING_WRITERS
+from db_loader import DEFAULT_LOAD_MODE, SQLiteLoader
+from http_cache import HTTPCache, get_default_cache
+from robots_cache import get_default_robots_cache
+from rate_limiter import get_default_rate_limiter
+from http_session import UserAgentRotator, create_session, get_shared_adapter
+from retry_policy import get_default_retry_policy
+from crawl_frontier import CrawlFrontier
+from checkpoint import checkpoint_key, get_default_checkpoint_store
+from page_store import get_default_page_store, page_hash, record_diff, selection_key
 
 # Set up logging
 logging.basicConfig(
@@ -29,6 +38,112 @@ logging.basicConfig(
 )
 logger = logging.getLogger("WebScraperETL")
 
+# Patterns shared by page analysis and extraction
+PRICE_PATTERN = re.compile(r'\$|€|\d+[,.]\d{2}')
+PRODUCT_CLASS_PATTERN = re.compile(r'product|item|card')
+NEXT_PAGE_PATTERN = re.compile(r'next|suivant|prochain|>>', re.IGNORECASE)
+PAGE_NUMBER_PATTERN = re.compile(r'^\d+$')
+TITLE_CLASS_PATTERN = re.compile(r'title|name')
+
+# HTML parser backends selectable on WebScrapingAgent
+PARSER_BACKENDS = ('html.parser', 'lxml', 'selectolax')
+DEFAULT_PARSER_BACKEND = os.environ.get('SCRAPER_PARSER_BACKEND', 'html.parser')
+
+# Patterns used by the transformation pipeline, compiled once
+DATE_PATTERNS = [
+    (re.compile(r'\d{2}/\d{2}/\d{4}'), '%d/%m/%Y'),  # 31/12/2021
+    (re.compile(r'\d{2}-\d{2}-\d{4}'), '%d-%m-%Y'),  # 31-12-2021
+    (re.compile(r'\d{4}/\d{2}/\d{2}'), '%Y/%m/%d'),  # 2021/12/31
+    (re.compile(r'\d{4}-\d{2}-\d{2}'), '%Y-%m-%d'),  # 2021-12-31
+    # Add more patterns as needed (and extend ANY_DATE_PATTERN)
+]
+ANY_DATE_PATTERN = re.compile(r'\d{2}[/-]\d{2}[/-]\d{4}|\d{4}[/-]\d{2}[/-]\d{2}')
+CURRENCY_PATTERN = re.compile(r'([€$£¥])\s*(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))')
+DECIMAL_COMMA_PATTERN = re.compile(r',\d{2}$')
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Transformation engines: 'row' walks the data in Python, 'columnar' uses pandas
+# string operations for large categories
+TRANSFORM_MODES = ('row', 'columnar')
+DEFAULT_TRANSFORM_MODE = os.environ.get('SCRAPER_TRANSFORM_MODE', 'row')
+COLUMNAR_MIN_CELLS = 1000  # smaller categories are cheaper to transform row by row
+
+try:
+    import pyarrow  # noqa: F401
+    COLUMNAR_STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    COLUMNAR_STRING_DTYPE = object
+
+# Arrow evaluates regexes with RE2, whose \s and \d are ASCII-only: spell out the
+# characters Python's str patterns match so both engines select the same text
+_PY_WHITESPACE_CLASS = '[\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]'
+COLUMNAR_PATTERNS = {
+    object: {
+        'html_tag': HTML_TAG_PATTERN,
+        'whitespace': WHITESPACE_PATTERN,
+        'date': ANY_DATE_PATTERN,
+        'currency': CURRENCY_PATTERN,
+    },
+    'string[pyarrow]': {
+        'html_tag': HTML_TAG_PATTERN.pattern,
+        'whitespace': WHITESPACE_PATTERN.pattern.replace('\\s', _PY_WHITESPACE_CLASS),
+        'date': ANY_DATE_PATTERN.pattern.replace('\\d', '\\p{Nd}'),
+        'currency': CURRENCY_PATTERN.pattern.replace('\\s', _PY_WHITESPACE_CLASS).replace('\\d', '\\p{Nd}'),
+    },
+}
+
+
+@lru_cache(maxsize=65536)
+def _normalized_amount(value_str):
+    """Format an amount such as 1.234,56 or 1,234.56 with two decimals, or None if invalid"""
+    # Normalize to decimal format
+    if ',' in value_str and '.' in value_str:
+        if value_str.find(',') > value_str.find('.'):  # Format: 1.234,56
+            normalized_value = value_str.replace('.', '').replace(',', '.')
+        else:  # Format: 1,234.56
+            normalized_value = value_str.replace(',', '')
+    elif ',' in value_str:  # Could be either decimal or thousand separator
+        # Heuristic: if two digits after comma, treat as decimal
+        if DECIMAL_COMMA_PATTERN.search(value_str):
+            normalized_value = value_str.replace(',', '.')
+        else:
+            normalized_value = value_str.replace(',', '')
+    else:
+        normalized_value = value_str
+    
+    try:
+        # Format as decimal with 2 places
+        return f"{float(normalized_value):.2f}"
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def _iso_date(date_str, format_string):
+    """Reformat a date string as YYYY-MM-DD, or None if it is not a valid date
+
+    Cached because strptime dominates transformation time and extracted tables
+    repeat the same dates many times.
+    """
+    try:
+        return datetime.strptime(date_str, format_string).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+# Data elements understood by extract_data
+EXTRACTABLE_ELEMENTS = ('Titres', 'Paragraphes', 'Liens', 'Images', 'Tableaux', 'Prix', 'Produits')
+
+# What check_robots_txt does when robots.txt disallows a page
+ROBOTS_POLICIES = ('prompt', 'allow', 'deny')
+
+# Number of listing pages fetched ahead of the page being parsed
+DEFAULT_PAGINATION_PREFETCH = int(os.environ.get('SCRAPER_PAGINATION_PREFETCH', 4))
+
+# Link-following crawl: pages fetched at once, and URLs the visited set is sized for
+DEFAULT_CRAWL_CONCURRENCY = int(os.environ.get('SCRAPER_CRAWL_CONCURRENCY', 8))
+CRAWL_EXPECTED_URLS = int(os.environ.get('SCRAPER_CRAWL_EXPECTED_URLS', 1_000_000))
+
 class ETLPipeline(ABC):
     """Abstract base class defining the ETL pipeline structure"""
     
@@ -63,28 +178,330 @@ class ETLPipeline(ABC):
         result = self.load(processed_data, target)
         return result
 
+class ParsedDocument:
+    """HTML page parsed once, with per-category element indexes built in a single tree walk"""
+
+    HEADING_TAGS = ('h1', 'h2', 'h3')
+    LIST_TAGS = ('ul', 'ol')
+
+    def __init__(self, html_content, parser='html.parser', url=None):
+        self.html = html_content
+        self.parser = parser
+        self.url = url  # where the page was fetched from, if known
+        self._parse()
+
+        self.headings = []
+        self.paragraphs = []
+        self.anchors = []
+        self.links = []
+        self.images = []
+        self.tables = []
+        self.lists = []
+        self.forms = []
+        self.products = []
+        self.prices = []
+        self._build_indexes()
+
+    def _parse(self):
+        """Build the parse tree"""
+        self.soup = BeautifulSoup(self.html, self.parser)
+
+    def _build_indexes(self):
+        """Walk the tree once and index every element the analysis and extraction steps need"""
+        skip_to = None
+        for node in self.soup.descendants:
+            if skip_to is not None:
+                if node is skip_to:
+                    skip_to = None
+                continue
+            if isinstance(node, Tag):
+                name = node.name
+                if name == 'template':
+                    # Template content is inert (never rendered) and lexbor keeps it out of the
+                    # document tree, so it is not indexed on any backend
+                    last = node._last_descendant()
+                    if last is not node:
+                        skip_to = last
+                if name in self.HEADING_TAGS:
+                    self.headings.append(node)
+                elif name == 'p':
+                    self.paragraphs.append(node)
+                elif name == 'a':
+                    self.anchors.append(node)
+                    if node.get('href') is not None:
+                        self.links.append(node)
+                elif name == 'img':
+                    if node.get('src') is not None:
+                        self.images.append(node)
+                elif name == 'table':
+                    self.tables.append(node)
+                elif name in self.LIST_TAGS:
+                    self.lists.append(node)
+                elif name == 'form':
+                    self.forms.append(node)
+
+                if self._class_matches(node, PRODUCT_CLASS_PATTERN):
+                    self.products.append(node)
+            elif isinstance(node, NavigableString):
+                if PRICE_PATTERN.search(node):
+                    self.prices.append(node)
+
+    @staticmethod
+    def _class_matches(tag, pattern):
+        """Match a class regex the same way BeautifulSoup's class_ filter does"""
+        classes = tag.get('class')
+        if not classes:
+            return False
+        if isinstance(classes, str):
+            return bool(pattern.search(classes))
+        return any(pattern.search(c) for c in classes) or bool(pattern.search(' '.join(classes)))
+
+    def text(self, node):
+        """Text content of an element, as returned by BeautifulSoup's .text"""
+        return node.text
+
+    def string(self, node):
+        """Single string child of an element, or None (BeautifulSoup's .string)"""
+        return node.string
+
+    def attr(self, node, name, default=None):
+        """Attribute value of an element"""
+        return node.get(name, default)
+
+    def rows(self, table):
+        """All rows of a table, nested tables included"""
+        return table.find_all('tr')
+
+    def cells(self, row):
+        """All header and data cells of a table row"""
+        return row.find_all(['td', 'th'])
+
+    def find_first(self, node, names):
+        """First descendant element with one of the given tag names"""
+        return node.find(list(names))
+
+    def find_first_with_class(self, node, pattern):
+        """First descendant element whose class matches the pattern"""
+        return node.find(class_=pattern)
+
+    def find_first_string(self, node, pattern):
+        """First descendant string matching the pattern"""
+        return node.find(string=pattern)
+
+    def element_counts(self):
+        """Number of elements found for each data category"""
+        counts = {
+            'Titres': len(self.headings),
+            'Paragraphes': len(self.paragraphs),
+            'Liens': len(self.links),
+            'Images': len(self.images),
+            'Tableaux': len(self.tables),
+            'Listes': len(self.lists),
+            'Formulaires': len(self.forms)
+        }
+
+        if self.products:
+            counts['Produits'] = len(self.products)
+        if self.prices:
+            counts['Prix'] = len(self.prices)
+
+        return counts
+
+class SelectolaxDocument(ParsedDocument):
+    """ParsedDocument backed by the C-based selectolax (lexbor) parser
+
+    Exposes the same indexes and accessors as the BeautifulSoup document so that
+    analysis and extraction give identical results on every backend, except on
+    ``<![CDATA[...]]>`` sections in HTML content: lexbor and lxml parse them as
+    comments, as HTML5 does, while html.parser keeps their text.
+    """
+
+    # Tags whose strings BeautifulSoup keeps out of the .text of their ancestors
+    STRING_CONTAINER_TAGS = ('script', 'style', 'template', 'rt', 'rp')
+
+    def _parse(self):
+        """Build the parse tree"""
+        from selectolax.lexbor import LexborHTMLParser
+        self.tree = LexborHTMLParser(self.html)
+
+    def _build_indexes(self):
+        """Walk the tree once and index every element the analysis and extraction steps need"""
+        if self.tree.root is None:
+            return
+
+        for node in self.tree.root.traverse(include_text=True):
+            name = node.tag
+            if name == '-text' or name == '-comment':
+                text = self._node_string(node)
+                if text and PRICE_PATTERN.search(text):
+                    self.prices.append(text)
+                continue
+
+            if name in self.HEADING_TAGS:
+                self.headings.append(node)
+            elif name == 'p':
+                self.paragraphs.append(node)
+            elif name == 'a':
+                self.anchors.append(node)
+                if 'href' in node.attributes:
+                    self.links.append(node)
+            elif name == 'img':
+                if 'src' in node.attributes:
+                    self.images.append(node)
+            elif name == 'table':
+                self.tables.append(node)
+            elif name in self.LIST_TAGS:
+                self.lists.append(node)
+            elif name == 'form':
+                self.forms.append(node)
+
+            if self._class_matches(node, PRODUCT_CLASS_PATTERN):
+                self.products.append(node)
+
+    @staticmethod
+    def _node_string(node):
+        """Content of a text or comment node"""
+        if node.tag == '-comment':
+            return node.comment_content or ''
+        return node.text(deep=False)
+
+    @staticmethod
+    def _descendants(node, include_text=False):
+        """Descendants of a node in document order, excluding the node itself"""
+        nodes = node.traverse(include_text=include_text)
+        next(nodes, None)
+        return nodes
+
+    @staticmethod
+    def _class_matches(node, pattern):
+        """Match a class regex the same way BeautifulSoup's class_ filter does"""
+        classes = node.attributes.get('class')
+        if not classes:
+            return False
+        classes = classes.split()
+        return any(pattern.search(c) for c in classes) or bool(pattern.search(' '.join(classes)))
+
+    def text(self, node):
+        """Text content of an element, as returned by BeautifulSoup's .text"""
+        parts = []
+        for child in self._descendants(node, include_text=True):
+            if child.tag != '-text':
+                continue
+            # Skip script/style strings unless the element itself is that container
+            parent = child.parent
+            while parent is not None and parent.mem_id != node.mem_id:
+                if parent.tag in self.STRING_CONTAINER_TAGS:
+                    break
+                parent = parent.parent
+            else:
+                parts.append(child.text(deep=False))
+        return ''.join(parts)
+
+    def string(self, node):
+        """Single string child of an element, or None (BeautifulSoup's .string)"""
+        children = list(node.iter(include_text=True))
+        if len(children) != 1:
+            return None
+        child = children[0]
+        if child.tag in ('-text', '-comment'):
+            return self._node_string(child)
+        return self.string(child)
+
+    def attr(self, node, name, default=None):
+        """Attribute value of an element"""
+        attributes = node.attributes
+        if name not in attributes:
+            return default
+        value = attributes[name]
+        return '' if value is None else value
+
+    def rows(self, table):
+        """All rows of a table, nested tables included"""
+        return [node for node in self._descendants(table) if node.tag == 'tr']
+
+    def cells(self, row):
+        """All header and data cells of a table row"""
+        return [node for node in self._descendants(row) if node.tag in ('td', 'th')]
+
+    def find_first(self, node, names):
+        """First descendant element with one of the given tag names"""
+        for child in self._descendants(node):
+            if child.tag in names:
+                return child
+        return None
+
+    def find_first_with_class(self, node, pattern):
+        """First descendant element whose class matches the pattern"""
+        for child in self._descendants(node):
+            if self._class_matches(child, pattern):
+                return child
+        return None
+
+    def find_first_string(self, node, pattern):
+        """First descendant string matching the pattern"""
+        for child in self._descendants(node, include_text=True):
+            if child.tag in ('-text', '-comment'):
+                text = self._node_string(child)
+                if text and pattern.search(text):
+                    return text
+        return None
+
+def create_document(html_content, backend='html.parser', url=None):
+    """Parse HTML with the requested backend"""
+    if backend == 'selectolax':
+        return SelectolaxDocument(html_content, parser=backend, url=url)
+    if backend in ('html.parser', 'lxml'):
+        return ParsedDocument(html_content, parser=backend, url=url)
+    raise ValueError(f"Unknown parser backend: {backend}. Choose one of {', '.join(PARSER_BACKENDS)}")
+
+def available_parser_backends():
+    """Parser backends whose dependencies are installed"""
+    available = ['html.parser']
+    for backend, module in (('lxml', 'lxml'), ('selectolax', 'selectolax.lexbor')):
+        try:
+            __import__(module)
+            available.append(backend)
+        except ImportError:
+            pass
+    return available
+
 class WebScrapingAgent:
-    def __init__(self):
+    def __init__(self, parser_backend=DEFAULT_PARSER_BACKEND, driver_pool=None, transform_mode=DEFAULT_TRANSFORM_MODE,
+                 http_cache=None, robots_cache=None, rate_limiter=None, session=None, retry_policy=None,
+                 checkpoint_store=None, page_store=None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.delay = 2  # Default delay between requests in seconds
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
             'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36'
         ]
-        self.session = requests.Session()
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("https://", adapter)
-        self.session.mount("http://", adapter)
+        # Headers are never mutated: each request gets its own copy with the next user agent
+        self._user_agent_rotator = UserAgentRotator(self.user_agents)
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {parser_backend}. Choose one of {', '.join(PARSER_BACKENDS)}")
+        if parser_backend not in available_parser_backends():
+            logger.warning(f"Parser backend '{parser_backend}' is not installed, falling back to html.parser")
+            parser_backend = 'html.parser'
+        self.parser_backend = parser_backend
+        if transform_mode not in TRANSFORM_MODES:
+            raise ValueError(f"Unknown transform mode: {transform_mode}. Choose one of {', '.join(TRANSFORM_MODES)}")
+        self.transform_mode = transform_mode
+        self.driver_pool = driver_pool  # None: use the process-wide WebDriver pool
+        self.http_cache = http_cache or get_default_cache()  # None when caching is disabled
+        self.robots_cache = robots_cache or get_default_robots_cache()
+        # Politeness: per-domain adaptive rate shared by every agent of the process
+        self.rate_limiter = rate_limiter or get_default_rate_limiter(self.robots_cache)
+        # Connections are pooled process-wide; cookies stay in this agent's session
+        self.session = session or create_session(get_shared_adapter())
+        # Transient failures are retried with jittered backoff, a per-URL deadline and a shared budget
+        self.retry_policy = retry_policy or get_default_retry_policy()
+        # Long multi-page jobs persist their progress here and resume after a restart
+        self.checkpoint_store = checkpoint_store or get_default_checkpoint_store()  # None when disabled
+        # Records of pages scraped before, reused while their content is unchanged
+        self.page_store = page_store or get_default_page_store()  # None when disabled
         
     def welcome_message(self):
         """Display welcome message and explain the agent's capabilities"""
@@ -111,30 +528,47 @@ class WebScrapingAgent:
         except:
             return False
     
-    def check_robots_txt(self, url):
-        """Check robots.txt for scraping permissions"""
+    def check_robots_txt(self, url, on_disallow='prompt'):
+        """Check robots.txt for scraping permissions
+        
+        ``on_disallow`` decides what happens when the page is disallowed: ask the
+        user ('prompt', for the interactive CLI), or go ahead ('allow') or stop
+        ('deny') without asking, as services must.
+        """
+        if on_disallow not in ROBOTS_POLICIES:
+            raise ValueError(f"Unknown robots.txt policy: {on_disallow}. Choose one of {', '.join(ROBOTS_POLICIES)}")
         try:
-            parsed_url = urlparse(url)
-            robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
-            rp = urllib.robotparser.RobotFileParser()
-            rp.set_url(robots_url)
-            rp.read()
-            
-            can_fetch = rp.can_fetch("*", url)
-            if not can_fetch:
-                print("\n⚠️ AVERTISSEMENT: Le fichier robots.txt interdit l'extraction de cette page.")
-                print("Continuer pourrait violer les conditions d'utilisation du site.")
-                choice = input("Souhaitez-vous continuer malgré tout? (oui/non): ").lower()
-                return choice == "oui"
-            return True
+            can_fetch = self.robots_cache.can_fetch(url)
         except Exception as e:
             print(f"\nRemarque: Impossible d'analyser le fichier robots.txt. {str(e)}")
             return True
+        
+        if can_fetch:
+            return True
+        if on_disallow == 'allow':
+            logger.warning(f"robots.txt disallows {url}, continuing as requested")
+            return True
+        if on_disallow == 'deny':
+            logger.warning(f"robots.txt disallows {url}, skipping it")
+            return False
+        
+        print("\n⚠️ AVERTISSEMENT: Le fichier robots.txt interdit l'extraction de cette page.")
+        print("Continuer pourrait violer les conditions d'utilisation du site.")
+        choice = input("Souhaitez-vous continuer malgré tout? (oui/non): ").lower()
+        return choice == "oui"
+    
+    def crawl_delay(self, url):
+        """Crawl-delay requested by robots.txt for a URL's host, or None"""
+        try:
+            return self.robots_cache.crawl_delay(url)
+        except Exception as e:
+            logger.warning(f"Could not read the crawl delay for {url}: {e}")
+            return None
     
     def fetch_page(self, url):
         """Fetch webpage content with error handling"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
             return response.text
         except requests.exceptions.HTTPError as e:
@@ -147,98 +581,291 @@ class WebScrapingAgent:
             print(f"Erreur lors de la récupération de la page: {e}")
         return None
     
-    def fetch_page_with_retry(self, url, max_retries=3, backoff_factor=2):
-        """Fetch webpage content with retry mechanism"""
+    def _request_headers(self):
+        """Headers for one request, rotating the user agent"""
+        return self._user_agent_rotator.headers(self.headers)
+    
+    def fetch_page_with_retry(self, url, max_retries=None):
+        """Fetch webpage content, retrying transient failures according to the retry policy"""
         logger.info(f"Fetching page with retry: {url}")
         
-        # Rotate user agents for each retry
-        for attempt in range(max_retries):
+        # Fresh cached copies are served without contacting the site, stale ones are revalidated
+        cached = self.http_cache.lookup(url, self.headers) if self.http_cache else None
+        if cached and cached['fresh']:
+            logger.info(f"Serving {url} from the HTTP cache")
+            return cached['text']
+        
+        retry = self.retry_policy.start(url, max_retries)
+        while True:
             try:
                 # Use a different user agent for each attempt
-                self.headers['User-Agent'] = random.choice(self.user_agents)
-                
-                response = self.session.get(url, headers=self.headers, timeout=10)
+                request_headers = self._request_headers()
+                request_headers.update(HTTPCache.conditional_headers(cached))
+                self.rate_limiter.acquire(url)
+                started = time.monotonic()
+                response = self.session.get(url, headers=request_headers, timeout=retry.timeout(10))
+                self.rate_limiter.feedback(url, response.status_code, time.monotonic() - started,
+                                           response.headers.get('Retry-After'))
+                if cached and response.status_code == 304:
+                    logger.info(f"{url} not modified, serving the cached copy")
+                    self.http_cache.refresh(cached, response.headers)
+                    return cached['text']
                 response.raise_for_status()
+                if self.http_cache:
+                    self.http_cache.store(url, self.headers, response.headers, response.text)
                 return response.text
             except requests.exceptions.RequestException as e:
-                wait_time = backoff_factor * (2 ** attempt)
-                logger.warning(f"Attempt {attempt+1} failed. Retrying in {wait_time}s. Error: {e}")
+                wait_time = retry.next_delay(e)
+                if wait_time is None:
+                    break
                 time.sleep(wait_time)
         
-        logger.error(f"Failed to fetch {url} after {max_retries} attempts.")
+        logger.error(f"Failed to fetch {url} after {retry.attempts} attempt(s).")
         return None
 
-    def extract_with_selenium(self, url):
-        """Extract data from JavaScript-heavy websites using Selenium"""
+    def extract_with_selenium(self, url, wait_for='dom_ready', selector=None, timeout=10):
+        """Extract data from JavaScript-heavy websites using a pooled Selenium WebDriver
+
+        Instead of a fixed sleep, waits for the DOM to be ready, the network to go idle,
+        or a CSS selector to appear (wait_for='dom_ready' | 'network_idle' | 'selector').
+        """
         try:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from selenium.webdriver.chrome.service import Service
-            from webdriver_manager.chrome import ChromeDriverManager
+            import selenium  # noqa: F401
         except ImportError:
             logger.error("Selenium not installed. Run: pip install selenium webdriver-manager")
             return None
             
         logger.info(f"Extracting with Selenium: {url}")
+        pool = self.driver_pool or get_default_pool(self.user_agents)
         
         try:
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument(f"user-agent={random.choice(self.user_agents)}")
-            
-            # Use webdriver-manager for automatic chromedriver management
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-            driver.get(url)
-            
-            # Wait for dynamic content to load
-            time.sleep(3)
-            
-            # Get page source after JavaScript execution
-            html_content = driver.page_source
-            driver.quit()
-            
-            return html_content
+            with pool.driver() as driver:
+                driver.get(url)
+                
+                # Wait for dynamic content to load
+                if not wait_for_page(driver, wait_for=wait_for, selector=selector, timeout=timeout):
+                    logger.warning(f"Page not ready after {timeout}s ({wait_for}), using current content: {url}")
+                
+                # Get page source after JavaScript execution
+                return driver.page_source
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Selenium extraction failed: {e}")
             return None
 
-    def handle_pagination(self, base_url, max_pages=10):
-        """Handle extraction from multiple paginated pages"""
-        logger.info(f"Handling pagination for {base_url} (max {max_pages} pages)")
-        all_content = []
+    def handle_pagination(self, base_url, max_pages=10, prefetch=DEFAULT_PAGINATION_PREFETCH, resume=True):
+        """Handle extraction from multiple paginated pages, returning one ParsedDocument per page"""
+        return run_sync(self.handle_pagination_async(base_url, max_pages=max_pages, prefetch=prefetch, resume=resume))
+
+    def _page_url(self, base_url, page_param, page_num):
+        """Build the URL of a listing page"""
+        if "?" in base_url and page_param:
+            return f"{base_url}&{page_param}={page_num}"
+        elif page_param:
+            return f"{base_url}?{page_param}={page_num}"
+        # Default to common pagination patterns
+        return f"{base_url}?page={page_num}"
+
+    async def handle_pagination_async(self, base_url, max_pages=10, prefetch=DEFAULT_PAGINATION_PREFETCH,
+                                      fetcher=None, run_parse=None, resume=True):
+        """Crawl a paginated listing concurrently, returning one ParsedDocument per page
+
+        With ``resume``, pages fetched by an interrupted run of the same listing
+        are read back from the checkpoint store instead of being fetched again.
+        """
+        async with self.job_checkpoint('pagination', resume=resume, url=base_url, max_pages=max_pages) as checkpoint:
+            return [
+                document async for document in self.iter_pagination_async(
+                    base_url, max_pages=max_pages, prefetch=prefetch, fetcher=fetcher, run_parse=run_parse,
+                    checkpoint=checkpoint
+                )
+            ]
+
+    async def iter_pagination_async(self, base_url, max_pages=10, prefetch=DEFAULT_PAGINATION_PREFETCH,
+                                    fetcher=None, run_parse=None, checkpoint=None):
+        """Yield the pages of a paginated listing as they are parsed, prefetching the next ones
+
+        Up to ``prefetch`` page URLs are fetched ahead of the page being parsed,
+        capped by the fetcher's per-host limit. Pages are parsed in order with
+        ``run_parse(func, *args)`` (a thread by default) and the crawl stops at the
+        first empty page or when ``_has_next_page`` finds no further page; pages
+        fetched speculatively past the end are cancelled and discarded. A
+        robots.txt Crawl-delay disables prefetching and spaces the requests.
+        Pages already in ``checkpoint`` are not fetched again, and new ones
+        are recorded in it.
+        """
+        if fetcher is None:
+            async with self.create_async_fetcher() as own_fetcher:
+                async for document in self.iter_pagination_async(
+                    base_url, max_pages=max_pages, prefetch=prefetch,
+                    fetcher=own_fetcher, run_parse=run_parse, checkpoint=checkpoint
+                ):
+                    yield document
+            return
+
+        run_parse = run_parse or asyncio.to_thread
+        prefetch = max(1, min(prefetch, fetcher.per_host_limit))
+        # A robots.txt Crawl-delay turns the crawl back into sequential requests, spaced
+        # by the fetcher's rate limiter (or here if it has none)
+        crawl_delay = await asyncio.to_thread(self.crawl_delay, base_url)
+        if crawl_delay:
+            prefetch = 1
         page_param = self._detect_pagination_parameter(base_url)
-        
-        for page_num in range(1, max_pages + 1):
-            # Construct page URL based on detected pattern
-            if "?" in base_url and page_param:
-                page_url = f"{base_url}&{page_param}={page_num}"
-            elif page_param:
-                page_url = f"{base_url}?{page_param}={page_num}"
-            else:
-                # Default to common pagination patterns
-                page_url = f"{base_url}?page={page_num}"
-                
-            logger.info(f"Extracting page {page_num}: {page_url}")
-            
-            html_content = self.fetch_page_with_retry(page_url)
-            if not html_content:
-                break
-                
-            # Check if this is the last page
-            soup = BeautifulSoup(html_content, 'html.parser')
-            all_content.append(html_content)
-            
-            if not self._has_next_page(soup, page_num):
-                logger.info(f"No more pages detected after page {page_num}")
-                break
+        logger.info(f"Handling pagination for {base_url} (max {max_pages} pages, prefetch {prefetch})")
+
+        pending = {}
+        next_to_schedule = 1
+        try:
+            for page_num in range(1, max_pages + 1):
+                if crawl_delay and page_num > 1 and fetcher.rate_limiter is None:
+                    await asyncio.sleep(crawl_delay)
                 
-            # Respect rate limiting
-            time.sleep(self.delay)
-        
-        return all_content
+                # Keep the prefetch window full
+                while next_to_schedule <= min(page_num + prefetch - 1, max_pages):
+                    page_url = self._page_url(base_url, page_param, next_to_schedule)
+                    logger.info(f"Extracting page {next_to_schedule}: {page_url}")
+                    fetch = fetcher.fetch(page_url) if checkpoint is None else checkpoint.fetch(fetcher, page_url)
+                    pending[next_to_schedule] = (page_url, asyncio.ensure_future(fetch))
+                    next_to_schedule += 1
+
+                page_url, fetch = pending.pop(page_num)
+                html_content = await fetch
+                if not html_content:
+                    break
+
+                # Parse once: the same document is reused for analysis and extraction
+                document = await run_parse(self.parse_document, html_content, page_url)
+                has_next_page = self._has_next_page(document, page_num)
+                yield document
+
+                # Check if this is the last page
+                if not has_next_page:
+                    logger.info(f"No more pages detected after page {page_num}")
+                    break
+        finally:
+            tasks = [task for _, task in pending.values()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            if checkpoint is not None:
+                checkpoint.flush()
     
+    def crawl(self, seed_urls, max_pages=100, max_depth=2, same_domain=True, concurrency=DEFAULT_CRAWL_CONCURRENCY,
+              resume=True):
+        """Follow links from the seed URLs, returning {url: ParsedDocument} in crawl order"""
+        return run_sync(self.crawl_async(
+            seed_urls, max_pages=max_pages, max_depth=max_depth, same_domain=same_domain, concurrency=concurrency,
+            resume=resume
+        ))
+
+    async def crawl_async(self, seed_urls, max_pages=100, max_depth=2, same_domain=True,
+                          concurrency=DEFAULT_CRAWL_CONCURRENCY, fetcher=None, run_parse=None, resume=True):
+        """Follow links from the seed URLs, returning {url: ParsedDocument} in crawl order
+
+        With ``resume``, an interrupted crawl with the same parameters picks up
+        its fetched pages and frontier from the checkpoint store.
+        """
+        async with self.job_checkpoint('crawl', resume=resume, seeds=list(seed_urls), max_pages=max_pages,
+                                       max_depth=max_depth, same_domain=same_domain) as checkpoint:
+            return {
+                url: document async for url, depth, document in self.iter_crawl_async(
+                    seed_urls, max_pages=max_pages, max_depth=max_depth, same_domain=same_domain,
+                    concurrency=concurrency, fetcher=fetcher, run_parse=run_parse, checkpoint=checkpoint
+                )
+            }
+
+    async def iter_crawl_async(self, seed_urls, max_pages=100, max_depth=2, same_domain=True,
+                               concurrency=DEFAULT_CRAWL_CONCURRENCY, fetcher=None, run_parse=None, frontier=None,
+                               checkpoint=None):
+        """Yield (url, depth, document) for each page reached by following links from the seeds
+
+        URLs come out of a CrawlFrontier, shallowest and most product-like
+        first. Up to ``concurrency`` pages are fetched at once. Per-host
+        concurrency and politeness are left to the fetcher and its rate
+        limiter. Every parsed page adds its links to the frontier until
+        ``max_pages`` pages have been fetched. Pages disallowed by robots.txt
+        are skipped.
+
+        With a ``checkpoint``, fetched pages are recorded together with
+        snapshots of the frontier. A resumed crawl first yields the pages it had
+        already fetched, then carries on from the saved frontier.
+        """
+        if fetcher is None:
+            async with self.create_async_fetcher() as own_fetcher:
+                async for page in self.iter_crawl_async(
+                    seed_urls, max_pages=max_pages, max_depth=max_depth, same_domain=same_domain,
+                    concurrency=concurrency, fetcher=own_fetcher, run_parse=run_parse, frontier=frontier,
+                    checkpoint=checkpoint
+                ):
+                    yield page
+            return
+
+        run_parse = run_parse or asyncio.to_thread
+        if frontier is None and checkpoint is not None and checkpoint.frontier_state:
+            frontier = CrawlFrontier.from_state(checkpoint.frontier_state)
+        elif frontier is None:
+            frontier = CrawlFrontier(seed_urls, max_depth=max_depth, same_domain=same_domain,
+                                     expected_urls=CRAWL_EXPECTED_URLS)
+        logger.info(f"Crawling from {len(seed_urls)} seed URL(s) (max {max_pages} pages, depth {max_depth}, "
+                    f"concurrency {concurrency})")
+
+        scheduled = 0
+        if checkpoint is not None:
+            # Pages of an interrupted run: their links are already in the restored frontier
+            async for url, depth, html_content in checkpoint.stored_pages():
+                scheduled += 1
+                yield url, depth, await run_parse(self.parse_document, html_content, url)
+
+        in_flight = {}
+        try:
+            while frontier or in_flight:
+                # Keep up to `concurrency` fetches running
+                while frontier and len(in_flight) < concurrency and scheduled < max_pages:
+                    url, depth = frontier.pop()
+                    if not await self.robots_cache.can_fetch_async(url):
+                        logger.info(f"Skipping {url}: disallowed by robots.txt")
+                        continue
+                    logger.info(f"Crawling {url} (depth {depth})")
+                    in_flight[asyncio.ensure_future(fetcher.fetch(url))] = (url, depth)
+                    scheduled += 1
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, depth = in_flight.pop(task)
+                    html_content = task.result()
+                    if not html_content:
+                        continue
+                    document = await run_parse(self.parse_document, html_content, url)
+                    if depth < max_depth:
+                        for link in self.document_links(document):
+                            frontier.add(link, depth + 1, base_url=url)
+                    if checkpoint is not None:
+                        # Recorded only once its links are queued, so a resume loses none
+                        checkpoint.record(url, html_content, depth)
+                        if checkpoint.due():
+                            await checkpoint.flush_async(frontier.to_state(in_flight.values()))
+                    yield url, depth, document
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            if checkpoint is not None:
+                checkpoint.flush(frontier.to_state(in_flight.values()))
+        logger.info(f"Crawl finished: {scheduled} pages fetched, {len(frontier)} URLs left in the frontier")
+
+    def document_links(self, document):
+        """Raw href of every followable link of a page"""
+        for a in document.links:
+            href = document.attr(a, 'href')
+            rel = document.attr(a, 'rel') or ''
+            if href and 'nofollow' not in (rel if isinstance(rel, str) else ' '.join(rel)):
+                yield href
+
     def _detect_pagination_parameter(self, url):
         """Try to detect the pagination parameter from the URL"""
         common_params = ['page', 'p', 'pg', 'pagina', 'pagenum', 'offset']
@@ -253,52 +880,36 @@ class WebScrapingAgent:
                 
         return 'page'  # Default
     
-    def _has_next_page(self, soup, current_page):
+    def _has_next_page(self, document, current_page):
         """Detect if there's a next page based on common pagination patterns"""
         # Look for "Next" links
-        next_links = soup.find_all('a', string=re.compile(r'next|suivant|prochain|>>', re.IGNORECASE))
-        if next_links:
-            return True
+        for a in document.anchors:
+            link_string = document.string(a)
+            if link_string is not None and NEXT_PAGE_PATTERN.search(link_string):
+                return True
             
         # Look for page numbers greater than current
-        page_links = soup.find_all('a', href=True, string=re.compile(r'^\d+$'))
-        page_numbers = [int(a.text.strip()) for a in page_links if a.text.strip().isdigit()]
+        page_texts = []
+        for a in document.links:
+            link_string = document.string(a)
+            if link_string is not None and PAGE_NUMBER_PATTERN.search(link_string):
+                page_texts.append(document.text(a).strip())
+        page_numbers = [int(text) for text in page_texts if text.isdigit()]
         if page_numbers and max(page_numbers) > current_page:
             return True
             
-        # Check for disabled "Next" buttons (indicates last page)
-        disabled_next = soup.find('a', class_=re.compile(r'disabled|inactive'), string=re.compile(r'next|suivant', re.IGNORECASE))
-        if disabled_next:
-            return False
-            
         return False
 
+    def parse_document(self, html_content, url=None):
+        """Parse HTML into a ParsedDocument, reusing it if it is already parsed"""
+        if isinstance(html_content, ParsedDocument):
+            return html_content
+        return create_document(html_content, self.parser_backend, url=url)
+
     def analyze_page_structure(self, html_content):
         """Analyze HTML structure and suggest available data elements"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Elements that commonly contain valuable data
-        data_elements = {
-            'Titres': len(soup.find_all(['h1', 'h2', 'h3'])),
-            'Paragraphes': len(soup.find_all('p')),
-            'Liens': len(soup.find_all('a', href=True)),
-            'Images': len(soup.find_all('img', src=True)),
-            'Tableaux': len(soup.find_all('table')),
-            'Listes': len(soup.find_all(['ul', 'ol'])),
-            'Formulaires': len(soup.find_all('form'))
-        }
-        
-        # Check for product structures
-        product_indicators = soup.find_all(class_=re.compile(r'product|item|card'))
-        if product_indicators:
-            data_elements['Produits'] = len(product_indicators)
-        
-        # Check for pricing elements
-        price_indicators = soup.find_all(string=re.compile(r'\$|€|\d+[,.]\d{2}'))
-        if price_indicators:
-            data_elements['Prix'] = len(price_indicators)
-            
-        return data_elements
+        document = self.parse_document(html_content)
+        return document.element_counts()
     
     def suggest_data_extraction(self, data_elements):
         """Suggest data types that can be extracted"""
@@ -339,7 +950,7 @@ class WebScrapingAgent:
     
     def get_output_format(self):
         """Get user preference for output format"""
-        formats = ["CSV", "JSON", "Excel", "Texte"]
+        formats = ["CSV", "JSON", "Excel", "Texte", *JSON_LINES_FORMATS, *COLUMNAR_FORMATS]
         
         print("\nDans quel format souhaitez-vous les données extraites?")
         for i, fmt in enumerate(formats, 1):
@@ -355,83 +966,96 @@ class WebScrapingAgent:
                 print("Veuillez entrer un nombre valide.")
     
     def extract_data(self, html_content, selected_elements):
-        """Extract selected data elements from HTML"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        extracted_data = {}
+        """Extract selected data elements from HTML or an already parsed document"""
+        document = self.parse_document(html_content)
+        extracted_data = {element: [] for element in selected_elements if element in EXTRACTABLE_ELEMENTS}
         
-        for element in selected_elements:
+        for key, item in self.iter_records(document, selected_elements):
+            extracted_data[key].append(item)
+        
+        return extracted_data
+    
+    def iter_records(self, html_content, selected_elements):
+        """Yield the selected data elements one (element, item) record at a time"""
+        document = self.parse_document(html_content)
+        
+        for element in dict.fromkeys(selected_elements):
             if element == 'Titres':
-                extracted_data['Titres'] = [h.text.strip() for h in soup.find_all(['h1', 'h2', 'h3'])]
+                for h in document.headings:
+                    yield 'Titres', document.text(h).strip()
             
             elif element == 'Paragraphes':
-                extracted_data['Paragraphes'] = [p.text.strip() for p in soup.find_all('p')]
+                for p in document.paragraphs:
+                    yield 'Paragraphes', document.text(p).strip()
             
             elif element == 'Liens':
-                links = []
-                for a in soup.find_all('a', href=True):
-                    href = a['href']
-                    text = a.text.strip()
+                for a in document.links:
+                    href = document.attr(a, 'href')
+                    text = document.text(a).strip()
                     if text and href:  # Only include non-empty links
-                        links.append({'texte': text, 'url': href})
-                extracted_data['Liens'] = links
+                        yield 'Liens', {'texte': text, 'url': href}
             
             elif element == 'Images':
-                images = []
-                for img in soup.find_all('img', src=True):
-                    src = img['src']
-                    alt = img.get('alt', '')
+                for img in document.images:
+                    src = document.attr(img, 'src')
+                    alt = document.attr(img, 'alt', '')
                     if src:  # Only include images with src
-                        images.append({'src': src, 'alt': alt})
-                extracted_data['Images'] = images
+                        yield 'Images', {'src': src, 'alt': alt}
             
             elif element == 'Tableaux':
-                tables = []
-                for i, table in enumerate(soup.find_all('table')):
+                for table in document.tables:
                     rows = []
-                    for tr in table.find_all('tr'):
-                        row = [td.text.strip() for td in tr.find_all(['td', 'th'])]
+                    for tr in document.rows(table):
+                        row = [document.text(td).strip() for td in document.cells(tr)]
                         if row:  # Only include non-empty rows
                             rows.append(row)
                     if rows:
-                        tables.append(rows)
-                extracted_data['Tableaux'] = tables
+                        yield 'Tableaux', rows
             
             elif element == 'Prix':
-                prices = []
-                price_elements = soup.find_all(string=re.compile(r'\$|€|\d+[,.]\d{2}'))
-                for price in price_elements:
+                for price in document.prices:
                     clean_price = price.strip()
                     if clean_price:
-                        prices.append(clean_price)
-                extracted_data['Prix'] = prices
+                        yield 'Prix', clean_price
             
             elif element == 'Produits':
-                products = []
-                for item in soup.find_all(class_=re.compile(r'product|item|card')):
+                for item in document.products:
                     product = {}
                     
                     # Try to extract product title
-                    title_elem = item.find(['h1', 'h2', 'h3', 'h4', 'h5']) or item.find(class_=re.compile(r'title|name'))
-                    if title_elem:
-                        product['titre'] = title_elem.text.strip()
+                    title_elem = document.find_first(item, ('h1', 'h2', 'h3', 'h4', 'h5'))
+                    if title_elem is None:
+                        title_elem = document.find_first_with_class(item, TITLE_CLASS_PATTERN)
+                    if title_elem is not None:
+                        product['titre'] = document.text(title_elem).strip()
                     
                     # Try to extract product price
-                    price_elem = item.find(string=re.compile(r'\$|€|\d+[,.]\d{2}'))
+                    price_elem = document.find_first_string(item, PRICE_PATTERN)
                     if price_elem:
                         product['prix'] = price_elem.strip()
                     
                     # Try to extract product image
-                    img_elem = item.find('img')
-                    if img_elem and img_elem.get('src'):
-                        product['image'] = img_elem['src']
+                    img_elem = document.find_first(item, ('img',))
+                    if img_elem is not None and document.attr(img_elem, 'src'):
+                        product['image'] = document.attr(img_elem, 'src')
                     
                     if product:  # Only add if we found some data
-                        products.append(product)
-                
-                extracted_data['Produits'] = products
-        
-        return extracted_data
+                        yield 'Produits', product
     
+    def extract_from_documents(self, documents, selected_elements):
+        """Extract data from several pages and merge it into one result"""
+        combined_data = {}
+        for document in documents:
+            extracted_data = self.extract_data(document, selected_elements)
+
+            # Merge data from multiple URLs/pages
+            for key, value in extracted_data.items():
+                if key not in combined_data:
+                    combined_data[key] = value
+                elif isinstance(value, list):
+                    combined_data[key].extend(value)
+        return combined_data
+
     def clean_data(self, extracted_data):
         """Clean and normalize extracted data"""
         cleaned_data = {}
@@ -479,8 +1103,31 @@ class WebScrapingAgent:
         return cleaned_data
     
     def transform_pipeline(self, data):
-        """Apply a sequence of transformations to the extracted data"""
+        """Apply the transformation pipeline to the extracted data in a single pass
+        
+        Each leaf string is cleaned, then has its dates and currencies normalized in
+        one walk over the data, instead of rebuilding the whole structure once per
+        step. The output is the same as running the individual steps in sequence,
+        which is still done if the fused pass fails so one failing step does not
+        lose the others. In 'columnar' transform mode large categories are
+        transformed with pandas string operations, with the same output.
+        """
         logger.info("Starting transformation pipeline")
+        try:
+            transformed = self._transform_categories(data)
+            transformed = self._validate_data_types(transformed)
+            return self._enrich_with_metadata(transformed)
+        except Exception as e:
+            logger.error(f"Fused transformation failed, running steps one by one: {e}")
+            return self._transform_stepwise(data)
+    
+    def _transform_categories(self, data):
+        """Clean and normalize every category with the engine of ``transform_mode``"""
+        transform_value = self._transform_value_columnar if self.transform_mode == 'columnar' else self._transform_value
+        return {key: transform_value(value) for key, value in data.items()}
+    
+    def _transform_stepwise(self, data):
+        """Apply each transformation step in turn over the whole data structure"""
         transformers = [
             self._clean_text_fields,
             self._normalize_dates,
@@ -498,6 +1145,132 @@ class WebScrapingAgent:
         
         return data
     
+    def _transform_leaf(self, value):
+        """Date then currency normalization of a single leaf value"""
+        if not isinstance(value, str):
+            return value
+        return self._normalize_currency_string(self._normalize_date_string(value))
+    
+    def _transform_nested(self, value):
+        """Normalize every leaf of an arbitrarily nested value"""
+        if isinstance(value, dict):
+            return {k: self._transform_nested(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            return [self._transform_nested(item) for item in value]
+        return self._transform_leaf(value)
+    
+    def _transform_value(self, value):
+        """Clean and normalize one top-level category, as _clean_text_fields then the leaf steps would"""
+        if not isinstance(value, list):
+            return self._transform_nested(value)
+        
+        transform_leaf = self._transform_leaf
+        clean_text = self._clean_text
+        if all(isinstance(item, str) for item in value):
+            return [transform_leaf(clean_text(item)) for item in value if item]
+        elif all(isinstance(item, dict) for item in value):
+            items = []
+            for item in value:
+                if item:
+                    items.append({
+                        k: transform_leaf(clean_text(v)) if isinstance(v, str) else self._transform_nested(v)
+                        for k, v in item.items()
+                    })
+            return items
+        elif all(isinstance(item, list) for item in value):
+            tables = []
+            for table in value:
+                rows = []
+                for row in table:
+                    cleaned_row = [clean_text(cell) if isinstance(cell, str) else cell for cell in row]
+                    if any(cell for cell in cleaned_row):
+                        rows.append([self._transform_nested(cell) for cell in cleaned_row])
+                if rows:
+                    tables.append(rows)
+            return tables
+        return self._transform_nested(value)
+    
+    def _transform_value_columnar(self, value):
+        """Columnar equivalent of _transform_value for large string, dictionary and table categories
+        
+        Every string cell of the category is loaded into one pandas column and goes
+        through vectorized cleanup, date and currency normalization; the structure
+        is then rebuilt around the transformed cells.
+        """
+        if not isinstance(value, list) or not value:
+            return self._transform_value(value)
+        
+        if all(isinstance(item, str) for item in value):
+            strings = [item for item in value if item]
+            if len(strings) < COLUMNAR_MIN_CELLS:
+                return self._transform_value(value)
+            return self._transform_strings_columnar(strings)
+        
+        elif all(isinstance(item, dict) for item in value):
+            items = [dict(item) for item in value if item]
+            positions = [(item, k) for item in items for k, v in item.items() if isinstance(v, str)]
+            if len(positions) < COLUMNAR_MIN_CELLS:
+                return self._transform_value(value)
+            for item in items:
+                for k, v in item.items():
+                    if not isinstance(v, str):
+                        item[k] = self._transform_nested(v)
+            transformed = self._transform_strings_columnar([item[k] for item, k in positions])
+            for (item, k), cell in zip(positions, transformed):
+                item[k] = cell
+            return items
+        
+        elif all(isinstance(item, list) for item in value):
+            tables = [[list(row) for row in table] for table in value]
+            positions = [
+                (row, i) for table in tables for row in table
+                for i, cell in enumerate(row) if isinstance(cell, str)
+            ]
+            if len(positions) < COLUMNAR_MIN_CELLS:
+                return self._transform_value(value)
+            for table in tables:
+                for row in table:
+                    for i, cell in enumerate(row):
+                        if not isinstance(cell, str):
+                            row[i] = self._transform_nested(cell)
+            transformed = self._transform_strings_columnar([row[i] for row, i in positions])
+            for (row, i), cell in zip(positions, transformed):
+                row[i] = cell
+            # Date and currency normalization never change whether a cell is empty,
+            # so empty rows can be dropped after the whole transformation
+            tables = [[row for row in table if any(cell for cell in row)] for table in tables]
+            return [table for table in tables if table]
+        
+        return self._transform_value(value)
+    
+    def _transform_strings_columnar(self, strings):
+        """Clean and normalize a list of strings with columnar string operations
+        
+        Tag stripping, whitespace cleanup and the date/currency candidate filters
+        run as vectorized kernels (Arrow when pyarrow is installed). Dates and
+        currencies are then normalized row-wise, but only once per distinct
+        candidate string, so the result is exactly that of the row-wise path.
+        """
+        patterns = COLUMNAR_PATTERNS[COLUMNAR_STRING_DTYPE]
+        series = pd.Series(strings, dtype=COLUMNAR_STRING_DTYPE)
+        series = series.str.replace(patterns['html_tag'], '', regex=True)
+        # Every whitespace run becomes one space, so stripping spaces is enough
+        series = series.str.replace(patterns['whitespace'], ' ', regex=True).str.strip(' ')
+        series = self._normalize_candidates_columnar(series, patterns['date'], self._normalize_date_string)
+        series = self._normalize_candidates_columnar(series, patterns['currency'], self._normalize_currency_string)
+        return series.tolist()
+    
+    def _normalize_candidates_columnar(self, series, candidate_pattern, normalize):
+        """Apply ``normalize`` to each distinct value matching ``candidate_pattern``"""
+        mask = series.str.contains(candidate_pattern, regex=True)
+        if not mask.any():
+            return series
+        codes, uniques = pd.factorize(series[mask])
+        normalized = [normalize(value) for value in uniques]
+        series = series.astype(object)
+        series[mask] = [normalized[code] for code in codes]
+        return series.astype(COLUMNAR_STRING_DTYPE)
+    
     def _clean_text_fields(self, data):
         """Clean text fields by removing extra whitespace, HTML tags, etc."""
         logger.info("Cleaning text fields")
@@ -507,10 +1280,7 @@ class WebScrapingAgent:
             if isinstance(value, list):
                 if all(isinstance(item, str) for item in value):
                     # Clean text in string lists
-                    cleaned_data[key] = [
-                        re.sub(r'\s+', ' ', self._strip_html(item)).strip()
-                        for item in value if item
-                    ]
+                    cleaned_data[key] = [self._clean_text(item) for item in value if item]
                 elif all(isinstance(item, dict) for item in value):
                     # Clean text in dictionaries
                     cleaned_items = []
@@ -518,7 +1288,7 @@ class WebScrapingAgent:
                         cleaned_item = {}
                         for k, v in item.items():
                             if isinstance(v, str):
-                                cleaned_item[k] = re.sub(r'\s+', ' ', self._strip_html(v)).strip()
+                                cleaned_item[k] = self._clean_text(v)
                             else:
                                 cleaned_item[k] = v
                         if cleaned_item:
@@ -531,8 +1301,7 @@ class WebScrapingAgent:
                         cleaned_table = []
                         for row in table:
                             cleaned_row = [
-                                re.sub(r'\s+', ' ', self._strip_html(str(cell))).strip() 
-                                if isinstance(cell, str) else cell 
+                                self._clean_text(str(cell)) if isinstance(cell, str) else cell
                                 for cell in row
                             ]
                             if any(cell for cell in cleaned_row):
@@ -547,79 +1316,58 @@ class WebScrapingAgent:
         
         return cleaned_data
     
+    def _clean_text(self, text):
+        """Strip HTML tags and collapse whitespace"""
+        # str.split() splits on exactly the characters matched by \s
+        return ' '.join(self._strip_html(text).split())
+    
     def _strip_html(self, text):
         """Remove HTML tags from text"""
-        return re.sub(r'<[^>]+>', '', text)
+        return HTML_TAG_PATTERN.sub('', text) if '<' in text else text
     
     def _normalize_dates(self, data):
         """Convert various date formats to ISO standard"""
         logger.info("Normalizing date formats")
-        date_patterns = [
-            (r'\d{2}/\d{2}/\d{4}', '%d/%m/%Y'),  # 31/12/2021
-            (r'\d{2}-\d{2}-\d{4}', '%d-%m-%Y'),  # 31-12-2021
-            (r'\d{4}/\d{2}/\d{2}', '%Y/%m/%d'),  # 2021/12/31
-            (r'\d{4}-\d{2}-\d{2}', '%Y-%m-%d'),  # 2021-12-31
-            # Add more patterns as needed
-        ]
-        
-        def normalize_date_string(text):
-            if not isinstance(text, str):
-                return text
-                
-            # Check if the text contains a date
-            for pattern, format_string in date_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    try:
-                        date_str = match.group(0)
-                        date_obj = datetime.strptime(date_str, format_string)
-                        return text.replace(date_str, date_obj.strftime('%Y-%m-%d'))
-                    except ValueError:
-                        pass
-            return text
         
         # Apply date normalization across the data structure
-        return self._traverse_and_transform(data, normalize_date_string)
+        return self._traverse_and_transform(data, self._normalize_date_string)
+    
+    def _normalize_date_string(self, text):
+        """Rewrite the first recognised date in a string as YYYY-MM-DD"""
+        if not isinstance(text, str):
+            return text
+            
+        # Check if the text contains a date
+        if not ANY_DATE_PATTERN.search(text):
+            return text
+        for pattern, format_string in DATE_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                date_str = match.group(0)
+                iso_date = _iso_date(date_str, format_string)
+                if iso_date is not None:
+                    return text.replace(date_str, iso_date)
+        return text
     
     def _convert_currencies(self, data):
         """Normalize currency values"""
         logger.info("Converting currencies to standard format")
         
-        def normalize_currency(text):
-            if not isinstance(text, str):
-                return text
-                
-            # Match currency patterns like $1,234.56, €1.234,56, etc.
-            currency_match = re.search(r'([€$£¥])\s*(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))', text)
-            if currency_match:
-                currency_symbol = currency_match.group(1)
-                value_str = currency_match.group(2)
-                
-                # Normalize to decimal format
-                if ',' in value_str and '.' in value_str:
-                    if value_str.find(',') > value_str.find('.'):  # Format: 1.234,56
-                        normalized_value = value_str.replace('.', '').replace(',', '.')
-                    else:  # Format: 1,234.56
-                        normalized_value = value_str.replace(',', '')
-                elif ',' in value_str:  # Could be either decimal or thousand separator
-                    # Heuristic: if two digits after comma, treat as decimal
-                    if re.search(r',\d{2}$', value_str):
-                        normalized_value = value_str.replace(',', '.')
-                    else:
-                        normalized_value = value_str.replace(',', '')
-                else:
-                    normalized_value = value_str
-                
-                try:
-                    # Format as decimal with 2 places
-                    amount = float(normalized_value)
-                    return text.replace(currency_match.group(0), f"{currency_symbol}{amount:.2f}")
-                except ValueError:
-                    pass
-            return text
-        
         # Apply currency normalization across the data structure
-        return self._traverse_and_transform(data, normalize_currency)
+        return self._traverse_and_transform(data, self._normalize_currency_string)
+    
+    def _normalize_currency_string(self, text):
+        """Rewrite the first currency amount in a string with two decimals"""
+        if not isinstance(text, str):
+            return text
+            
+        # Match currency patterns like $1,234.56, €1.234,56, etc.
+        currency_match = CURRENCY_PATTERN.search(text)
+        if currency_match:
+            amount = _normalized_amount(currency_match.group(2))
+            if amount is not None:
+                return text.replace(currency_match.group(0), f"{currency_match.group(1)}{amount}")
+        return text
     
     def _validate_data_types(self, data):
         """Validate and correct data types"""
@@ -630,16 +1378,185 @@ class WebScrapingAgent:
         """Add metadata to the extracted data"""
         logger.info("Enriching data with metadata")
         
-        # Add extraction metadata
-        metadata = {
+        # Add metadata while preserving original data
+        enriched_data = {'_metadata': self._extraction_metadata()}
+        enriched_data.update(data)
+        
+        return enriched_data
+    
+    def _extraction_metadata(self):
+        """Metadata describing this extraction run"""
+        return {
             'extraction_timestamp': datetime.now().isoformat(),
             'scraper_version': '1.1.0',
         }
+    
+    def transform_record(self, item):
+        """Apply the transformation pipeline to a single record, returning None if it is dropped"""
+        if isinstance(item, str):
+            if not item:
+                return None
+            item = self._clean_text(item)
+        elif isinstance(item, dict):
+            item = {k: self._clean_text(v) if isinstance(v, str) else v for k, v in item.items()}
+            if not item:
+                return None
+        elif isinstance(item, list):
+            # Tables: clean every cell and drop empty rows
+            rows = []
+            for row in item:
+                cleaned_row = [self._clean_text(cell) if isinstance(cell, str) else cell for cell in row]
+                if any(cell for cell in cleaned_row):
+                    rows.append(cleaned_row)
+            if not rows:
+                return None
+            item = rows
+        
+        return self._transform_nested(item)
+    
+    def stream_records(self, documents, selected_elements):
+        """Yield transformed (element, item) records page by page
+        
+        Unlike extract_data followed by transform_pipeline, nothing is accumulated:
+        ``documents`` may be a generator and each record can be written out as soon
+        as it is produced, so memory use does not grow with the number of pages.
+        """
+        for document in documents:
+            for key, item in self.iter_records(document, selected_elements):
+                transformed = self.transform_record(item)
+                if transformed is not None:
+                    yield key, transformed
+    
+    def extract_page_records(self, html_content, selected_elements):
+        """Extract and transform the records of a single page"""
+        return list(self.stream_records([html_content], selected_elements))
+    
+    def transform_pages(self, pages_data):
+        """Transform the extract_data output of several pages together, returning each page's records
+        
+        The pages are merged and go through the engine of ``transform_mode`` in
+        one pass, as transform_pipeline would transform them, then the
+        transformed items are split back into one (element, item) list per page.
+        """
+        combined = {}
+        for data in pages_data:
+            for key, items in data.items():
+                combined.setdefault(key, []).extend(items)
+        try:
+            transformed = self._transform_categories(combined)
+        except Exception as e:
+            logger.error(f"Fused transformation failed, transforming records one by one: {e}")
+            return [
+                [(key, record) for key, items in data.items() for item in items
+                 if (record := self.transform_record(item)) is not None]
+                for data in pages_data
+            ]
+        
+        positions = dict.fromkeys(transformed, 0)
+        pages_records = []
+        for data in pages_data:
+            records = []
+            for key, items in data.items():
+                # The engines drop the same items transform_record drops, so count what each page keeps
+                kept = sum(1 for item in items if self._record_kept(item))
+                start = positions[key]
+                records.extend((key, item) for item in transformed[key][start:start + kept])
+                positions[key] = start + kept
+            pages_records.append(records)
+        return pages_records
+    
+    def _record_kept(self, item):
+        """Whether the transformation keeps an extracted item (tables need a non-empty row)"""
+        if isinstance(item, list):
+            return any(
+                any(self._clean_text(cell) if isinstance(cell, str) else cell for cell in row) for row in item
+            )
+        return bool(item)
+    
+    def _stored_page(self, url, html_content, selected_elements):
+        """(content_hash, selection, stored (hash, records) or None) of a page in the page store"""
+        html = html_content.html if isinstance(html_content, ParsedDocument) else html_content
+        selection = selection_key(selected_elements, self.parser_backend)
+        return page_hash(html), selection, self.page_store.lookup(url, selection)
+    
+    def _save_page(self, url, selection, content_hash, stored, records):
+        """Store a new or changed page's records, returning its change report"""
+        self.page_store.save(url, selection, content_hash, records)
+        if stored is None:
+            return {'url': url, 'status': 'new', 'added': [], 'removed': []}
+        added, removed = record_diff(stored[1], records)
+        logger.info(f"{url} changed: {len(added)} records added, {len(removed)} removed")
+        return {'url': url, 'status': 'changed', 'added': added, 'removed': removed}
+    
+    def page_records(self, url, html_content, selected_elements):
+        """Transformed records of one page, reusing the stored ones if the page has not changed
+        
+        ``html_content`` may be raw HTML or a ParsedDocument; raw HTML of an
+        unchanged page is never parsed. Returns the records and a change report
+        ``{'url', 'status', 'added', 'removed'}`` where status is 'new',
+        'changed' or 'unchanged', and added/removed list the records that differ
+        from the stored version of a changed page.
+        """
+        if self.page_store is None:
+            records, = self.transform_pages([self.extract_data(html_content, selected_elements)])
+            return records, {'url': url, 'status': 'new', 'added': [], 'removed': []}
+        
+        content_hash, selection, stored = self._stored_page(url, html_content, selected_elements)
+        if stored is not None and stored[0] == content_hash:
+            logger.info(f"{url} unchanged, reusing its {len(stored[1])} stored records")
+            return stored[1], {'url': url, 'status': 'unchanged', 'added': [], 'removed': []}
+        
+        records, = self.transform_pages([self.extract_data(html_content, selected_elements)])
+        return records, self._save_page(url, selection, content_hash, stored, records)
+    
+    def extract_incremental(self, pages, selected_elements):
+        """Extract and transform several pages, reusing the records of unchanged ones
+        
+        ``pages`` yields (url, raw HTML or ParsedDocument) pairs. Returns the same
+        data as transform_pipeline(extract_from_documents(...)), with a summary of
+        what changed since the last scrape under ``_metadata['changes']``. New
+        and changed pages are transformed together by the ``transform_mode``
+        engine; unchanged pages reuse their stored records.
+        """
+        data = {element: [] for element in selected_elements if element in EXTRACTABLE_ELEMENTS}
+        changes = {'new': 0, 'changed': 0, 'unchanged': 0, 'diff': {}}
+        
+        # Look up every page first so the modified ones can be transformed in one pass
+        pages_records = []
+        modified = []
+        for url, html_content in pages:
+            if self.page_store is None:
+                stored_page = None
+            else:
+                stored_page = self._stored_page(url, html_content, selected_elements)
+                content_hash, selection, stored = stored_page
+                if stored is not None and stored[0] == content_hash:
+                    logger.info(f"{url} unchanged, reusing its {len(stored[1])} stored records")
+                    pages_records.append((stored[1], {'url': url, 'status': 'unchanged', 'added': [], 'removed': []}))
+                    continue
+            modified.append((len(pages_records), url, stored_page, self.extract_data(html_content, selected_elements)))
+            pages_records.append(None)
         
-        # Add metadata while preserving original data
-        enriched_data = {'_metadata': metadata}
-        enriched_data.update(data)
-        
+        transformed = self.transform_pages([extracted for _, _, _, extracted in modified])
+        for (index, url, stored_page, _), records in zip(modified, transformed):
+            if stored_page is None:
+                change = {'url': url, 'status': 'new', 'added': [], 'removed': []}
+            else:
+                change = self._save_page(url, stored_page[1], stored_page[0], stored_page[2], records)
+            pages_records[index] = (records, change)
+        
+        for records, change in pages_records:
+            for key, item in records:
+                data[key].append(item)
+            changes[change['status']] += 1
+            if change['status'] == 'changed':
+                changes['diff'][change['url']] = {
+                    'added': [{'category': key, 'item': item} for key, item in change['added']],
+                    'removed': [{'category': key, 'item': item} for key, item in change['removed']],
+                }
+        
+        enriched_data = self._enrich_with_metadata(self._validate_data_types(data))
+        enriched_data['_metadata']['changes'] = changes
         return enriched_data
     
     def _traverse_and_transform(self, data, transform_func):
@@ -688,12 +1605,22 @@ class WebScrapingAgent:
                     if len(value) > 2:
                         print(f"  ... et {len(value)-2} autres tableaux")
     
-    def export_data(self, data, output_format, url):
-        """Export data in the requested format"""
-        # Create a filename based on the domain name and current datetime
+    def _export_base_filename(self, url):
+        """Create a filename based on the domain name and current datetime"""
         domain = urlparse(url).netloc.replace("www.", "")
         timestamp = time.strftime("%Y%m%d-%H%M%S")
-        base_filename = f"scraping_{domain}_{timestamp}"
+        return f"scraping_{domain}_{timestamp}"
+    
+    def open_record_writer(self, output_format, url):
+        """Open an incremental writer for stream_records output"""
+        writer_class = STREAMING_WRITERS.get(output_format)
+        if writer_class is None:
+            raise ValueError(f"Format non supporté en mode streaming: {output_format}")
+        return writer_class(self._export_base_filename(url), metadata=self._extraction_metadata())
+    
+    def export_data(self, data, output_format, url):
+        """Export data in the requested format"""
+        base_filename = self._export_base_filename(url)
         
         if output_format == "CSV":
             return self.export_to_csv(data, base_filename)
@@ -703,6 +1630,8 @@ class WebScrapingAgent:
             return self.export_to_excel(data, base_filename)
         elif output_format == "Texte":
             return self.export_to_text(data, base_filename)
+        elif output_format in JSON_LINES_FORMATS or output_format in COLUMNAR_FORMATS:
+            return self.export_records(data, base_filename, output_format)
         else:
             print(f"Format non supporté: {output_format}")
             return None
@@ -757,8 +1686,8 @@ class WebScrapingAgent:
         filename = f"{base_filename}.json"
         
         try:
-            with open(filename, 'w', encoding='utf-8') as file:
-                json.dump(data, file, ensure_ascii=False, indent=2)
+            with open(filename, 'wb') as file:
+                file.write(fast_json.dumps(data, indent=True))
             
             print(f"Données exportées vers {filename}")
             return filename
@@ -842,87 +1771,89 @@ class WebScrapingAgent:
             print(f"Erreur lors de l'exportation vers texte: {str(e)}")
             return None
     
-    def load_to_database(self, data, db_path):
-        """Load extracted data to SQLite database"""
-        logger.info(f"Loading data to database: {db_path}")
+    def export_records(self, data, base_filename, output_format):
+        """Export data record by record with a streaming writer (JSON Lines, Parquet or Arrow IPC)"""
+        try:
+            writer = STREAMING_WRITERS[output_format](base_filename, metadata=data.get('_metadata'))
+        except ImportError as e:
+            print(f"Erreur lors de l'exportation vers {output_format}: {str(e)}")
+            return None
         
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Create tables based on data structure
             for key, value in data.items():
-                if key.startswith('_'):  # Skip metadata
-                    continue
-                    
-                if not value or not isinstance(value, list):
+                if key.startswith('_') or not value or not isinstance(value, list):
                     continue
-                
-                # For simple lists of strings
-                if all(isinstance(item, str) for item in value):
-                    table_name = f"scraping_{key.lower()}"
-                    cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-                    cursor.execute(f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY, value TEXT)")
-                    
-                    for item in value:
-                        cursor.execute(f"INSERT INTO {table_name} (value) VALUES (?)", (item,))
-                
-                # For lists of dictionaries
-                elif all(isinstance(item, dict) for item in value) and value:
-                    table_name = f"scraping_{key.lower()}"
-                    cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-                    
-                    # Get column names from first item
-                    sample_item = value[0]
-                    columns = list(sample_item.keys())
-                    
-                    # Create table with dynamic columns
-                    columns_sql = ", ".join([f"{col} TEXT" for col in columns])
-                    cursor.execute(f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY, {columns_sql})")
-                    
-                    # Insert data
-                    for item in value:
-                        placeholders = ", ".join(["?"] * len(columns))
-                        values = [str(item.get(col, '')) for col in columns]
-                        cursor.execute(
-                            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})",
-                            values
-                        )
-            
-            conn.commit()
+                writer.write_many((key, item) for item in value)
+        except Exception as e:
+            print(f"Erreur lors de l'exportation vers {output_format}: {str(e)}")
+            return None
+        finally:
+            filenames = writer.close()
+        
+        return filenames if filenames else None
+    
+    def load_to_database(self, data, db_path, mode=DEFAULT_LOAD_MODE):
+        """Load extracted data to SQLite database
+        
+        Records are bulk-inserted in one transaction into tables that are kept
+        between runs; ``mode`` is 'append' (skip records already loaded) or
+        'upsert' (also refresh their last_seen).
+        """
+        logger.info(f"Loading data to database: {db_path}")
+        
+        try:
+            SQLiteLoader(db_path, mode=mode).load(data)
             logger.info("Database load completed successfully")
             return True
         except Exception as e:
             logger.error(f"Database load failed: {e}")
-            if conn:
-                conn.rollback()
             return False
-        finally:
-            if conn:
-                conn.close()
 
-    def extract_multiple_urls(self, urls):
+    def create_async_fetcher(self, **kwargs):
+        """Create an AsyncFetcher sharing this agent's headers and user agents"""
+        kwargs.setdefault('http_cache', self.http_cache)
+        kwargs.setdefault('rate_limiter', self.rate_limiter)
+        kwargs.setdefault('retry_policy', self.retry_policy)
+        return AsyncFetcher(headers=self.headers, user_agents=self.user_agents, **kwargs)
+
+    async def extract_multiple_urls_async(self, urls, fetcher=None, resume=True):
+        """Fetch multiple URLs concurrently on the event loop
+
+        With ``resume``, URLs fetched by an interrupted run of the same list are
+        read back from the checkpoint store instead of being fetched again.
+        """
+        logger.info(f"Extracting data from {len(urls)} URLs concurrently")
+
+        async with self.job_checkpoint('urls', resume=resume, urls=sorted(set(urls))) as checkpoint:
+            if fetcher is not None:
+                return await fetcher.fetch_many(urls, checkpoint=checkpoint)
+
+            async with self.create_async_fetcher() as own_fetcher:
+                return await own_fetcher.fetch_many(urls, checkpoint=checkpoint)
+
+    def extract_multiple_urls(self, urls, resume=True):
         """Extract data from multiple URLs in parallel"""
-        logger.info(f"Extracting data from {len(urls)} URLs in parallel")
-        
-        results = {}
-        max_workers = min(multiprocessing.cpu_count() * 2, len(urls))
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_url = {executor.submit(self.fetch_page_with_retry, url): url for url in urls}
-            for future in concurrent.futures.as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    content = future.result()
-                    if content:
-                        results[url] = content
-                        logger.info(f"Successfully extracted data from {url}")
-                    else:
-                        logger.warning(f"No content extracted from {url}")
-                except Exception as e:
-                    logger.error(f"Exception extracting {url}: {e}")
-        
-        return results
+        return run_sync(self.extract_multiple_urls_async(urls, resume=resume))
+
+    @asynccontextmanager
+    async def job_checkpoint(self, kind, key=None, resume=True, **params):
+        """Checkpoint of a multi-page job, or None if checkpointing is off
+
+        The job is keyed by ``key`` or, by default, by its kind and parameters,
+        so running it again resumes it. The checkpoint is dropped when the job
+        completes and flushed when it fails, ready for the next attempt.
+        """
+        if not resume or self.checkpoint_store is None:
+            yield None
+            return
+        key = key or checkpoint_key(kind, **params)
+        checkpoint = await asyncio.to_thread(self.checkpoint_store.open, key, kind, params)
+        try:
+            yield checkpoint
+        except BaseException:
+            checkpoint.flush()
+            raise
+        await asyncio.to_thread(checkpoint.clear)
     
     def run(self):
         """Run the web scraping agent workflow with ETL pipeline"""
@@ -956,24 +1887,55 @@ class WebScrapingAgent:
                 print("Gestion de la pagination en cours...")
                 paginated_contents = self.handle_pagination(url)
                 if paginated_contents:
-                    all_html_contents[url] = paginated_contents[0]  # Only use first page for analysis
+                    all_html_contents[url] = paginated_contents
                     print(f"Extraites {len(paginated_contents)} pages depuis {url}")
             elif use_selenium:
                 html_content = self.extract_with_selenium(url)
                 if html_content:
-                    all_html_contents[url] = html_content
+                    all_html_contents[url] = [html_content]
             else:
                 html_content = self.fetch_page_with_retry(url)
                 if html_content:
-                    all_html_contents[url] = html_content
+                    # Parsed later, only if the page changed since the last run
+                    all_html_contents[url] = [html_content]
+        
+        self.process_documents(all_html_contents, urls[0])
+    
+    def run_crawl(self):
+        """Crawl a site by following its links, then run the ETL workflow on every page found"""
+        self.welcome_message()
         
+        seed_url = self.get_website_url()
+        if not self.check_robots_txt(seed_url):
+            print(f"Extraction annulée pour {seed_url} conformément aux directives éthiques.")
+            return
+        
+        max_depth = input("Profondeur maximale de liens à suivre (défaut: 2): ").strip()
+        max_pages = input("Nombre maximal de pages à extraire (défaut: 100): ").strip()
+        same_domain = input("Rester sur le même domaine? (oui/non, défaut: oui): ").lower() not in ['non', 'n', 'no']
+        max_depth = int(max_depth) if max_depth.isdigit() else 2
+        max_pages = int(max_pages) if max_pages.isdigit() else 100
+        
+        print(f"\nExploration de {seed_url} (profondeur {max_depth}, {max_pages} pages maximum). Veuillez patienter...")
+        documents = self.crawl([seed_url], max_pages=max_pages, max_depth=max_depth, same_domain=same_domain)
+        print(f"Extraites {len(documents)} pages depuis {seed_url}")
+        
+        self.process_documents({url: [document] for url, document in documents.items()}, seed_url)
+    
+    def process_documents(self, all_html_contents, reference_url):
+        """Analyze, extract, transform and export the pages fetched for one run
+
+        ``all_html_contents`` maps each URL to its pages, raw HTML or parsed;
+        ``reference_url`` names the output files.
+        """
         if not all_html_contents:
             print("Impossible de continuer sans contenu de page.")
             return
         
-        # Use the first URL's content for structure analysis
+        # Use the first URL's content for structure analysis, parsed once for analysis and extraction
         sample_url = list(all_html_contents.keys())[0]
-        sample_content = all_html_contents[sample_url]
+        sample_content = self.parse_document(all_html_contents[sample_url][0], sample_url)
+        all_html_contents[sample_url][0] = sample_content
         
         # Step 3: Analyze page structure and get user preferences
         print("Analyse de la structure de la page...")
@@ -986,25 +1948,28 @@ class WebScrapingAgent:
         output_format = self.get_output_format()
         
         # Step 4: ETL Pipeline
-        combined_data = {}
-        
         print("\nDémarrage du pipeline ETL (Extraction, Transformation, Chargement)...")
         print("Extraction des données en cours...")
         
-        # Extract data from all URLs/pages
-        for url, html_content in all_html_contents.items():
-            extracted_data = self.extract_data(html_content, selected_elements)
+        if self.page_store is not None:
+            # Pages unchanged since the last run reuse their stored records
+            pages = [
+                (getattr(document, 'url', None) or url, document)
+                for url, url_documents in all_html_contents.items() for document in url_documents
+            ]
+            print("Transformation et nettoyage des données...")
+            transformed_data = self.extract_incremental(pages, selected_elements)
+            changes = transformed_data['_metadata']['changes']
+            print(f"Pages inchangées: {changes['unchanged']}, modifiées: {changes['changed']}, "
+                  f"nouvelles: {changes['new']}")
+        else:
+            # Extract data from all URLs and pages
+            documents = [document for url_documents in all_html_contents.values() for document in url_documents]
+            combined_data = self.extract_from_documents(documents, selected_elements)
             
-            # Merge data from multiple URLs
-            for key, value in extracted_data.items():
-                if key not in combined_data:
-                    combined_data[key] = value
-                elif isinstance(value, list):
-                    combined_data[key].extend(value)
-        
-        # Transform data
-        print("Transformation et nettoyage des données...")
-        transformed_data = self.transform_pipeline(combined_data)
+            # Transform data
+            print("Transformation et nettoyage des données...")
+            transformed_data = self.transform_pipeline(combined_data)
         
         if not transformed_data:
             print("Aucune donnée n'a pu être extraite ou transformée avec les sélections actuelles.")
@@ -1022,7 +1987,7 @@ class WebScrapingAgent:
                 print(f"Données chargées avec succès dans la base de données: {db_path}")
         else:
             # Use existing export methods
-            output_file = self.export_data(transformed_data, output_format, urls[0])
+            output_file = self.export_data(transformed_data, output_format, reference_url)
         
             if output_file:
                 print(f"\nMission accomplie! Les données ont été extraites et exportées avec succès.")
@@ -1054,11 +2019,11 @@ class WebScraperETL(ETLPipeline):
     
     def transform(self, raw_data):
         """Transform raw HTML data"""
-        # First parse with BeautifulSoup
-        soup = BeautifulSoup(raw_data, 'html.parser')
+        # Parse once and share the document between analysis and extraction
+        document = self.agent.parse_document(raw_data)
         
         # Analyze available elements
-        data_elements = self.agent.analyze_page_structure(raw_data)
+        data_elements = self.agent.analyze_page_structure(document)
         available_elements = self.agent.suggest_data_extraction(data_elements)
         
         if not available_elements:
@@ -1068,7 +2033,7 @@ class WebScraperETL(ETLPipeline):
         selected_elements = self.agent.get_extraction_preferences(available_elements)
         
         # Extract and transform data
-        extracted_data = self.agent.extract_data(raw_data, selected_elements)
+        extracted_data = self.agent.extract_data(document, selected_elements)
         transformed_data = self.agent.transform_pipeline(extracted_data)
         
         return transformed_data
@@ -1096,8 +2061,9 @@ Choisissez votre approche:
 1. Interface interactive classique
 2. Pipeline ETL structuré
 3. Extraction multi-URL en parallèle
+4. Exploration d'un site en suivant les liens (crawl)
 
-Votre choix (1-3): """)
+Votre choix (1-4): """)
     
     if approach == "1":
         agent = WebScrapingAgent()
@@ -1112,6 +2078,9 @@ Votre choix (1-3): """)
         urls = [url.strip() for url in urls_input.split(',')]
         results = agent.extract_multiple_urls(urls)
         print(f"Extraction terminée pour {len(results)} URLs sur {len(urls)}")
+    elif approach == "4":
+        agent = WebScrapingAgent()
+        agent.run_crawl()
     else:
         print("Choix invalide. Utilisation de l'interface classique.")
         agent = WebScrapingAgent()
@@ -1,19 +1,30 @@
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import asyncio
+import itertools
 import json
+import logging
 import os
+import time
 import uuid
-from datetime import datetime
 import nest_asyncio
 
 # Import notre agent de web scraping
 from web_scraping_agent import WebScrapingAgent, WebScraperETL
+from executor_pools import InstrumentedExecutor
+from job_queue import (JobQueue, WorkerPool, TERMINAL_STATES, queue_db_from_env, queue_options_from_env,
+                       visibility_timeout_from_env)
+from checkpoint import get_default_checkpoint_store
+from page_store import get_default_page_store
+from stream_export import iter_json_lines
+import fast_json
+
+logger = logging.getLogger("WebScraperETL")
 
 # Modèle pour les requêtes d'extraction
 class ScrapeRequest(BaseModel):
@@ -23,22 +34,40 @@ class ScrapeRequest(BaseModel):
     handle_pagination: bool = False
     max_pages: int = 5
     output_format: str = "JSON"
+    priority: int = 0
+    wait_for: str = "dom_ready"  # Selenium: dom_ready | network_idle | selector
+    wait_selector: Optional[str] = None
+    streaming: bool = False  # écrire les enregistrements page par page (CSV, JSON Lines, Parquet ou Arrow)
+
+# Modèle pour les explorations: les liens sont suivis à partir de l'URL de départ
+class CrawlRequest(ScrapeRequest):
+    max_pages: int = Field(100, ge=1)
+    max_depth: int = Field(2, ge=0)
+    same_domain: bool = True
+    concurrency: int = Field(int(os.environ.get("SCRAPER_CRAWL_CONCURRENCY", 8)), ge=1)
 
 # Modèle pour les résultats d'extraction
 class ScrapeResult(BaseModel):
     task_id: str
     status: str
     progress: int = 0
-    result: Optional[Dict[str, Any]] = None
+    result_summary: Optional[Dict[str, int]] = None
     error: Optional[str] = None
     output_file: Optional[str] = None
     timestamp: str
 
+class FastJSONResponse(JSONResponse):
+    """Réponse JSON sérialisée par fast_json (orjson, msgspec ou json selon ce qui est installé)"""
+
+    def render(self, content: Any) -> bytes:
+        return fast_json.dumps(content)
+
 # Application FastAPI
 app = FastAPI(
     title="Web Scraping Platform",
     description="Plateforme moderne pour l'extraction de données web",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Activer CORS pour permettre au frontend de communiquer avec l'API
@@ -50,132 +79,375 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Stocker les tâches en cours et leurs résultats
-tasks = {}
-websocket_connections = {}
+# File d'attente persistante: les tâches survivent aux redémarrages et sont partagées
+# entre plusieurs processus uvicorn et les workers
+QUEUE_DB = queue_db_from_env()
+JOB_VISIBILITY_TIMEOUT = visibility_timeout_from_env()
 
-# Fonction pour exécuter l'extraction en arrière-plan
-async def run_scraping_task(task_id: str, request: ScrapeRequest):
-    agent = WebScrapingAgent()
-    result = ScrapeResult(
-        task_id=task_id,
-        status="running",
-        progress=0,
-        timestamp=datetime.now().isoformat()
+# Rétention bornée: TTL et nombre maximal de tâches terminées, gros résultats écrits sur disque
+# (mêmes réglages que les workers lancés à part avec `python job_queue.py`)
+QUEUE_OPTIONS = queue_options_from_env()
+TASK_PURGE_INTERVAL = int(os.environ.get("SCRAPER_TASK_PURGE_INTERVAL", 300))
+job_queue = JobQueue(QUEUE_DB, visibility_timeout=JOB_VISIBILITY_TIMEOUT, **QUEUE_OPTIONS)
+worker_pool = None
+purge_task = None
+
+# Progression: le websocket relaie au plus N instantanés par seconde et par tâche
+PROGRESS_UPDATES_PER_SECOND = float(os.environ.get("SCRAPER_PROGRESS_RATE", 4))
+
+# Téléchargement en flux des sorties: taille des morceaux lus sur disque, lignes JSON par morceau
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_LINES_PER_CHUNK = 1000
+# Secondes d'attente du premier fichier de sortie d'une tâche en cours avant de répondre 409
+STREAM_OPEN_TIMEOUT = float(os.environ.get("SCRAPER_STREAM_OPEN_TIMEOUT", 30))
+OUTPUT_MEDIA_TYPES = {
+    ".json": "application/json",
+    ".jsonl": "application/x-ndjson",
+    ".csv": "text/csv; charset=utf-8",
+    ".txt": "text/plain; charset=utf-8",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".gz": "application/gzip",
+    ".zst": "application/zstd",
+    ".parquet": "application/vnd.apache.parquet",
+    ".arrow": "application/vnd.apache.arrow.file",
+}
+
+# Moteur de téléchargement asynchrone partagé (pool de connexions commun)
+fetcher = WebScrapingAgent().create_async_fetcher(max_concurrency=int(os.environ.get("SCRAPER_MAX_CONCURRENCY", 1000)))
+
+# Pools bornés pour le travail bloquant: I/O (Selenium, robots.txt, export) et parsing (CPU)
+io_pool = InstrumentedExecutor("io", max_workers=int(os.environ.get("SCRAPER_IO_WORKERS", 32)))
+parse_pool = InstrumentedExecutor("parse", max_workers=int(os.environ.get("SCRAPER_PARSE_WORKERS", os.cpu_count() or 4)))
+
+async def iter_request_pages(agent: WebScrapingAgent, request: ScrapeRequest, checkpoint=None):
+    """Produire les pages (url, contenu) d'une requête au fur et à mesure de leur téléchargement
+
+    Les pages de pagination et d'exploration sont déjà parsées (il faut y chercher
+    les liens); une page seule reste du HTML brut, parsé seulement si elle a changé
+    depuis la dernière extraction. Avec un ``checkpoint``, les pages déjà téléchargées par une tentative
+    précédente de la tâche sont relues au lieu d'être téléchargées à nouveau.
+    """
+    html_content = None
+    if isinstance(request, CrawlRequest):
+        # Exploration: les pages découvertes sont téléchargées en parallèle
+        async for url, depth, document in agent.iter_crawl_async(
+            [request.url], max_pages=request.max_pages, max_depth=request.max_depth,
+            same_domain=request.same_domain, concurrency=request.concurrency,
+            fetcher=fetcher, run_parse=parse_pool.run, checkpoint=checkpoint
+        ):
+            yield url, document
+        return
+    elif request.use_selenium:
+        html_content = await io_pool.run(
+            agent.extract_with_selenium, request.url,
+            wait_for=request.wait_for, selector=request.wait_selector
+        )
+    elif request.handle_pagination:
+        # Les pages suivantes sont préchargées en parallèle et toutes sont extraites
+        async for document in agent.iter_pagination_async(
+            request.url, max_pages=request.max_pages,
+            fetcher=fetcher, run_parse=parse_pool.run, checkpoint=checkpoint
+        ):
+            yield document.url, document
+        return
+    else:
+        html_content = await fetcher.fetch(request.url)
+
+    if html_content:
+        yield request.url, html_content
+
+def expected_pages(request: ScrapeRequest) -> int:
+    """Nombre maximal de pages d'une requête, pour estimer la progression"""
+    if request.handle_pagination or isinstance(request, CrawlRequest):
+        return request.max_pages
+    return 1
+
+def select_elements(agent: WebScrapingAgent, document, elements: List[str]) -> List[str]:
+    """Éléments à extraire: ceux demandés, sinon tous ceux présents sur la page"""
+    if not elements:
+        data_elements = agent.analyze_page_structure(document)
+        elements = [e for e, count in data_elements.items() if count > 0]
+        
+    if not elements:
+        raise ValueError("Aucun élément à extraire n'a été trouvé")
+    return elements
+
+async def run_streaming_task(task_id: str, request: ScrapeRequest, agent: WebScrapingAgent, queue: JobQueue,
+                             checkpoint=None):
+    """Extraction en flux: chaque page est extraite, transformée puis écrite avant la suivante
+
+    Seule la page en cours (et la fenêtre de préchargement) est gardée en mémoire,
+    quel que soit le nombre de pages; le résultat n'est disponible que dans les fichiers.
+    """
+    writer = None
+    output_files = []
+    live_files = []
+    pages = 0
+    unchanged = 0
+    try:
+        async for url, document in iter_request_pages(agent, request, checkpoint):
+            if writer is None:
+                if not request.elements:
+                    document = await parse_pool.run(agent.parse_document, document, url)
+                elements_to_extract = select_elements(agent, document, request.elements)
+                writer = await io_pool.run(agent.open_record_writer, request.output_format, request.url)
+
+            records, change = await parse_pool.run(agent.page_records, url, document, elements_to_extract)
+            await io_pool.run(writer.write_many, records)
+            await io_pool.run(writer.flush)
+            if writer.output_files() != live_files:
+                # Les fichiers en cours d'écriture peuvent déjà être lus via /api/tasks/{task_id}/stream
+                live_files = writer.output_files()
+                await io_pool.run(queue.set_output_file, task_id, ", ".join(live_files))
+            unchanged += change['status'] == 'unchanged'
+            pages += 1
+            progress = 30 + int(60 * pages / max(expected_pages(request), 1))
+            await update_progress(queue, task_id, min(progress, 90), f"Page {pages} extraite et exportée...")
+    finally:
+        if writer is not None:
+            output_files = await io_pool.run(writer.close)
+
+    if writer is None:
+        raise ValueError("Impossible de récupérer le contenu de la page")
+
+    total = sum(writer.counts.values())
+    await update_progress(
+        queue, task_id, 100,
+        f"Extraction terminée avec succès ({total} enregistrements, {pages} pages dont {unchanged} inchangées)",
+        output_file=output_files
     )
-    tasks[task_id] = result
+
+# Fonction exécutée par les workers pour réaliser une extraction
+async def run_scraping_task(task_id: str, request: ScrapeRequest, queue: JobQueue):
+    agent = WebScrapingAgent()
     
     try:
         # Simuler les étapes d'avancement pour l'UI
-        await update_progress(task_id, 10, "Initialisation de l'extraction...")
+        await update_progress(queue, task_id, 10, "Initialisation de l'extraction...")
         
         # Configuration et vérification
         if not agent.validate_url(request.url):
             raise ValueError("URL invalide")
         
-        await update_progress(task_id, 20, "Vérification du fichier robots.txt...")
-        if not agent.check_robots_txt(request.url):
-            await update_progress(task_id, 0, "Extraction annulée selon robots.txt")
+        await update_progress(queue, task_id, 20, "Vérification du fichier robots.txt...")
+        if not await io_pool.run(agent.check_robots_txt, request.url, on_disallow='deny'):
+            await io_pool.run(queue.cancel, task_id, "Extraction annulée selon robots.txt")
             return
         
         # Extraction du HTML
-        await update_progress(task_id, 30, "Téléchargement de la page...")
-        
-        html_content = None
-        if request.use_selenium:
-            html_content = agent.extract_with_selenium(request.url)
-        elif request.handle_pagination:
-            paginated_contents = agent.handle_pagination(request.url, max_pages=request.max_pages)
-            if paginated_contents:
-                html_content = paginated_contents[0]  # Pour l'analyse
-        else:
-            html_content = agent.fetch_page_with_retry(request.url)
-            
-        if not html_content:
-            raise ValueError("Impossible de récupérer le contenu de la page")
-        
-        # Analyse de la structure
-        await update_progress(task_id, 50, "Analyse de la structure de la page...")
-        data_elements = agent.analyze_page_structure(html_content)
+        await update_progress(queue, task_id, 30, "Téléchargement de la page...")
+        # Pagination et exploration: la progression est enregistrée sous l'identifiant de la tâche,
+        # une tâche reprise après la mort de son worker repart de là où elle en était
+        multi_page = request.handle_pagination or isinstance(request, CrawlRequest)
+        async with agent.job_checkpoint("crawl" if isinstance(request, CrawlRequest) else "pagination",
+                                        key=task_id, resume=multi_page, url=request.url) as checkpoint:
+            if request.streaming:
+                await run_streaming_task(task_id, request, agent, queue, checkpoint)
+                return
+
+            pages = [page async for page in iter_request_pages(agent, request, checkpoint)]
+            if not pages:
+                raise ValueError("Impossible de récupérer le contenu de la page")
         
-        # Si aucun élément spécifié, utiliser tous les éléments disponibles
-        elements_to_extract = request.elements
-        if not elements_to_extract:
-            elements_to_extract = [e for e, count in data_elements.items() if count > 0]
+            # Analyse de la structure (chaque page n'est parsée qu'une seule fois)
+            await update_progress(queue, task_id, 50, "Analyse de la structure de la page...")
+            if not request.elements:
+                url, document = pages[0]
+                pages[0] = (url, await parse_pool.run(agent.parse_document, document, url))
+            elements_to_extract = select_elements(agent, pages[0][1], request.elements)
             
-        if not elements_to_extract:
-            raise ValueError("Aucun élément à extraire n'a été trouvé")
+            if agent.page_store is not None:
+                # Les pages inchangées depuis la dernière extraction réutilisent leurs enregistrements
+                await update_progress(queue, task_id, 70, "Extraction et transformation des pages modifiées...")
+                transformed_data = await parse_pool.run(agent.extract_incremental, pages, elements_to_extract)
+            else:
+                # Extraction des données
+                await update_progress(queue, task_id, 70, "Extraction des données...")
+                documents = [document for url, document in pages]
+                extracted_data = await parse_pool.run(agent.extract_from_documents, documents, elements_to_extract)
             
-        # Extraction des données
-        await update_progress(task_id, 70, "Extraction des données...")
-        extracted_data = agent.extract_data(html_content, elements_to_extract)
+                # Transformation des données
+                await update_progress(queue, task_id, 80, "Transformation des données...")
+                transformed_data = await parse_pool.run(agent.transform_pipeline, extracted_data)
         
-        # Transformation des données
-        await update_progress(task_id, 80, "Transformation des données...")
-        transformed_data = agent.transform_pipeline(extracted_data)
-        
-        # Export des données
-        await update_progress(task_id, 90, "Export des données...")
-        output_file = None
-        if transformed_data:
-            output_file = agent.export_data(transformed_data, request.output_format, request.url)
+            # Export des données
+            await update_progress(queue, task_id, 90, "Export des données...")
+            output_file = None
+            if transformed_data:
+                output_file = await io_pool.run(agent.export_data, transformed_data, request.output_format, request.url)
             
-        # Finalisation
-        await update_progress(task_id, 100, "Extraction terminée avec succès", result=transformed_data, output_file=output_file)
+            # Finalisation
+            await update_progress(queue, task_id, 100, "Extraction terminée avec succès", result=transformed_data, output_file=output_file)
         
     except Exception as e:
-        # En cas d'erreur
-        error_message = str(e)
-        tasks[task_id].status = "failed"
-        tasks[task_id].error = error_message
-        
-        # Notifier le client via websocket
-        if task_id in websocket_connections:
-            await websocket_connections[task_id].send_json({
-                "task_id": task_id,
-                "status": "failed",
-                "progress": 0,
-                "error": error_message
-            })
-
-async def update_progress(task_id: str, progress: int, status_message: str, result=None, output_file=None):
-    """Mettre à jour la progression d'une tâche et notifier via websocket"""
-    if task_id in tasks:
-        tasks[task_id].progress = progress
-        tasks[task_id].status = status_message if progress < 100 else "completed"
-        
-        if result:
-            tasks[task_id].result = result
-            
-        if output_file:
-            tasks[task_id].output_file = output_file
-            
-        # Notifier le client via websocket si connecté
-        if task_id in websocket_connections:
-            await websocket_connections[task_id].send_json({
-                "task_id": task_id,
-                "status": tasks[task_id].status,
-                "progress": progress,
-                "message": status_message,
-                "output_file": output_file
-            })
-    
-    # Simuler le temps de traitement
-    await asyncio.sleep(0.5)
+        # En cas d'erreur: échec définitif, l'erreur est visible via /api/tasks et le websocket
+        await io_pool.run(queue.fail, task_id, str(e))
+
+async def process_scrape_job(job: Dict[str, Any], queue: JobQueue):
+    """Handler exécuté par les workers de la file d'attente"""
+    request_model = CrawlRequest if job["kind"] == "crawl" else ScrapeRequest
+    await run_scraping_task(job["id"], request_model(**job["payload"]), queue)
+
+async def update_progress(queue: JobQueue, task_id: str, progress: int, status_message: str, result=None, output_file=None):
+    """Enregistrer la progression d'une tâche dans la file persistante
+
+    Chaque mise à jour est enregistrée; le regroupement se fait côté websocket,
+    relay_progress n'envoyant que le dernier état à chaque intervalle.
+    """
+    if isinstance(output_file, list):
+        # L'export CSV produit un fichier par type d'élément
+        output_file = ", ".join(output_file)
+    if progress >= 100:
+        await io_pool.run(queue.complete, task_id, result, output_file, status_message)
+    else:
+        await io_pool.run(queue.update_progress, task_id, progress, status_message)
+
+def job_to_result(job: Dict[str, Any]) -> ScrapeResult:
+    """Convertir une tâche de la file en ScrapeResult léger (le résultat complet est servi à part)"""
+    status = job["message"] if job["state"] == "running" and job["message"] else job["state"]
+    return ScrapeResult(
+        task_id=job["id"],
+        status=status,
+        progress=job["progress"],
+        result_summary=job["result_summary"],
+        error=job["error"],
+        output_file=job["output_file"],
+        timestamp=job["updated_at"]
+    )
 
 @app.post("/api/scrape", response_model=Dict[str, str])
-async def scrape(request: ScrapeRequest, background_tasks: BackgroundTasks):
+async def scrape(request: ScrapeRequest):
     """Endpoint pour démarrer une tâche de scraping"""
     task_id = str(uuid.uuid4())
-    background_tasks.add_task(run_scraping_task, task_id, request)
+    await io_pool.run(job_queue.enqueue, request.dict(), "scrape", request.priority, task_id)
     return {"task_id": task_id, "message": "Tâche d'extraction démarrée"}
 
+@app.post("/api/crawl", response_model=Dict[str, str])
+async def crawl(request: CrawlRequest):
+    """Endpoint pour démarrer une exploration qui suit les liens depuis l'URL de départ"""
+    task_id = str(uuid.uuid4())
+    await io_pool.run(job_queue.enqueue, request.dict(), "crawl", request.priority, task_id)
+    return {"task_id": task_id, "message": "Exploration démarrée"}
+
 @app.get("/api/tasks/{task_id}", response_model=ScrapeResult)
 async def get_task_status(task_id: str):
     """Endpoint pour vérifier le statut d'une tâche"""
-    if task_id not in tasks:
+    job = await io_pool.run(job_queue.get, task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    return job_to_result(job)
+
+@app.get("/api/tasks/{task_id}/result")
+async def get_task_result(task_id: str, category: Optional[str] = None, offset: int = 0, limit: int = 100):
+    """Endpoint pour récupérer le résultat d'une tâche: complet, ou paginé par catégorie"""
+    job = await io_pool.run(job_queue.get, task_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Tâche non trouvée")
-    return tasks[task_id]
+    if job["state"] != "completed" or job["result_summary"] is None:
+        raise HTTPException(status_code=409, detail="Aucun résultat disponible pour cette tâche")
+
+    if category is None:
+        # Résultat complet: servi tel qu'il est stocké, depuis le disque s'il y a été déchargé,
+        # sans être désérialisé puis resérialisé
+        result_json, result_file = await io_pool.run(job_queue.load_result_json, task_id)
+        if result_file:
+            return FileResponse(result_file, media_type="application/json")
+        if result_json is None:
+            raise HTTPException(status_code=404, detail="Tâche non trouvée")
+        return Response(result_json, media_type="application/json")
+
+    if category not in job["result_summary"]:
+        raise HTTPException(status_code=404, detail="Catégorie non trouvée")
+    if offset < 0 or limit <= 0:
+        raise HTTPException(status_code=400, detail="Pagination invalide")
+
+    result = await io_pool.run(job_queue.load_result, task_id)
+    items = result[category]
+    if not isinstance(items, list):
+        items = [items]
+    return {
+        "task_id": task_id,
+        "category": category,
+        "total": len(items),
+        "offset": offset,
+        "limit": limit,
+        "items": items[offset:offset + limit]
+    }
+
+def job_output_files(job: Dict[str, Any]) -> List[str]:
+    """Fichiers de sortie d'une tâche (l'export CSV en produit un par type d'élément)"""
+    return job["output_file"].split(", ") if job["output_file"] else []
+
+async def tail_output_file(task_id: str, path: str):
+    """Lire un fichier de sortie par morceaux, en suivant ce qui y est ajouté tant que la tâche tourne"""
+    file = await io_pool.run(open, path, "rb")
+    try:
+        while True:
+            chunk = await io_pool.run(file.read, STREAM_CHUNK_SIZE)
+            if chunk:
+                yield chunk
+                continue
+            job = await io_pool.run(job_queue.get, task_id)
+            if job is None or job["state"] in TERMINAL_STATES:
+                # Le fichier est fermé avant que la tâche ne soit terminée: lire ce qu'il en reste
+                while chunk := await io_pool.run(file.read, STREAM_CHUNK_SIZE):
+                    yield chunk
+                return
+            await asyncio.sleep(1.0 / PROGRESS_UPDATES_PER_SECOND)
+    finally:
+        file.close()
+
+async def result_json_lines(task_id: str):
+    """Sérialiser le résultat d'une tâche terminée en JSON Lines, un morceau à la fois hors de la boucle"""
+    result = await io_pool.run(job_queue.load_result, task_id)
+    lines = iter_json_lines(result or {})
+    while chunk := await io_pool.run(lambda: "".join(itertools.islice(lines, STREAM_LINES_PER_CHUNK)).encode("utf-8")):
+        yield chunk
+
+@app.get("/api/tasks/{task_id}/stream")
+async def stream_task_output(task_id: str, file: Optional[str] = None, records: bool = False):
+    """Endpoint pour télécharger en flux (chunked) le fichier de sortie d'une tâche ou ses enregistrements
+
+    Le fichier d'une extraction en flux est servi pendant qu'il est écrit et suivi jusqu'à
+    la fin de la tâche: c'est le seul moyen de consommer les enregistrements avant qu'elle
+    ne se termine. Avec ``records`` (ou sans fichier de sortie), le résultat d'une tâche
+    terminée est servi en JSON Lines; une tâche en cours répond alors 409 immédiatement.
+    """
+    job = await io_pool.run(job_queue.get, task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    if records and job["state"] not in TERMINAL_STATES:
+        raise HTTPException(status_code=409, detail="Tâche en cours: suivez son fichier de sortie sans records=true")
+
+    # Attendre, dans la limite de STREAM_OPEN_TIMEOUT, qu'une tâche en cours ait ouvert son fichier
+    # de sortie (seules les extractions en flux l'ouvrent avant la fin) ou qu'elle se termine
+    deadline = time.monotonic() + STREAM_OPEN_TIMEOUT
+    while not records and job["state"] not in TERMINAL_STATES and not job["output_file"]:
+        if time.monotonic() >= deadline:
+            raise HTTPException(status_code=409, detail="Aucun fichier de sortie pour l'instant: seules les extractions en flux (streaming) sont lisibles en cours d'exécution")
+        await asyncio.sleep(1.0 / PROGRESS_UPDATES_PER_SECOND)
+        job = await io_pool.run(job_queue.get, task_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Tâche non trouvée")
+
+    files = job_output_files(job)
+    if files and not records:
+        if file is None and len(files) > 1:
+            names = ", ".join(os.path.basename(path) for path in files)
+            raise HTTPException(status_code=400, detail=f"Plusieurs fichiers de sortie, précisez-en un avec ?file=: {names}")
+        matches = [path for path in files if file is None or os.path.basename(path) == file]
+        if not matches or not await io_pool.run(os.path.exists, matches[0]):
+            raise HTTPException(status_code=404, detail="Fichier de sortie non trouvé")
+        path = matches[0]
+        media_type = OUTPUT_MEDIA_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+        return StreamingResponse(
+            tail_output_file(task_id, path), media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{os.path.basename(path)}"'}
+        )
+
+    if job["state"] != "completed" or job["result_summary"] is None:
+        raise HTTPException(status_code=409, detail="Aucun résultat disponible pour cette tâche")
+    return StreamingResponse(result_json_lines(task_id), media_type="application/x-ndjson")
 
 @app.get("/api/elements", response_model=Dict[str, int])
 async def get_available_elements(url: str):
@@ -185,41 +457,68 @@ async def get_available_elements(url: str):
     if not agent.validate_url(url):
         raise HTTPException(status_code=400, detail="URL invalide")
         
-    html_content = agent.fetch_page_with_retry(url)
+    html_content = await fetcher.fetch(url)
     if not html_content:
         raise HTTPException(status_code=500, detail="Impossible de récupérer le contenu de la page")
         
-    data_elements = agent.analyze_page_structure(html_content)
+    data_elements = await parse_pool.run(agent.analyze_page_structure, html_content)
     return data_elements
 
+@app.get("/api/metrics/pools", response_model=Dict[str, Dict[str, Any]])
+async def get_pool_metrics():
+    """Endpoint pour suivre la profondeur des files d'attente des pools d'exécution"""
+    metrics = {pool.name: pool.metrics() for pool in (io_pool, parse_pool)}
+    metrics["jobs"] = await io_pool.run(job_queue.counts)
+    if fetcher.http_cache is not None:
+        metrics["http_cache"] = await io_pool.run(fetcher.http_cache.stats)
+    metrics["rate_limits"] = fetcher.rate_limiter.stats()
+    metrics["retries"] = fetcher.retry_policy.stats()
+    return metrics
+
+async def relay_progress(websocket: WebSocket, task_id: str):
+    """Relayer au client les changements d'état enregistrés dans la file"""
+    last_snapshot = None
+    while True:
+        job = await io_pool.run(job_queue.get, task_id)
+        if job is not None:
+            snapshot = (job["state"], job["progress"], job["message"])
+            if snapshot != last_snapshot:
+                last_snapshot = snapshot
+                result = job_to_result(job)
+                message = {
+                    "task_id": task_id,
+                    "status": result.status,
+                    "progress": result.progress,
+                    "message": job["message"],
+                    "output_file": result.output_file
+                }
+                if result.error:
+                    message["error"] = result.error
+                await websocket.send_text(fast_json.dumps_text(message))
+            if job["state"] in TERMINAL_STATES:
+                return
+        await asyncio.sleep(1.0 / PROGRESS_UPDATES_PER_SECOND)
+
 @app.websocket("/ws/{task_id}")
 async def websocket_endpoint(websocket: WebSocket, task_id: str):
     """Endpoint WebSocket pour les mises à jour en temps réel"""
     await websocket.accept()
-    websocket_connections[task_id] = websocket
+    relay = asyncio.create_task(relay_progress(websocket, task_id))
     
     try:
-        # Envoyer l'état initial si la tâche existe déjà
-        if task_id in tasks:
-            await websocket.send_json({
-                "task_id": task_id,
-                "status": tasks[task_id].status,
-                "progress": tasks[task_id].progress,
-            })
-        
         # Attendre les messages du client (peut être utilisé pour l'annulation)
         while True:
             data = await websocket.receive_text()
-            if data == "cancel" and task_id in tasks:
-                tasks[task_id].status = "cancelled"
-                await websocket.send_json({
+            if data == "cancel" and await io_pool.run(job_queue.cancel, task_id):
+                await websocket.send_text(fast_json.dumps_text({
                     "task_id": task_id,
                     "status": "cancelled"
-                })
+                }))
                 
     except WebSocketDisconnect:
-        if task_id in websocket_connections:
-            del websocket_connections[task_id]
+        pass
+    finally:
+        relay.cancel()
 
 # Servir les fichiers statiques du frontend
 @app.on_event("startup")
@@ -233,6 +532,54 @@ async def startup_event():
     except:
         pass
 
+    # Ouvrir le pool de connexions dans la boucle d'événements du serveur
+    await fetcher.start()
+
+    # Démarrer les workers (SCRAPER_WORKERS=0 pour les lancer séparément avec `python job_queue.py`)
+    global worker_pool
+    num_workers = int(os.environ.get("SCRAPER_WORKERS", 2))
+    if num_workers > 0:
+        worker_pool = WorkerPool(
+            QUEUE_DB,
+            "web_scraping_platform:process_scrape_job",
+            num_workers=num_workers,
+            concurrency=int(os.environ.get("SCRAPER_WORKER_CONCURRENCY", 4)),
+            visibility_timeout=JOB_VISIBILITY_TIMEOUT,
+            queue_options=QUEUE_OPTIONS
+        )
+        worker_pool.start()
+
+    # Éviction périodique des tâches expirées
+    global purge_task
+    purge_task = asyncio.create_task(purge_expired_tasks())
+
+async def purge_expired_tasks():
+    """Appliquer régulièrement le TTL et la taille maximale du stockage des tâches"""
+    checkpoint_store = get_default_checkpoint_store()
+    page_store = get_default_page_store()
+    while True:
+        try:
+            await io_pool.run(job_queue.purge)
+            if checkpoint_store is not None:
+                # Points de reprise des tâches échouées ou abandonnées (SCRAPER_CHECKPOINT_TTL)
+                await io_pool.run(checkpoint_store.purge)
+            if page_store is not None:
+                # Enregistrements des pages qui n'ont pas été réextraites depuis SCRAPER_PAGE_STORE_TTL
+                await io_pool.run(page_store.purge)
+        except Exception as e:
+            logger.error(f"Task store purge failed: {e}")
+        await asyncio.sleep(TASK_PURGE_INTERVAL)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if purge_task is not None:
+        purge_task.cancel()
+    if worker_pool is not None:
+        await asyncio.to_thread(worker_pool.stop)
+    await fetcher.close()
+    io_pool.shutdown(wait=False)
+    parse_pool.shutdown(wait=False)
+
 # Monter les fichiers statiques après le démarrage
 try:
     app.mount("/", StaticFiles(directory="frontend/build", html=True), name="frontend")